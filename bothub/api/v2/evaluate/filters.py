@@ -59,9 +59,7 @@ class EvaluatesFilter(filters.FilterSet):
                 version = get_object_or_404(
                     RepositoryVersion, pk=request.query_params.get("repository_version")
                 )
-                queryset = queryset.filter(
-                    repository_version_language__repository_version=version
-                )
+                queryset = queryset.filter(repository_version=version.source_version)
                 return repository.evaluations(
                     queryset=queryset, version_default=version.is_default
                 )
@@ -72,7 +70,7 @@ class EvaluatesFilter(filters.FilterSet):
             raise NotFound(_("Invalid repository_uuid"))
 
     def filter_language(self, queryset, name, value):
-        return queryset.filter(repository_version_language__language=value)
+        return queryset.filter(language=value)
 
     def filter_repository_version(self, queryset, name, value):
         return queryset
@@ -6,9 +6,9 @@ from bothub.common.models import RepositoryExample, RepositoryEvaluate
 
 class ThereIsIntentValidator(object):
     def __call__(self, attrs):
-        repository_version = attrs.get("repository_version_language")
+        repository_version = attrs.get("repository_version_language").source_version
         queryset = RepositoryExample.objects.filter(
-            repository_version_language__repository_version=repository_version
+            repository_version=repository_version
         )
         if attrs.get("intent") not in attrs.get("repository").intents(
             queryset=queryset, version_default=repository_version.is_default
@@ -19,7 +19,7 @@ class ThereIsIntentValidator(object):
 class ThereIsEntityValidator(object):
     def __call__(self, attrs):
         entities = attrs.get("entities")
-        repository_version = attrs.get("repository_version_language")
+        repository_version = attrs.get("repository_version_language").source_version
 
         if entities:
             entities_list = list(
@@ -44,11 +44,11 @@ class ThereIsExistingSentenceValidator(object):
         text = attrs.get("text")
         intent = attrs.get("intent")
         language = attrs.get("language")
-        repository_version = attrs.get("repository_version_language")
+        repository_version = attrs.get("repository_version_language").source_version
 
         queryset = RepositoryEvaluate.objects.filter(
-            repository_version_language__language=language,
-            repository_version_language__repository_version=repository_version,
+            language=language,
+            repository_version=repository_version,
             text=text,
             intent=intent,
         )
@@ -8,6 +8,7 @@ from rest_framework.exceptions import PermissionDenied
 
 from bothub.common.models import Repository
 from bothub.common.models import RepositoryExample
+from bothub.common.models import RepositoryVersion
 
 
 class ExamplesFilter(filters.FilterSet):
@@ -116,11 +117,11 @@ class ExamplesFilter(filters.FilterSet):
             raise NotFound(_("Invalid repository_uuid"))
 
     def filter_language(self, queryset, name, value):
-        return queryset.filter(repository_version_language__language=value)
+        return queryset.filter(language=value)
 
     def filter_repository_version(self, queryset, name, value):
         return queryset.filter(
-            repository_version_language__repository_version__pk=value
+            repository_version=RepositoryVersion.source_version_of(value)
         )
 
     def filter_has_translation(self, queryset, name, value):
@@ -152,9 +153,7 @@ class ExamplesFilter(filters.FilterSet):
                 "translations", filter=Q(translations__language=value)
             )
         )
-        return annotated_queryset.filter(
-            ~Q(translation_count=0) | Q(repository_version_language__language=value)
-        )
+        return annotated_queryset.filter(~Q(translation_count=0) | Q(language=value))
 
     def filter_order_by_translation(self, queryset, name, value):
         inverted = value[0] == "-"
@@ -205,7 +204,7 @@ class ExamplesFilter(filters.FilterSet):
                     )
                     | Q(
                         translations__entities__repository_translated_example__language=F(
-                            "repository_version_language__repository_version__repository__language"
+                            "repository__language"
                         )
                     ),
                     translations__entities__entity__in=F(
@@ -236,7 +235,7 @@ class ExamplesFilter(filters.FilterSet):
                     )
                     | Q(
                         translations__entities__repository_translated_example__language=F(
-                            "repository_version_language__repository_version__repository__language"
+                            "repository__language"
                         )
                     ),
                     translations__entities__entity__in=F(
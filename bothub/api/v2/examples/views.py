@@ -1,5 +1,4 @@
 from django.conf import settings
-from django.db.models import Q
 from django.utils.decorators import method_decorator
 from django_filters.rest_framework import DjangoFilterBackend
 from drf_yasg2 import openapi
@@ -11,7 +10,7 @@ from rest_framework.filters import OrderingFilter, SearchFilter
 from rest_framework.response import Response
 from rest_framework.viewsets import GenericViewSet
 
-from bothub.common.models import RepositoryExample
+from bothub.common.models import RepositoryExample, RepositoryExampleSearchEntry
 
 from ..example.serializers import (
     RepositoriesSearchExamplesResponseSerializer,
@@ -76,25 +75,10 @@ class ExamplesViewSet(mixins.ListModelMixin, GenericViewSet):
         text = self.request.data.get("text")
         exclude_intents = self.request.data.get("exclude_intents", [])
 
-        examples = (
-            RepositoryExample.objects.exclude(intent__text__in=exclude_intents)
-            .filter(
-                Q(repository_version_language__language=language)
-                | Q(translations__repository_version_language__language=language),
-                repository_version_language__repository_version__is_default=True,
-                repository_version_language__repository_version__repository__in=repositories,
-            )
-            .filter(
-                Q(text__unaccent__trigram_similar=text)
-                | Q(translations__text__unaccent__trigram_similar=text)
-            )
-            .distinct()
-        )
-
         return Response(
             {
-                "result": [
-                    example.get_text(language=language) for example in examples[:5]
-                ]
+                "result": RepositoryExampleSearchEntry.objects.search(
+                    repositories, language, text, exclude_intents=exclude_intents
+                )
             }
         )
@@ -0,0 +1,18 @@
+from drf_yasg2 import openapi
+from drf_yasg2.inspectors import FieldInspector
+
+
+class FieldCostInspector(FieldInspector):
+    """
+    Shows the cost class declared in the serializer Meta field_costs as the
+    x-cost extension of each field, so clients can pick a cheap sparse
+    fieldset with ?fields= or ?omit=
+    """
+
+    def process_result(self, result, method_name, obj, **kwargs):
+        parent = getattr(obj, "parent", None)
+        field_costs = getattr(getattr(parent, "Meta", None), "field_costs", None)
+        if field_costs is None or not isinstance(result, openapi.Schema):
+            return result
+        result["x-cost"] = field_costs.get(obj.field_name, "cheap")
+        return result
@@ -1,4 +1,6 @@
 from django.shortcuts import get_object_or_404
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.serializers import ListSerializer
 
 
 class MultipleFieldLookupMixin(object):
@@ -18,3 +20,45 @@ class MultipleFieldLookupMixin(object):
         obj = get_object_or_404(queryset, **filter)
         self.check_object_permissions(self.request, obj)
         return obj
+
+
+class SparseFieldsetMixin(object):
+    """
+    Apply this mixin to a serializer to let GET requests pick the fields of
+    the response with `?fields=a,b` or leave some out with `?omit=a,b`. Fields
+    left out are never computed. The cost class of each field can be declared
+    in a `field_costs` dict on the serializer Meta, it is shown in the
+    OpenAPI schema.
+    """
+
+    def get_sparse_fieldset(self):
+        """
+        Returns the (fields, omit) sets asked by the request, or None when the
+        whole representation is wanted
+        """
+        request = self.context.get("request")
+        root = self.parent if isinstance(self.parent, ListSerializer) else self
+        if (
+            request is None
+            or root.parent is not None
+            or request.method not in SAFE_METHODS
+        ):
+            return None
+        fields, omit = [
+            set(filter(None, request.query_params.get(param, "").split(",")))
+            for param in ["fields", "omit"]
+        ]
+        if not fields and not omit:
+            return None
+        return fields, omit
+
+    def get_fields(self):
+        fields = super().get_fields()
+        sparse_fieldset = self.get_sparse_fieldset()
+        if sparse_fieldset is None:
+            return fields
+        only, omit = sparse_fieldset
+        for name in list(fields):
+            if (only and name not in only) or name in omit:
+                fields.pop(name)
+        return fields
@@ -5,6 +5,7 @@ from bothub.common.models import (
     RepositoryNLPLogIntent,
     RepositoryVersionLanguage,
     RepositoryAuthorization,
+    RepositoryQueueTask,
 )
 
 
@@ -12,6 +13,15 @@ class NLPSerializer(serializers.Serializer):
     pass
 
 
+class RepositoryQueueTaskStatusSerializer(serializers.Serializer):
+    task_id = serializers.CharField(required=True)
+    status = serializers.ChoiceField(
+        choices=RepositoryQueueTask.STATUS_CHOICES, required=True
+    )
+    ml_units = serializers.FloatField(required=False)
+    end_training = serializers.DateTimeField(required=False)
+
+
 class RepositoryNLPLogIntentSerializer(serializers.ModelSerializer):
     class Meta:
         model = RepositoryNLPLogIntent
@@ -58,3 +68,13 @@ class RepositoryNLPLogSerializer(serializers.ModelSerializer):
             )
 
         return instance
+
+
+class RepositoryNLPLogBulkSerializer(RepositoryNLPLogSerializer):
+    """
+    Only validates the shape of each log, the related objects are resolved
+    for the whole batch by the view
+    """
+
+    repository_version_language = serializers.IntegerField(write_only=True)
+    user = serializers.UUIDField(write_only=True)
@@ -1,22 +1,40 @@
 import base64
+import json
 
 from django.conf import settings
 from django.core.exceptions import ValidationError
 from django.core.validators import URLValidator
+from django.db import transaction
+from django.http import (
+    FileResponse,
+    Http404,
+    HttpResponse,
+    HttpResponseNotModified,
+    StreamingHttpResponse,
+)
 from django.shortcuts import get_object_or_404
+from django.utils.http import parse_etags
 from django.utils.translation import gettext_lazy as _
+from redis.exceptions import RedisError
 from rest_framework import exceptions
 from rest_framework import mixins, pagination
 from rest_framework.decorators import action
-from rest_framework.exceptions import PermissionDenied
+from rest_framework.exceptions import NotFound, PermissionDenied
 from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
 from rest_framework.viewsets import GenericViewSet
 
-from bothub.api.v2.nlp.serializers import NLPSerializer, RepositoryNLPLogSerializer
+from bothub.api.v2.nlp.serializers import (
+    NLPSerializer,
+    RepositoryNLPLogBulkSerializer,
+    RepositoryNLPLogSerializer,
+    RepositoryQueueTaskStatusSerializer,
+)
 from bothub.authentication.authorization import NLPAuthentication
 from bothub.authentication.models import User
+from bothub.common import caching
 from bothub.common import languages
+from bothub.common import storages
 from bothub.common.models import (
     RepositoryAuthorization,
     RepositoryVersionLanguage,
@@ -30,25 +48,81 @@ from bothub.common.models import RepositoryEvaluateResult
 from bothub.common.models import RepositoryEvaluateResultEntity
 from bothub.common.models import RepositoryEvaluateResultIntent
 from bothub.common.models import RepositoryEvaluateResultScore
-from bothub.utils import send_bot_data_file_aws
 
 
 def check_auth(request):
     try:
         auth = request.META.get("HTTP_AUTHORIZATION").split()
         auth = auth[1]
-        return RepositoryAuthorization.objects.get(uuid=auth)
+        return RepositoryAuthorization.objects.get_cached(auth)
     except Exception:
         msg = _("Invalid token header.")
         raise exceptions.AuthenticationFailed(msg)
 
 
+def parse_range_header(header, size):
+    """
+    Returns the (start, end) inclusive byte positions of a single range
+    "bytes=" header, None when the header is absent and raises ValueError when
+    it can not be satisfied
+    """
+    if not header:
+        return None
+    unit, _sep, ranges = header.partition("=")
+    if unit.strip() != "bytes" or "," in ranges:
+        raise ValueError(header)
+    start, _sep, end = ranges.strip().partition("-")
+    if start:
+        start, end = int(start), int(end) if end else size - 1
+    else:
+        start, end = max(size - int(end), 0), size - 1
+    if start > end or start >= size:
+        raise ValueError(header)
+    return start, min(end, size - 1)
+
+
+def iter_file_range(fileobj, start, end, chunk_size=FileResponse.block_size):
+    fileobj.seek(start)
+    remaining = end - start + 1
+    while remaining > 0:
+        chunk = fileobj.read(min(chunk_size, remaining))
+        if not chunk:
+            break
+        remaining -= len(chunk)
+        yield chunk
+    fileobj.close()
+
+
+def info_cache_key(name, repository_authorization, language, repository_version):
+    return "nlp_{}_info:{}:{}:{}:{}".format(
+        name,
+        repository_authorization.pk,
+        repository_authorization.repository.training_generation,
+        language,
+        repository_version,
+    )
+
+
+class CachedRepositoryAuthorizationMixin:
+    def get_object(self):
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        try:
+            return RepositoryAuthorization.objects.get_cached(
+                self.kwargs[lookup_url_kwarg]
+            )
+        except (RepositoryAuthorization.DoesNotExist, ValidationError):
+            raise Http404
+
+
 class NLPPagination(pagination.PageNumberPagination):
     page_size = 200
 
 
 class RepositoryAuthorizationTrainViewSet(
-    mixins.RetrieveModelMixin, mixins.CreateModelMixin, GenericViewSet
+    CachedRepositoryAuthorizationMixin,
+    mixins.RetrieveModelMixin,
+    mixins.CreateModelMixin,
+    GenericViewSet,
 ):
     queryset = RepositoryAuthorization.objects
     serializer_class = NLPSerializer
@@ -118,6 +192,51 @@ class RepositoryAuthorizationTrainViewSet(
 
         return self.get_paginated_response(examples_return)
 
+    @action(detail=True, methods=["GET"], url_name="export_examples", lookup_field=[])
+    def export_examples(self, request, **kwargs):
+        repository_authorization = check_auth(request)
+
+        if not repository_authorization.can_contribute:
+            raise PermissionDenied()
+
+        repository_version_language = get_object_or_404(
+            RepositoryVersionLanguage,
+            pk=request.query_params.get("repository_version"),
+            repository_version__repository=repository_authorization.repository,
+        )
+
+        return StreamingHttpResponse(
+            (
+                "{}\n".format(json.dumps(example))
+                for example in repository_version_language.iter_training_examples()
+            ),
+            content_type="application/x-ndjson",
+        )
+
+    @action(detail=True, methods=["GET"], url_name="training_snapshot", lookup_field=[])
+    def training_snapshot(self, request, **kwargs):
+        repository_authorization = check_auth(request)
+
+        if not repository_authorization.can_contribute:
+            raise PermissionDenied()
+
+        repository_version_language = get_object_or_404(
+            RepositoryVersionLanguage,
+            pk=request.query_params.get("repository_version"),
+            repository_version__repository=repository_authorization.repository,
+        )
+
+        snapshot = repository_version_language.open_training_snapshot()
+        if snapshot is None:
+            raise NotFound()
+
+        response = FileResponse(snapshot, content_type="application/json")
+        response["Content-Encoding"] = "gzip"
+        response["ETag"] = '"{}"'.format(
+            repository_version_language.training_fingerprint
+        )
+        return response
+
     @action(detail=True, methods=["POST"], url_name="save_queue_id", lookup_field=[])
     def save_queue_id(self, request, **kwargs):
         repository_authorization = check_auth(request)
@@ -138,6 +257,34 @@ class RepositoryAuthorizationTrainViewSet(
         )
         return Response({})
 
+    @action(detail=True, methods=["POST"], url_name="task_status", lookup_field=[])
+    def task_status(self, request, **kwargs):
+        repository_authorization = check_auth(request)
+
+        if not repository_authorization.can_contribute:
+            raise PermissionDenied()
+
+        serializer = RepositoryQueueTaskStatusSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        task = (
+            RepositoryQueueTask.objects.filter(
+                id_queue=serializer.validated_data.get("task_id"),
+                repositoryversionlanguage__repository_version__repository=repository_authorization.repository,
+            )
+            .order_by("-created_at")
+            .first()
+        )
+        if task is None:
+            raise NotFound()
+
+        task.report_status(
+            serializer.validated_data.get("status"),
+            ml_units=serializer.validated_data.get("ml_units"),
+            end_training=serializer.validated_data.get("end_training"),
+        )
+        return Response({})
+
     @action(detail=True, methods=["POST"], url_name="start_training", lookup_field=[])
     def start_training(self, request, **kwargs):
         repository_authorization = check_auth(request)
@@ -164,6 +311,7 @@ class RepositoryAuthorizationTrainViewSet(
                 "use_competing_intents": repository.use_competing_intents,
                 "use_analyze_char": repository.use_analyze_char,
                 "total_training_end": repository.total_training_end,
+                "training_fingerprint": repository.training_fingerprint,
             }
         )
 
@@ -196,7 +344,7 @@ class RepositoryAuthorizationTrainViewSet(
 
 
 class RepositoryAuthorizationTrainLanguagesViewSet(
-    mixins.RetrieveModelMixin, GenericViewSet
+    CachedRepositoryAuthorizationMixin, mixins.RetrieveModelMixin, GenericViewSet
 ):
     queryset = RepositoryAuthorization.objects
     serializer_class = NLPSerializer
@@ -211,40 +359,49 @@ class RepositoryAuthorizationTrainLanguagesViewSet(
         if not repository_authorization.can_contribute:
             raise PermissionDenied()
 
+        repository = repository_authorization.repository
         repository_version = request.query_params.get("repository_version")
 
+        versions = repository.versions.all()
+        if repository_version:
+            version = versions.filter(pk=repository_version).first()
+        else:
+            version = versions.filter(is_default=True).first()
+
+        if version is None:
+            return Response([])
+
+        ready = {
+            current_version.language: current_version
+            for current_version in version.version_languages_ready_for_train(
+                list(settings.SUPPORTED_LANGUAGES)
+            )
+        }
+
         response = []
 
         for language in settings.SUPPORTED_LANGUAGES:
+            current_version = ready.get(language)
 
-            if repository_version:
-                current_version = (
-                    repository_authorization.repository.get_specific_version_id(
-                        repository_version, language
-                    )
-                )
-            else:
-                current_version = repository_authorization.repository.current_version(
-                    language
-                )
-
-            if current_version.ready_for_train:
+            if current_version:
                 response.append(
                     {
                         "current_version_id": current_version.id,
                         "repository_authorization_user_id": repository_authorization.user.id,
                         "language": current_version.language,
-                        "algorithm": current_version.repository_version.repository.algorithm,
-                        "use_name_entities": current_version.repository_version.repository.use_name_entities,
-                        "use_competing_intents": current_version.repository_version.repository.use_competing_intents,
-                        "use_analyze_char": current_version.repository_version.repository.use_analyze_char,
+                        "algorithm": repository.algorithm,
+                        "use_name_entities": repository.use_name_entities,
+                        "use_competing_intents": repository.use_competing_intents,
+                        "use_analyze_char": repository.use_analyze_char,
                     }
                 )
 
         return Response(response)
 
 
-class RepositoryAuthorizationParseViewSet(mixins.RetrieveModelMixin, GenericViewSet):
+class RepositoryAuthorizationParseViewSet(
+    CachedRepositoryAuthorizationMixin, mixins.RetrieveModelMixin, GenericViewSet
+):
     queryset = RepositoryAuthorization.objects
     serializer_class = NLPSerializer
     permission_classes = [AllowAny]
@@ -262,26 +419,33 @@ class RepositoryAuthorizationParseViewSet(mixins.RetrieveModelMixin, GenericView
         if language == "None" or language is None:
             language = str(repository.language)
 
+        cache_key = info_cache_key(
+            "parse", repository_authorization, language, repository_version
+        )
+        data = caching.get(cache_key)
+        if data is not None:
+            return Response(data)
+
         if repository_version:
             update = repository.get_specific_version_id(repository_version, language)
         else:
             update = repository.last_trained_update(language)
 
         try:
-            return Response(
-                {
-                    "version": False if update is None else True,
-                    "repository_version": update.id,
-                    "total_training_end": update.total_training_end,
-                    "language": update.language,
-                    "algorithm": update.algorithm,
-                    "use_name_entities": update.use_name_entities,
-                    "use_competing_intents": update.use_competing_intents,
-                    "use_analyze_char": update.use_analyze_char,
-                }
-            )
+            data = {
+                "version": False if update is None else True,
+                "repository_version": update.id,
+                "total_training_end": update.total_training_end,
+                "language": update.language,
+                "algorithm": update.algorithm,
+                "use_name_entities": update.use_name_entities,
+                "use_competing_intents": update.use_competing_intents,
+                "use_analyze_char": update.use_analyze_char,
+            }
         except Exception:
             return Response({}, status=400)
+        caching.set(cache_key, data, settings.REDIS_TIMEOUT)
+        return Response(data)
 
     @action(detail=True, methods=["GET"], url_name="repository_entity", lookup_field=[])
     def repository_entity(self, request, **kwargs):
@@ -309,7 +473,9 @@ class RepositoryAuthorizationParseViewSet(mixins.RetrieveModelMixin, GenericView
         )
 
 
-class RepositoryAuthorizationInfoViewSet(mixins.RetrieveModelMixin, GenericViewSet):
+class RepositoryAuthorizationInfoViewSet(
+    CachedRepositoryAuthorizationMixin, mixins.RetrieveModelMixin, GenericViewSet
+):
     queryset = RepositoryAuthorization.objects
     serializer_class = NLPSerializer
     permission_classes = [AllowAny]
@@ -321,15 +487,16 @@ class RepositoryAuthorizationInfoViewSet(mixins.RetrieveModelMixin, GenericViewS
         repository = repository_authorization.repository
 
         queryset = RepositoryExample.objects.filter(
-            repository_version_language__repository_version__repository=repository,
-            repository_version_language__repository_version__is_default=True,
+            repository=repository, is_default_version=True
         )
         serializer = repository.intents(queryset=queryset, version_default=True)
 
         return Response({"intents": serializer})
 
 
-class RepositoryAuthorizationEvaluateViewSet(mixins.RetrieveModelMixin, GenericViewSet):
+class RepositoryAuthorizationEvaluateViewSet(
+    CachedRepositoryAuthorizationMixin, mixins.RetrieveModelMixin, GenericViewSet
+):
     queryset = RepositoryAuthorization.objects
     serializer_class = NLPSerializer
     permission_classes = [AllowAny]
@@ -345,28 +512,32 @@ class RepositoryAuthorizationEvaluateViewSet(mixins.RetrieveModelMixin, GenericV
         repository = repository_authorization.repository
 
         repository_version = request.query_params.get("repository_version")
+        language = str(request.query_params.get("language"))
+
+        cache_key = info_cache_key(
+            "evaluate", repository_authorization, language, repository_version
+        )
+        data = caching.get(cache_key)
+        if data is not None:
+            return Response(data)
 
         if repository_version:
-            update = repository.get_specific_version_id(
-                repository_version, str(request.query_params.get("language"))
-            )
+            update = repository.get_specific_version_id(repository_version, language)
         else:
-            update = repository.last_trained_update(
-                str(request.query_params.get("language"))
-            )
+            update = repository.last_trained_update(language)
 
-        return Response(
-            {
-                "update": False if update is None else True,
-                "repository_version": update.pk,
-                "language": update.language,
-                "user_id": repository_authorization.user.pk,
-                "algorithm": update.algorithm,
-                "use_name_entities": update.use_name_entities,
-                "use_competing_intents": update.use_competing_intents,
-                "use_analyze_char": update.use_analyze_char,
-            }
-        )
+        data = {
+            "update": False if update is None else True,
+            "repository_version": update.pk,
+            "language": update.language,
+            "user_id": repository_authorization.user.pk,
+            "algorithm": update.algorithm,
+            "use_name_entities": update.use_name_entities,
+            "use_competing_intents": update.use_competing_intents,
+            "use_analyze_char": update.use_analyze_char,
+        }
+        caching.set(cache_key, data, settings.REDIS_TIMEOUT)
+        return Response(data)
 
     @action(detail=True, methods=["GET"], url_name="evaluations", lookup_field=[])
     def evaluations(self, request, **kwargs):
@@ -522,6 +693,80 @@ class RepositoryAuthorizationEvaluateViewSet(mixins.RetrieveModelMixin, GenericV
 
         return Response({})
 
+    @action(
+        detail=True, methods=["POST"], url_name="evaluate_results_bulk", lookup_field=[]
+    )
+    def evaluate_results_bulk(self, request, **kwargs):
+        """
+        Saves every intent and entity report of an evaluate result at once,
+        each item carries the same fields evaluate_results_intent and
+        evaluate_results_score take
+        """
+        repository_authorization = check_auth(request)
+
+        if not repository_authorization.can_contribute:
+            raise PermissionDenied()
+
+        evaluate_result = get_object_or_404(
+            RepositoryEvaluateResult.objects.select_related(
+                "repository_version_language"
+            ),
+            pk=request.data.get("evaluate_id"),
+        )
+        intents = request.data.get("intents", [])
+        entities = request.data.get("entities", [])
+
+        repository_entities = dict(
+            RepositoryEntity.objects.filter(
+                repository_version=evaluate_result.repository_version_language.repository_version_id,
+                value__in=[entity.get("entity_key") for entity in entities],
+            ).values_list("value", "pk")
+        )
+        missing = [
+            entity.get("entity_key")
+            for entity in entities
+            if entity.get("entity_key") not in repository_entities
+        ]
+        if missing:
+            raise exceptions.ValidationError(
+                {"entities": [_("Entity {} not found").format(key) for key in missing]}
+            )
+
+        with transaction.atomic():
+            scores = RepositoryEvaluateResultScore.objects.bulk_create(
+                [
+                    RepositoryEvaluateResultScore(
+                        precision=item.get("precision"),
+                        recall=item.get("recall"),
+                        f1_score=item.get("f1_score"),
+                        support=item.get("support"),
+                    )
+                    for item in intents + entities
+                ]
+            )
+            RepositoryEvaluateResultIntent.objects.bulk_create(
+                [
+                    RepositoryEvaluateResultIntent(
+                        intent=intent.get("intent_key"),
+                        evaluate_result=evaluate_result,
+                        score=score,
+                    )
+                    for intent, score in zip(intents, scores)
+                ]
+            )
+            RepositoryEvaluateResultEntity.objects.bulk_create(
+                [
+                    RepositoryEvaluateResultEntity(
+                        entity_id=repository_entities[entity.get("entity_key")],
+                        evaluate_result=evaluate_result,
+                        score=score,
+                    )
+                    for entity, score in zip(entities, scores[len(intents) :])
+                ]
+            )
+
+        return Response({"intents": len(intents), "entities": len(entities)})
+
 
 class NLPLangsViewSet(mixins.ListModelMixin, GenericViewSet):
     queryset = RepositoryAuthorization.objects
@@ -573,11 +818,14 @@ class RepositoryUpdateInterpretersViewSet(
             )
 
         try:
-            validator(str(update.get_trainer(rasa_version).bot_data))
-            bot_data = update.get_trainer(rasa_version).bot_data
+            trainer = update.get_trainer(rasa_version)
+            bot_data = trainer.artifact_url() if trainer.artifact else trainer.bot_data
+            validator(str(bot_data))
             aws = True
         except ValidationError:
-            bot_data = update.get_trainer(rasa_version).bot_data
+            if trainer.artifact:
+                with trainer.open_artifact() as artifact:
+                    bot_data = base64.b64encode(artifact.read()).decode()
         except Exception:
             bot_data = b""
 
@@ -592,6 +840,61 @@ class RepositoryUpdateInterpretersViewSet(
             }
         )
 
+    @action(detail=True, methods=["GET"], url_name="download")
+    def download(self, request, **kwargs):
+        """
+        Streams the trained model, answering 304 to an If-None-Match with its
+        ETag and a single byte range to a Range header
+        """
+        repository_authorization = check_auth(request)
+
+        if not repository_authorization.can_contribute:
+            raise PermissionDenied()
+
+        update = get_object_or_404(
+            RepositoryVersionLanguage,
+            pk=kwargs.get("pk"),
+            repository_version__repository=repository_authorization.repository,
+        )
+        rasa_version = request.query_params.get(
+            "rasa_version", settings.BOTHUB_NLP_RASA_VERSION
+        )
+        trainer = update.get_trainer(rasa_version)
+        if not trainer.artifact:
+            raise NotFound()
+
+        etag = '"{}-{}"'.format(update.total_training_end, trainer.artifact)
+        if_none_match = parse_etags(request.META.get("HTTP_IF_NONE_MATCH", ""))
+        if etag in if_none_match or "*" in if_none_match:
+            response = HttpResponseNotModified()
+            response["ETag"] = etag
+            return response
+
+        artifact = trainer.open_artifact()
+        size = artifact.size
+        try:
+            byte_range = parse_range_header(request.META.get("HTTP_RANGE"), size)
+        except ValueError:
+            artifact.close()
+            response = HttpResponse(status=416)
+            response["Content-Range"] = "bytes */{}".format(size)
+            return response
+
+        if byte_range is None:
+            response = FileResponse(artifact, content_type="application/gzip")
+        else:
+            start, end = byte_range
+            response = StreamingHttpResponse(
+                iter_file_range(artifact, start, end),
+                status=206,
+                content_type="application/gzip",
+            )
+            response["Content-Range"] = "bytes {}-{}/{}".format(start, end, size)
+            response["Content-Length"] = end - start + 1
+        response["ETag"] = etag
+        response["Accept-Ranges"] = "bytes"
+        return response
+
     def create(self, request, *args, **kwargs):
         repository_authorization = check_auth(request)
 
@@ -603,11 +906,10 @@ class RepositoryUpdateInterpretersViewSet(
             "rasa_version", settings.BOTHUB_NLP_RASA_VERSION
         )
         repository = get_object_or_404(RepositoryVersionLanguage, pk=id)
-        if settings.AWS_SEND:
-            bot_data = base64.b64decode(request.data.get("bot_data"))
-            repository.save_training(send_bot_data_file_aws(id, bot_data), rasa_version)
-        else:
-            repository.save_training(request.data.get("bot_data"), rasa_version)
+        artifact = storages.save_artifact(
+            storages.iter_base64_decoded(request.data.get("bot_data"))
+        )
+        repository.save_training("", rasa_version, artifact=artifact)
         return Response({})
 
 
@@ -616,3 +918,53 @@ class RepositoryNLPLogsViewSet(mixins.CreateModelMixin, GenericViewSet):
     serializer_class = RepositoryNLPLogSerializer
     permission_classes = [AllowAny]
     authentication_classes = [NLPAuthentication]
+
+    @action(detail=True, methods=["POST"], url_name="bulk", lookup_field=[])
+    def bulk(self, request, **kwargs):
+        """
+        Saves a list of logs at once, when NLP_LOG_WRITE_BEHIND is enabled
+        they are only buffered and saved later by the flush_nlp_logs task
+        """
+        serializer = RepositoryNLPLogBulkSerializer(data=request.data, many=True)
+        serializer.is_valid(raise_exception=True)
+        entries = serializer.validated_data
+
+        owners = dict(
+            RepositoryAuthorization.objects.filter(
+                uuid__in={entry.get("user") for entry in entries}
+            ).values_list("uuid", "user_id")
+        )
+        versions = set(
+            RepositoryVersionLanguage.objects.filter(
+                pk__in={entry.get("repository_version_language") for entry in entries}
+            ).values_list("pk", flat=True)
+        )
+        errors = []
+        for entry in entries:
+            error = {}
+            if entry.get("user") not in owners:
+                error["user"] = [_("Invalid authorization.")]
+            if entry.get("repository_version_language") not in versions:
+                error["repository_version_language"] = [_("Invalid version language.")]
+            errors.append(error)
+        if any(errors):
+            raise exceptions.ValidationError(errors)
+
+        entries = [
+            dict(
+                entry,
+                user=owners[entry.get("user")],
+                log_intent=[dict(intent) for intent in entry.get("log_intent", [])],
+            )
+            for entry in entries
+        ]
+        if settings.NLP_LOG_WRITE_BEHIND:
+            try:
+                RepositoryNLPLog.objects.buffer(entries)
+                return Response({"count": len(entries)}, status=202)
+            except RedisError:
+                # keep the logs when redis is unavailable
+                pass
+        with transaction.atomic():
+            RepositoryNLPLog.objects.bulk_ingest(entries)
+        return Response({"count": len(entries)}, status=201)
@@ -218,7 +218,9 @@ class RepositoryEntitiesFilter(filters.FilterSet):
             raise NotFound(_("Invalid repository UUID"))
 
     def filter_repository_version(self, queryset, name, value):
-        return queryset.filter(repository_version=value)
+        return queryset.filter(
+            repository_version=RepositoryVersion.source_version_of(value)
+        )
 
 
 class RepositoryQueueTaskFilter(filters.FilterSet):
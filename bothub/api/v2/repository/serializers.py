@@ -1,4 +1,5 @@
 import json
+from collections import OrderedDict
 
 from django.conf import settings
 from django.shortcuts import get_object_or_404
@@ -8,6 +9,7 @@ from rest_framework.exceptions import PermissionDenied
 
 from bothub import utils
 from bothub.api.v2.example.serializers import RepositoryExampleEntitySerializer
+from bothub.api.v2.mixins import SparseFieldsetMixin
 from bothub.api.v2.fields import (
     EntityText,
     ModelMultipleChoiceField,
@@ -16,7 +18,7 @@ from bothub.api.v2.fields import (
 )
 from bothub.authentication.models import RepositoryOwner
 from bothub.celery import app as celery_app
-from bothub.common import languages
+from bothub.common import caching, languages
 from bothub.common.languages import LANGUAGE_CHOICES
 from bothub.common.models import (
     Organization,
@@ -316,23 +318,17 @@ class RepositoryTranslatorInfoSerializer(serializers.ModelSerializer):
         }
 
     def get_intents(self, obj):
-        queryset = RepositoryExample.objects.filter(
-            repository_version_language__repository_version=obj.repository_version_language.repository_version
-        )
+        repository_version = obj.repository_version_language.repository_version
+        examples_count = repository_version.intents_examples_count()
 
         return IntentSerializer(
             map(
                 lambda intent: {
                     "value": intent.text,
                     "id": intent.pk,
-                    "examples__count": obj.repository_version_language.repository_version.repository.examples(
-                        queryset=queryset,
-                        version_default=obj.repository_version_language.repository_version.is_default,
-                    )
-                    .filter(intent=intent)
-                    .count(),
+                    "examples__count": examples_count.get(intent.pk, 0),
                 },
-                obj.repository_version_language.repository_version.version_intents.all(),
+                repository_version.version_intents.all(),
             ),
             many=True,
         ).data
@@ -437,7 +433,7 @@ class RepositoryTranslatorInfoSerializer(serializers.ModelSerializer):
         )
 
 
-class NewRepositorySerializer(serializers.ModelSerializer):
+class NewRepositorySerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     class Meta:
         model = RepositoryVersion
         fields = [
@@ -496,6 +492,33 @@ class NewRepositorySerializer(serializers.ModelSerializer):
             "count_authorizations",
             "repository_version_language",
         ]
+        user_fields = [
+            "authorization",
+            "request_authorization",
+            "available_request_authorization",
+        ]
+        field_costs = {
+            "owner": "moderate",
+            "categories": "moderate",
+            "categories_list": "moderate",
+            "groups_list": "moderate",
+            "intents": "moderate",
+            "version_default": "moderate",
+            "ready_for_parse": "moderate",
+            "repository_score": "moderate",
+            "repository_version_language": "moderate",
+            "authorization": "moderate",
+            "request_authorization": "moderate",
+            "available_request_authorization": "moderate",
+            "available_languages": "expensive",
+            "entities": "expensive",
+            "intents_list": "expensive",
+            "groups": "expensive",
+            "other_group": "expensive",
+            "examples__count": "expensive",
+            "evaluate_languages_count": "expensive",
+            "authorizations": "expensive",
+        }
         ref_name = None
 
     repository_version_id = serializers.PrimaryKeyRelatedField(
@@ -604,6 +627,41 @@ class NewRepositorySerializer(serializers.ModelSerializer):
     repository_score = serializers.SerializerMethodField(style={"show": False})
     repository_version_language = serializers.SerializerMethodField(style={"show": False})
 
+    def to_representation(self, instance):
+        """
+        Everything but the user specific fields is cached under the version
+        generation, so it is only computed again after a write to the version
+        or to its repository
+        """
+        cache_key = "repository_dashboard:{}:{}".format(
+            instance.pk, instance.generation
+        )
+        data = caching.get(cache_key)
+        if data is None:
+            data = self.represent_fields(
+                instance, lambda name: name not in self.Meta.user_fields
+            )
+            if self.get_sparse_fieldset() is None:
+                caching.set(cache_key, data, settings.REDIS_TIMEOUT)
+        data.update(
+            self.represent_fields(instance, lambda name: name in self.Meta.user_fields)
+        )
+        return OrderedDict(
+            (field.field_name, data[field.field_name])
+            for field in self._readable_fields
+        )
+
+    def represent_fields(self, instance, include):
+        data = {}
+        for field in self._readable_fields:
+            if not include(field.field_name):
+                continue
+            attribute = field.get_attribute(instance)
+            data[field.field_name] = (
+                None if attribute is None else field.to_representation(attribute)
+            )
+        return data
+
     def get_authorizations(self, obj):
         auths = RepositoryAuthorization.objects.filter(
             repository=obj.repository
@@ -621,30 +679,37 @@ class NewRepositorySerializer(serializers.ModelSerializer):
                 repositoryversionlanguage__repository_version=obj
             )
             .exclude(bot_data__isnull=True)
-            .exclude(bot_data__exact="")
+            .exclude(bot_data__exact="", artifact__exact="")
         )
         return True if q.count() > 0 else False
 
     def get_available_languages(self, obj):
+        version = obj.source_version
         queryset = RepositoryExample.objects.filter(
-            repository_version_language__repository_version=obj
+            repository_version_language__repository_version=version
         )
-        return obj.repository.available_languages(
-            queryset=queryset, version_default=obj.is_default
+        return version.repository.available_languages(
+            queryset=queryset, version_default=version.is_default
         )
 
     def get_entities(self, obj):
+        version = obj.source_version
         queryset = RepositoryExample.objects.filter(
-            repository_version_language__repository_version=obj
+            repository_version_language__repository_version=version
         )
-        return (
-            obj.current_entities(queryset=queryset, version_default=obj.is_default)
+        return list(
+            version.current_entities(
+                queryset=queryset, version_default=version.is_default
+            )
             .values("value", "id")
             .distinct()
         )
 
     def get_groups_list(self, obj):
-        return obj.groups.distinct().values_list("value", flat=True).distinct()
+        version = obj.source_version
+        return list(
+            version.groups.distinct().values_list("value", flat=True).distinct()
+        )
 
     def get_owner(self, obj):
         return {
@@ -653,41 +718,40 @@ class NewRepositorySerializer(serializers.ModelSerializer):
         }
 
     def get_intents(self, obj):
-        queryset = RepositoryExample.objects.filter(
-            repository_version_language__repository_version=obj
-        )
+        version = obj.source_version
+        examples_count = version.intents_examples_count()
 
         return IntentSerializer(
             map(
                 lambda intent: {
                     "value": intent.text,
                     "id": intent.pk,
-                    "examples__count": obj.repository.examples(
-                        queryset=queryset, version_default=obj.is_default
-                    )
-                    .filter(intent=intent)
-                    .count(),
+                    "examples__count": examples_count.get(intent.pk, 0),
                 },
-                obj.version_intents.all(),
+                version.version_intents.all(),
             ),
             many=True,
         ).data
 
     def get_intents_list(self, obj):
+        version = obj.source_version
         queryset = RepositoryExample.objects.filter(
-            repository_version_language__repository_version=obj
+            repository_version_language__repository_version=version
+        )
+        return version.repository.intents(
+            queryset=queryset, version_default=version.is_default
         )
-        return obj.repository.intents(queryset=queryset, version_default=obj.is_default)
 
     def get_categories_list(self, obj):
         return RepositoryCategorySerializer(obj.repository.categories, many=True).data
 
     def get_groups(self, obj):
+        version = obj.source_version
         queryset = RepositoryExample.objects.filter(
-            repository_version_language__repository_version=obj
+            repository_version_language__repository_version=version
         )
 
-        current_groups = obj.groups.distinct()
+        current_groups = version.groups.distinct()
 
         return list(
             map(
@@ -699,7 +763,7 @@ class NewRepositorySerializer(serializers.ModelSerializer):
                         map(
                             lambda e: {"entity_id": e.pk, "value": e.value},
                             group.other_entities(
-                                queryset=queryset, version_default=obj.is_default
+                                queryset=queryset, version_default=version.is_default
                             )
                             if group.value == "other"
                             else group.entities.all(),
@@ -707,14 +771,14 @@ class NewRepositorySerializer(serializers.ModelSerializer):
                     ),
                     "examples__count": (
                         group.repository.examples(
-                            queryset=queryset, version_default=obj.is_default
+                            queryset=queryset, version_default=version.is_default
                         )
                         .filter(entities__entity__in=group.other_entities())
                         .count()
                     )
                     if group.value == "other"
                     else group.examples(
-                        queryset=queryset, version_default=obj.is_default
+                        queryset=queryset, version_default=version.is_default
                     ).count(),
                 },
                 current_groups,
@@ -722,21 +786,24 @@ class NewRepositorySerializer(serializers.ModelSerializer):
         )
 
     def get_other_group(self, obj):
+        version = obj.source_version
         queryset = RepositoryExample.objects.filter(
-            repository_version_language__repository_version=obj
+            repository_version_language__repository_version=version
         )
 
-        group = obj.other_entities(queryset=queryset, version_default=obj.is_default)
+        group = version.other_entities(
+            queryset=queryset, version_default=version.is_default
+        )
 
         return {
-            "repository": obj.repository.pk,
+            "repository": version.repository.pk,
             "value": "other",
             "entities": list(
                 map(lambda e: {"entity_id": e.pk, "value": e.value}, group)
             ),
             "examples__count": (
-                obj.repository.examples(
-                    queryset=queryset, version_default=obj.is_default
+                version.repository.examples(
+                    queryset=queryset, version_default=version.is_default
                 )
                 .filter(entities__entity__in=group)
                 .count()
@@ -744,30 +811,34 @@ class NewRepositorySerializer(serializers.ModelSerializer):
         }
 
     def get_examples__count(self, obj):
+        version = obj.source_version
         queryset = RepositoryExample.objects.filter(
-            repository_version_language__repository_version=obj
+            repository_version_language__repository_version=version
         )
-        return obj.repository.examples(
-            queryset=queryset, version_default=obj.is_default
+        return version.repository.examples(
+            queryset=queryset, version_default=version.is_default
         ).count()
 
     def get_evaluate_languages_count(self, obj):
+        version = obj.source_version
         queryset = RepositoryEvaluate.objects.filter(
-            repository_version_language__repository_version=obj
+            repository_version_language__repository_version=version
         )
         return dict(
             map(
                 lambda x: (
                     x,
-                    obj.repository.evaluations(
-                        language=x, queryset=queryset, version_default=obj.is_default
+                    version.repository.evaluations(
+                        language=x,
+                        queryset=queryset,
+                        version_default=version.is_default,
                     ).count(),
                 ),
-                obj.repository.available_languages(
+                version.repository.available_languages(
                     queryset=RepositoryExample.objects.filter(
-                        repository_version_language__repository_version=obj
+                        repository_version_language__repository_version=version
                     ),
-                    version_default=obj.is_default,
+                    version_default=version.is_default,
                 ),
             )
         )
@@ -846,10 +917,11 @@ class NewRepositorySerializer(serializers.ModelSerializer):
         return settings.BOTHUB_NLP_BASE_URL
 
     def get_version_default(self, obj):
+        current_version = obj.repository.current_version()
         return {
-            "id": obj.repository.current_version().repository_version.pk,
-            "repository_version_language_id": obj.repository.current_version().pk,
-            "name": obj.repository.current_version().repository_version.name,
+            "id": current_version.repository_version.pk,
+            "repository_version_language_id": current_version.pk,
+            "name": current_version.repository_version.name,
         }
 
     def get_repository_score(self, obj):
@@ -857,10 +929,10 @@ class NewRepositorySerializer(serializers.ModelSerializer):
         return RepositoryScoreSerializer(score).data
 
     def get_repository_version_language(self, obj):
-        return obj.repositoryversionlanguage_set.all().values("id", "language")
+        return list(obj.repositoryversionlanguage_set.all().values("id", "language"))
 
 
-class RepositoryTrainInfoSerializer(serializers.ModelSerializer):
+class RepositoryTrainInfoSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     class Meta:
         model = RepositoryVersion
         fields = [
@@ -871,6 +943,11 @@ class RepositoryTrainInfoSerializer(serializers.ModelSerializer):
             "languages_warnings",
         ]
         read_only = fields
+        field_costs = {
+            "ready_for_train": "expensive",
+            "requirements_to_train": "expensive",
+            "languages_warnings": "expensive",
+        }
         ref_name = None
 
     repository_version_id = serializers.PrimaryKeyRelatedField(
@@ -885,7 +962,7 @@ class RepositoryTrainInfoSerializer(serializers.ModelSerializer):
 
     def get_ready_for_train(self, obj):
         queryset = RepositoryExample.objects.filter(
-            repository_version_language__repository_version=obj
+            repository_version_language__repository_version=obj.source_version
         )
         return obj.repository.ready_for_train(
             queryset=queryset, repository_version=obj.pk
@@ -893,7 +970,7 @@ class RepositoryTrainInfoSerializer(serializers.ModelSerializer):
 
     def get_requirements_to_train(self, obj):
         queryset = RepositoryExample.objects.filter(
-            repository_version_language__repository_version=obj
+            repository_version_language__repository_version=obj.source_version
         )
         return dict(
             filter(
@@ -911,7 +988,7 @@ class RepositoryTrainInfoSerializer(serializers.ModelSerializer):
 
     def get_languages_warnings(self, obj):
         queryset = RepositoryExample.objects.filter(
-            repository_version_language__repository_version=obj
+            repository_version_language__repository_version=obj.source_version
         )
 
         return dict(
@@ -929,7 +1006,7 @@ class RepositoryTrainInfoSerializer(serializers.ModelSerializer):
         )
 
 
-class RepositorySerializer(serializers.ModelSerializer):
+class RepositorySerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     class Meta:
         model = Repository
         fields = [
@@ -951,6 +1028,11 @@ class RepositorySerializer(serializers.ModelSerializer):
             "organization",
         ]
         read_only = ["uuid", "created_at"]
+        field_costs = {
+            "owner__nickname": "moderate",
+            "categories": "moderate",
+            "categories_list": "moderate",
+        }
         ref_name = None
 
     uuid = serializers.UUIDField(style={"show": False}, read_only=True)
@@ -1115,7 +1197,7 @@ class RepositoryVotesSerializer(serializers.ModelSerializer):
         return vote
 
 
-class ShortRepositorySerializer(serializers.ModelSerializer):
+class ShortRepositorySerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     class Meta:
         model = Repository
         fields = [
@@ -1306,9 +1388,9 @@ class RepositoryExampleSerializer(serializers.ModelSerializer):
             if RepositoryExample.objects.filter(
                 text=validated_data.get("text"),
                 intent__text=validated_data.get("intent"),
-                repository_version_language__repository_version__repository=repository,
-                repository_version_language__repository_version=version_id,
-                repository_version_language__language=language,
+                repository=repository,
+                repository_version=repository_version_language.repository_version.source_version,
+                language=language,
             ):
                 raise APIExceptionCustom(
                     detail=_("Intention and Sentence already exists")
@@ -1320,8 +1402,8 @@ class RepositoryExampleSerializer(serializers.ModelSerializer):
                 text=validated_data.get("text"),
                 intent__text=validated_data.get("intent"),
                 repository_version_language=repository_version_language,
-                repository_version_language__repository_version__is_default=True,
-                repository_version_language__language=language,
+                is_default_version=True,
+                language=language,
             ):
                 raise APIExceptionCustom(
                     detail=_("Intention and Sentence already exists")
@@ -1559,6 +1641,7 @@ class RepositoryQueueTaskSerializer(serializers.ModelSerializer):
             "from_queue_codes",
             "type_processing",
             "processing_codes",
+            "progress",
         ]
         ref_name = None
 
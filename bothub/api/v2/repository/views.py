@@ -42,6 +42,7 @@ from bothub.common.models import (
     RepositoryVersion,
     RepositoryVote,
     RequestRepositoryAuthorization,
+    bulk_ingest,
 )
 
 from ..metadata import Metadata
@@ -96,7 +97,26 @@ from .serializers import (
     WordDistributionSerializer,
 )
 
+sparse_fieldset_parameters = [
+    openapi.Parameter(
+        "fields",
+        openapi.IN_QUERY,
+        description="Comma separated fields to return, the others are not computed",
+        type=openapi.TYPE_STRING,
+    ),
+    openapi.Parameter(
+        "omit",
+        openapi.IN_QUERY,
+        description="Comma separated fields to leave out of the response",
+        type=openapi.TYPE_STRING,
+    ),
+]
+
 
+@method_decorator(
+    name="retrieve",
+    decorator=swagger_auto_schema(manual_parameters=sparse_fieldset_parameters),
+)
 class NewRepositoryViewSet(
     MultipleFieldLookupMixin, mixins.RetrieveModelMixin, GenericViewSet
 ):
@@ -196,6 +216,10 @@ class NewRepositoryViewSet(
         return Response({"id_queue": task.task_id})
 
 
+@method_decorator(
+    name="retrieve",
+    decorator=swagger_auto_schema(manual_parameters=sparse_fieldset_parameters),
+)
 class RepositoryTrainInfoViewSet(
     MultipleFieldLookupMixin, mixins.RetrieveModelMixin, GenericViewSet
 ):
@@ -519,6 +543,10 @@ class RepositoryMigrateViewSet(mixins.CreateModelMixin, GenericViewSet):
     metadata_class = Metadata
 
 
+@method_decorator(
+    name="list",
+    decorator=swagger_auto_schema(manual_parameters=sparse_fieldset_parameters),
+)
 class RepositoriesViewSet(mixins.ListModelMixin, GenericViewSet):
     """
     List all public repositories.
@@ -585,6 +613,7 @@ class RepositoryCategoriesView(mixins.ListModelMixin, GenericViewSet):
                 type=openapi.TYPE_STRING,
             )
         ]
+        + sparse_fieldset_parameters
     ),
 )
 class SearchRepositoriesViewSet(mixins.ListModelMixin, GenericViewSet):
@@ -819,25 +848,27 @@ class RepositoryExampleViewSet(
         count_added = 0
         not_added = []
 
-        for data in json_data:
-            response_data = data
-            response_data["repository"] = request.data.get("repository")
-            response_data["repository_version"] = repository_version.pk
+        with bulk_ingest():
+            for data in json_data:
+                response_data = data
+                response_data["repository"] = request.data.get("repository")
+                response_data["repository_version"] = repository_version.pk
 
-            intent, created = RepositoryIntent.objects.get_or_create(
-                text=response_data.get("intent"), repository_version=repository_version
-            )
+                intent, created = RepositoryIntent.objects.get_or_create(
+                    text=response_data.get("intent"),
+                    repository_version=repository_version,
+                )
 
-            response_data.update({"intent": intent.pk})
+                response_data.update({"intent": intent.pk})
 
-            serializer = RepositoryExampleSerializer(
-                data=response_data, context={"request": request}
-            )
-            if serializer.is_valid():
-                serializer.save()
-                count_added += 1
-            else:
-                not_added.append(data)
+                serializer = RepositoryExampleSerializer(
+                    data=response_data, context={"request": request}
+                )
+                if serializer.is_valid():
+                    serializer.save()
+                    count_added += 1
+                else:
+                    not_added.append(data)
 
         return Response({"added": count_added, "not_added": not_added})
 
@@ -936,26 +967,30 @@ class RasaUploadViewSet(
         serializer_rasa = RasaSerializer(data=json.load(request.data.get("file")))
         serializer_rasa.is_valid(raise_exception=True)
 
-        for example in serializer_rasa.data.get("rasa_nlu_data", {}).get(
-            "common_examples", []
-        ):
-            if RepositoryExample.objects.filter(
-                repository_version_language__repository_version=kwargs.get("pk"),
-                text=example["text"],
-                intent__text=example["intent"],
-                repository_version_language__language=serializer.data.get("language"),
-            ).count():
-                continue
-
-            example["repository"] = kwargs.get("repository__uuid")
-            example["repository_version"] = kwargs.get("pk")
-            example["language"] = serializer.data.get("language")
-
-            serializer_example = RepositoryExampleSerializer(
-                data=example, context={"request": request}
-            )
-            if serializer_example.is_valid():
-                serializer_example.save()
+        with bulk_ingest():
+            for example in serializer_rasa.data.get("rasa_nlu_data", {}).get(
+                "common_examples", []
+            ):
+                # the first example saved stops the version sharing its parent
+                if RepositoryExample.objects.filter(
+                    repository_version=RepositoryVersion.source_version_of(
+                        kwargs.get("pk")
+                    ),
+                    text=example["text"],
+                    intent__text=example["intent"],
+                    language=serializer.data.get("language"),
+                ).exists():
+                    continue
+
+                example["repository"] = kwargs.get("repository__uuid")
+                example["repository_version"] = kwargs.get("pk")
+                example["language"] = serializer.data.get("language")
+
+                serializer_example = RepositoryExampleSerializer(
+                    data=example, context={"request": request}
+                )
+                if serializer_example.is_valid():
+                    serializer_example.save()
 
         return Response(202)
 
@@ -214,6 +214,36 @@ class NewEvaluateTestCase(TestCase):
 
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
 
+    def test_shared_version(self):
+        RepositoryEvaluate.objects.create(
+            repository_version_language=self.repository_version_language,
+            text="haha",
+            intent="greet",
+        )
+        child = RepositoryVersion.objects.create(
+            repository=self.repository,
+            name="child",
+            is_default=False,
+            parent=self.repository_version,
+        )
+        data = {
+            "repository": str(self.repository.uuid),
+            "text": "haha",
+            "language": languages.LANGUAGE_EN,
+            "repository_version": child.pk,
+            "intent": "greet",
+            "entities": [],
+        }
+        response, content_data = self.request(data, self.owner_token)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        data["text"] = "hehe"
+        response, content_data = self.request(data, self.owner_token)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(
+            RepositoryEvaluate.objects.filter(repository_version=child).count(), 2
+        )
+
     def test_intent(self):
         response, content_data = self.request(
             {
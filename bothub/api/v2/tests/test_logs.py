@@ -1,7 +1,10 @@
 import json
 
+from django.db import IntegrityError
 from django.test import RequestFactory
 from django.test import TestCase
+from django.test.utils import override_settings
+from django_redis import get_redis_connection
 from rest_framework import status
 
 from bothub.api.v2.nlp.views import RepositoryNLPLogsViewSet
@@ -16,6 +19,8 @@ from bothub.common.models import (
     RepositoryIntent,
 )
 from bothub.common.models import RepositoryExample
+from bothub.common.models import RepositoryReports
+from bothub.common.tasks import flush_nlp_logs
 
 
 class RepositoryNLPLogTestCase(TestCase):
@@ -92,6 +97,128 @@ class RepositoryNLPLogTestCase(TestCase):
         self.assertEqual(data.get("language"), content_data.get("language"))
 
 
+class RepositoryNLPLogBulkTestCase(TestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+
+        self.owner, self.owner_token = create_user_and_token("owner")
+
+        self.repository = Repository.objects.create(
+            owner=self.owner,
+            name="Testing",
+            slug="test",
+            language=languages.LANGUAGE_EN,
+        )
+
+        self.repository_auth = RepositoryAuthorization.objects.create(
+            user=self.owner, repository=self.repository, role=3
+        )
+
+    def request(self, data):
+        request = self.factory.post(
+            "/v2/repository/nlp/log/bulk/",
+            json.dumps(data),
+            content_type="application/json",
+        )
+        response = RepositoryNLPLogsViewSet.as_view({"post": "bulk"})(request)
+        response.render()
+        content_data = json.loads(response.content)
+        return (response, content_data)
+
+    def log(self, text, **kwargs):
+        return dict(
+            {
+                "text": text,
+                "user_agent": "python-requests/2.20.1",
+                "from_backend": False,
+                "user": str(self.repository_auth.pk),
+                "repository_version_language": int(
+                    self.repository.current_version().pk
+                ),
+                "nlp_log": "{}",
+                "log_intent": [
+                    {"intent": "greet", "confidence": 0.9, "is_default": True},
+                    {"intent": "bye", "confidence": 0.1, "is_default": False},
+                ],
+            },
+            **kwargs
+        )
+
+    def test_okay(self):
+        response, content_data = self.request([self.log("hi"), self.log("bye")])
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(content_data.get("count"), 2)
+
+        logs = RepositoryNLPLog.objects.filter(
+            repository_version_language=self.repository.current_version()
+        )
+        self.assertEqual(logs.count(), 2)
+        self.assertEqual(
+            RepositoryNLPLogIntent.objects.filter(repository_nlp_log__in=logs).count(),
+            4,
+        )
+        report = RepositoryReports.objects.get(
+            repository_version_language=self.repository.current_version(),
+            user=self.owner,
+        )
+        self.assertEqual(report.count_reports, 2)
+
+        self.request([self.log("hello")])
+        report.refresh_from_db()
+        self.assertEqual(report.count_reports, 3)
+
+    def test_invalid_authorization(self):
+        response, content_data = self.request(
+            [self.log("hi"), self.log("bye", user=str(self.repository.uuid))]
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("user", content_data[1])
+        self.assertFalse(RepositoryNLPLog.objects.exists())
+
+    def buffered(self, text, **kwargs):
+        return json.dumps(
+            dict(
+                self.log(text, user=self.owner.pk, **kwargs),
+                created_at="2020-01-02T10:00:00+00:00",
+            )
+        )
+
+    def test_write_behind(self):
+        redis = get_redis_connection("default")
+        redis.delete(RepositoryNLPLog.objects.BUFFER_KEY)
+        with override_settings(NLP_LOG_WRITE_BEHIND=True):
+            response, content_data = self.request([self.log("hi")])
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertFalse(RepositoryNLPLog.objects.exists())
+        redis.rpush(
+            RepositoryNLPLog.objects.BUFFER_KEY,
+            self.buffered("bye"),
+            self.buffered("gone", repository_version_language=0),
+        )
+
+        self.assertEqual(flush_nlp_logs(), 3)
+        self.assertEqual(redis.llen(RepositoryNLPLog.objects.BUFFER_KEY), 0)
+        self.assertEqual(RepositoryNLPLog.objects.count(), 2)
+        log = RepositoryNLPLog.objects.get(text="bye")
+        self.assertEqual(log.created_at.isoformat(), "2020-01-02T10:00:00+00:00")
+        report = RepositoryReports.objects.get(
+            repository_version_language=self.repository.current_version(),
+            user=self.owner,
+            report_date=log.created_at.date(),
+        )
+        self.assertEqual(report.count_reports, 1)
+
+    def test_write_behind_failure_keeps_buffer(self):
+        redis = get_redis_connection("default")
+        redis.delete(RepositoryNLPLog.objects.BUFFER_KEY)
+        redis.rpush(RepositoryNLPLog.objects.BUFFER_KEY, self.buffered(None))
+
+        with self.assertRaises(IntegrityError):
+            flush_nlp_logs()
+        self.assertEqual(redis.llen(RepositoryNLPLog.objects.BUFFER_KEY), 1)
+        redis.delete(RepositoryNLPLog.objects.BUFFER_KEY)
+
+
 class ListRepositoryNLPLogTestCase(TestCase):
     def setUp(self):
         self.factory = RequestFactory()
@@ -1,19 +1,36 @@
+import base64
+import gzip
 import json
+import os
 import uuid
 
+from django.conf import settings
+from django.db import connection
 from django.test import TestCase
 from django.test import RequestFactory
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
 from rest_framework import status
 
 from bothub.api.v2.nlp.views import RepositoryAuthorizationTrainViewSet
+from bothub.api.v2.nlp.views import RepositoryAuthorizationTrainLanguagesViewSet
 from bothub.api.v2.nlp.views import RepositoryAuthorizationInfoViewSet
+from bothub.api.v2.nlp.views import RepositoryAuthorizationParseViewSet
+from bothub.api.v2.nlp.views import RepositoryAuthorizationEvaluateViewSet
+from bothub.api.v2.nlp.views import RepositoryUpdateInterpretersViewSet
 from bothub.common import languages
 from bothub.common.models import (
     RepositoryAuthorization,
+    RepositoryQueueTask,
     RepositoryVersion,
     RepositoryVersionLanguage,
     RepositoryIntent,
+    RepositoryTranslatedExample,
+    RepositoryTranslatedExampleEntity,
 )
+from bothub.common.models import RepositoryEntity
+from bothub.common.models import RepositoryEvaluateResult
+from bothub.common.models import RepositoryEvaluateResultScore
 from bothub.common.models import RepositoryExample
 from bothub.common.models import RepositoryExampleEntity
 from bothub.common.models import Repository
@@ -73,12 +90,218 @@ class TrainStartTrainingTestCase(TestCase):
     def test_ok(self):
         response, content_data = self.request(str(self.repository_authorization.uuid))
         self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(content_data.get("training_fingerprint")), 64)
+
+    def test_training_snapshot(self):
+        response, content_data = self.request(str(self.repository_authorization.uuid))
+
+        authorization_header = {
+            "HTTP_AUTHORIZATION": "Bearer {}".format(
+                str(self.repository_authorization.uuid)
+            )
+        }
+        request = self.factory.get(
+            "/v2/repository/nlp/authorization/train/training_snapshot/",
+            {"repository_version": self.repository_version_language.pk},
+            **authorization_header
+        )
+        response = RepositoryAuthorizationTrainViewSet.as_view(
+            {"get": "training_snapshot"}
+        )(request)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertEqual(
+            response["ETag"], '"{}"'.format(content_data.get("training_fingerprint"))
+        )
+        snapshot = json.loads(
+            gzip.decompress(b"".join(response.streaming_content)).decode()
+        )
+        self.assertEqual(snapshot.get("algorithm"), self.repository.algorithm)
+        self.assertEqual(snapshot.get("examples"), [])
+
+    def test_training_snapshot_other_repository(self):
+        self.request(str(self.repository_authorization.uuid))
+        other_authorization = RepositoryAuthorization.objects.create(
+            user=self.user,
+            repository=Repository.objects.create(
+                owner=self.owner,
+                name="Other",
+                slug="other",
+                language=languages.LANGUAGE_EN,
+            ),
+            role=3,
+        )
+        request = self.factory.get(
+            "/v2/repository/nlp/authorization/train/training_snapshot/",
+            {"repository_version": self.repository_version_language.pk},
+            HTTP_AUTHORIZATION="Bearer {}".format(other_authorization.uuid),
+        )
+        response = RepositoryAuthorizationTrainViewSet.as_view(
+            {"get": "training_snapshot"}
+        )(request)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
 
     def test_not_auth(self):
         response, content_data = self.request(str(uuid.uuid4()))
         self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
 
 
+class TrainExportExamplesTestCase(TestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+
+        self.owner, self.owner_token = create_user_and_token("owner")
+        self.user, self.user_token = create_user_and_token()
+
+        self.repository = Repository.objects.create(
+            owner=self.owner,
+            name="Testing",
+            slug="test",
+            language=languages.LANGUAGE_EN,
+        )
+
+        self.repository_authorization = RepositoryAuthorization.objects.create(
+            user=self.user, repository=self.repository, role=3
+        )
+
+        self.repository_version_language = self.repository.current_version()
+
+        self.example_intent_1 = RepositoryIntent.objects.create(
+            text="greet",
+            repository_version=self.repository_version_language.repository_version,
+        )
+
+        self.example = RepositoryExample.objects.create(
+            repository_version_language=self.repository_version_language,
+            text="my name is user",
+            intent=self.example_intent_1,
+        )
+        entity = RepositoryExampleEntity.objects.create(
+            repository_example=self.example, start=11, end=15, entity="name"
+        )
+        entity.entity.set_group("person")
+        entity.entity.save()
+
+        self.translated = RepositoryTranslatedExample.objects.create(
+            original_example=self.example,
+            language=languages.LANGUAGE_PT,
+            text="meu nome é user",
+        )
+        RepositoryTranslatedExampleEntity.objects.create(
+            repository_translated_example=self.translated,
+            start=11,
+            end=15,
+            entity="name",
+        )
+
+    def request(self, token, repository_version_language):
+        authorization_header = {"HTTP_AUTHORIZATION": "Bearer {}".format(token)}
+        request = self.factory.get(
+            "/v2/repository/nlp/authorization/train/export_examples/",
+            {"repository_version": repository_version_language.pk},
+            **authorization_header
+        )
+        response = RepositoryAuthorizationTrainViewSet.as_view(
+            {"get": "export_examples"}
+        )(request)
+        if not response.streaming:
+            response.render()
+            return (response, json.loads(response.content))
+        content_data = [
+            json.loads(line)
+            for line in b"".join(response.streaming_content).decode().splitlines()
+        ]
+        return (response, content_data)
+
+    def test_other_repository(self):
+        other_authorization = RepositoryAuthorization.objects.create(
+            user=self.user,
+            repository=Repository.objects.create(
+                owner=self.owner,
+                name="Other",
+                slug="other",
+                language=languages.LANGUAGE_EN,
+            ),
+            role=3,
+        )
+        response, content_data = self.request(
+            str(other_authorization.uuid), self.repository_version_language
+        )
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_okay(self):
+        response, content_data = self.request(
+            str(self.repository_authorization.uuid), self.repository_version_language
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        self.assertEqual(
+            content_data,
+            [
+                {
+                    "text": "my name is user",
+                    "intent": "greet",
+                    "entities": [
+                        {
+                            "start": 11,
+                            "end": 15,
+                            "value": "user",
+                            "entity": "name",
+                            "role": "person",
+                        }
+                    ],
+                }
+            ],
+        )
+
+    def test_translation(self):
+        response, content_data = self.request(
+            str(self.repository_authorization.uuid),
+            self.repository.current_version(languages.LANGUAGE_PT),
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(content_data), 1)
+        self.assertEqual(content_data[0].get("text"), "meu nome é user")
+        self.assertEqual(content_data[0].get("intent"), "greet")
+        self.assertEqual(content_data[0].get("entities")[0].get("value"), "user")
+
+    def test_fixed_number_of_queries(self):
+        # warm the token cache so both requests authenticate the same way
+        self.request(
+            str(self.repository_authorization.uuid), self.repository_version_language
+        )
+        with CaptureQueriesContext(connection) as small:
+            self.request(
+                str(self.repository_authorization.uuid),
+                self.repository_version_language,
+            )
+
+        for i in range(10):
+            example = RepositoryExample.objects.create(
+                repository_version_language=self.repository_version_language,
+                text="hi user {}".format(i),
+                intent=self.example_intent_1,
+            )
+            RepositoryExampleEntity.objects.create(
+                repository_example=example, start=3, end=7, entity="name"
+            )
+
+        with CaptureQueriesContext(connection) as large:
+            response, content_data = self.request(
+                str(self.repository_authorization.uuid),
+                self.repository_version_language,
+            )
+
+        self.assertEqual(len(content_data), 11)
+        self.assertEqual(len(small.captured_queries), len(large.captured_queries))
+
+    def test_not_auth(self):
+        response, content_data = self.request(
+            str(uuid.uuid4()), self.repository_version_language
+        )
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
 class TrainFailTestCase(TestCase):
     def setUp(self):
         self.factory = RequestFactory()
@@ -136,6 +359,91 @@ class TrainFailTestCase(TestCase):
         self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
 
 
+class TrainTaskStatusTestCase(TestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+
+        self.owner, self.owner_token = create_user_and_token("owner")
+        self.user, self.user_token = create_user_and_token()
+
+        self.repository = Repository.objects.create(
+            owner=self.owner,
+            name="Testing",
+            slug="test",
+            language=languages.LANGUAGE_EN,
+        )
+
+        self.repository_authorization = RepositoryAuthorization.objects.create(
+            user=self.user, repository=self.repository, role=3
+        )
+
+        self.task = self.repository.current_version().create_task(
+            id_queue="task-1",
+            from_queue=RepositoryQueueTask.QUEUE_CELERY,
+            type_processing=RepositoryQueueTask.TYPE_PROCESSING_TRAINING,
+        )
+
+    def request(self, data, token):
+        authorization_header = {"HTTP_AUTHORIZATION": "Bearer {}".format(token)}
+        request = self.factory.post(
+            "/v2/repository/nlp/authorization/train/task_status/",
+            json.dumps(data),
+            content_type="application/json",
+            **authorization_header
+        )
+        response = RepositoryAuthorizationTrainViewSet.as_view({"post": "task_status"})(
+            request
+        )
+        response.render()
+        content_data = json.loads(response.content)
+        return (response, content_data)
+
+    def test_okay(self):
+        response, content_data = self.request(
+            {
+                "task_id": "task-1",
+                "status": RepositoryQueueTask.STATUS_SUCCESS,
+                "ml_units": 1.5,
+            },
+            str(self.repository_authorization.uuid),
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.task.refresh_from_db()
+        self.assertEqual(self.task.status, RepositoryQueueTask.STATUS_SUCCESS)
+        self.assertEqual(self.task.ml_units, 1.5)
+        self.assertIsNotNone(self.task.end_training)
+        self.assertIsNotNone(self.task.reported_at)
+
+    def test_other_repository_task(self):
+        repository = Repository.objects.create(
+            owner=self.owner, name="Other", slug="other", language=languages.LANGUAGE_EN
+        )
+        repository_authorization = RepositoryAuthorization.objects.create(
+            user=self.user, repository=repository, role=3
+        )
+        response, content_data = self.request(
+            {"task_id": "task-1", "status": RepositoryQueueTask.STATUS_FAILED},
+            str(repository_authorization.uuid),
+        )
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.task.refresh_from_db()
+        self.assertEqual(self.task.status, RepositoryQueueTask.STATUS_PENDING)
+
+    def test_invalid_status(self):
+        response, content_data = self.request(
+            {"task_id": "task-1", "status": 10}, str(self.repository_authorization.uuid)
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("status", content_data.keys())
+
+    def test_not_auth(self):
+        response, content_data = self.request(
+            {"task_id": "task-1", "status": RepositoryQueueTask.STATUS_SUCCESS},
+            str(uuid.uuid4()),
+        )
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
 class AuthorizationInfoTestCase(TestCase):
     def setUp(self):
         self.factory = RequestFactory()
@@ -198,3 +506,454 @@ class AuthorizationInfoTestCase(TestCase):
     def test_not_auth(self):
         response, content_data = self.request(str(uuid.uuid4()))
         self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+
+@override_settings(
+    CACHES={
+        "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+        "local": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+    }
+)
+class AuthorizationParseTestCase(TestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+
+        self.owner, self.owner_token = create_user_and_token("owner")
+        self.user, self.user_token = create_user_and_token()
+
+        self.repository = Repository.objects.create(
+            owner=self.owner,
+            name="Testing",
+            slug="test",
+            language=languages.LANGUAGE_EN,
+        )
+
+        self.repository_authorization = RepositoryAuthorization.objects.create(
+            user=self.user, repository=self.repository, role=3
+        )
+
+        self.repository_version = RepositoryVersion.objects.create(
+            repository=self.repository, name="test"
+        )
+
+        self.repository_version_language = RepositoryVersionLanguage.objects.create(
+            repository_version=self.repository_version,
+            language=languages.LANGUAGE_EN,
+            algorithm="neural_network_internal",
+        )
+
+    def request(self, token):
+        authorization_header = {"HTTP_AUTHORIZATION": "Bearer {}".format(token)}
+        request = self.factory.get(
+            "/v2/repository/nlp/authorization/parse/{}/".format(token),
+            {
+                "language": languages.LANGUAGE_EN,
+                "repository_version": self.repository_version.pk,
+            },
+            **authorization_header
+        )
+        response = RepositoryAuthorizationParseViewSet.as_view({"get": "retrieve"})(
+            request, pk=token
+        )
+        response.render()
+        content_data = json.loads(response.content)
+        return (response, content_data)
+
+    def test_ok(self):
+        response, content_data = self.request(str(self.repository_authorization.uuid))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            content_data.get("repository_version"), self.repository_version_language.pk
+        )
+        self.assertEqual(content_data.get("total_training_end"), 0)
+
+    def test_cached(self):
+        self.request(str(self.repository_authorization.uuid))
+        with self.assertNumQueries(0):
+            response, content_data = self.request(
+                str(self.repository_authorization.uuid)
+            )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_invalidated_on_save_training(self):
+        self.request(str(self.repository_authorization.uuid))
+        self.repository_version_language.save_training(b"", "1.10.6")
+        response, content_data = self.request(str(self.repository_authorization.uuid))
+        self.assertEqual(content_data.get("total_training_end"), 1)
+
+    def test_not_auth(self):
+        response, content_data = self.request(str(uuid.uuid4()))
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+
+class UpdateInterpretersTestCase(TestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+
+        self.owner, self.owner_token = create_user_and_token("owner")
+        self.user, self.user_token = create_user_and_token()
+
+        self.repository = Repository.objects.create(
+            owner=self.owner,
+            name="Testing",
+            slug="test",
+            language=languages.LANGUAGE_EN,
+        )
+
+        self.repository_authorization = RepositoryAuthorization.objects.create(
+            user=self.user, repository=self.repository, role=3
+        )
+
+        self.repository_version = RepositoryVersion.objects.create(
+            repository=self.repository, name="test"
+        )
+
+        self.repository_version_language = RepositoryVersionLanguage.objects.create(
+            repository_version=self.repository_version,
+            language=languages.LANGUAGE_EN,
+            algorithm="neural_network_internal",
+        )
+        self.bot_data = base64.b64encode(b"trained model").decode()
+
+    def request_create(self, token, version_language):
+        authorization_header = {"HTTP_AUTHORIZATION": "Bearer {}".format(token)}
+        request = self.factory.post(
+            "/v2/repository/nlp/update_interpreters/",
+            json.dumps(
+                {
+                    "id": version_language.pk,
+                    "bot_data": self.bot_data,
+                    "rasa_version": settings.BOTHUB_NLP_RASA_VERSION,
+                }
+            ),
+            content_type="application/json",
+            **authorization_header
+        )
+        response = RepositoryUpdateInterpretersViewSet.as_view({"post": "create"})(
+            request
+        )
+        response.render()
+        return response
+
+    def request_retrieve(self, token, version_language):
+        authorization_header = {"HTTP_AUTHORIZATION": "Bearer {}".format(token)}
+        request = self.factory.get(
+            "/v2/repository/nlp/update_interpreters/{}/".format(version_language.pk),
+            **authorization_header
+        )
+        response = RepositoryUpdateInterpretersViewSet.as_view({"get": "retrieve"})(
+            request, pk=version_language.pk
+        )
+        response.render()
+        content_data = json.loads(response.content)
+        return (response, content_data)
+
+    def test_okay(self):
+        token = str(self.repository_authorization.uuid)
+        response = self.request_create(token, self.repository_version_language)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        trainer = self.repository_version_language.get_bot_data
+        self.assertEqual(trainer.bot_data, "")
+        self.assertEqual(len(trainer.artifact), 64)
+
+        response, content_data = self.request_retrieve(
+            token, self.repository_version_language
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(content_data.get("bot_data"), self.bot_data)
+        self.assertFalse(content_data.get("from_aws"))
+
+    def test_deduplicated(self):
+        token = str(self.repository_authorization.uuid)
+        other_version_language = RepositoryVersionLanguage.objects.create(
+            repository_version=RepositoryVersion.objects.create(
+                repository=self.repository, name="clone"
+            ),
+            language=languages.LANGUAGE_EN,
+        )
+        self.request_create(token, self.repository_version_language)
+        self.request_create(token, other_version_language)
+
+        artifact = self.repository_version_language.get_bot_data.artifact
+        self.assertEqual(other_version_language.get_bot_data.artifact, artifact)
+        self.assertEqual(
+            os.listdir(os.path.join(settings.ARTIFACT_ROOT, artifact[:2])),
+            ["{}.tar.gz".format(artifact)],
+        )
+
+    def request_download(self, token, version_language, **headers):
+        authorization_header = {"HTTP_AUTHORIZATION": "Bearer {}".format(token)}
+        request = self.factory.get(
+            "/v2/repository/nlp/update_interpreters/{}/download/".format(
+                version_language.pk
+            ),
+            **authorization_header,
+            **headers
+        )
+        return RepositoryUpdateInterpretersViewSet.as_view({"get": "download"})(
+            request, pk=version_language.pk
+        )
+
+    def test_download(self):
+        token = str(self.repository_authorization.uuid)
+        self.request_create(token, self.repository_version_language)
+        self.repository_version_language.refresh_from_db()
+
+        response = self.request_download(token, self.repository_version_language)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(b"".join(response.streaming_content), b"trained model")
+        self.assertEqual(
+            response["ETag"],
+            '"{}-{}"'.format(
+                self.repository_version_language.total_training_end,
+                self.repository_version_language.get_bot_data.artifact,
+            ),
+        )
+
+        response = self.request_download(
+            token, self.repository_version_language, HTTP_IF_NONE_MATCH=response["ETag"]
+        )
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_download_range(self):
+        token = str(self.repository_authorization.uuid)
+        self.request_create(token, self.repository_version_language)
+
+        response = self.request_download(
+            token, self.repository_version_language, HTTP_RANGE="bytes=8-"
+        )
+        self.assertEqual(response.status_code, status.HTTP_206_PARTIAL_CONTENT)
+        self.assertEqual(response["Content-Range"], "bytes 8-12/13")
+        self.assertEqual(b"".join(response.streaming_content), b"model")
+
+        response = self.request_download(
+            token, self.repository_version_language, HTTP_RANGE="bytes=20-30"
+        )
+        self.assertEqual(
+            response.status_code, status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE
+        )
+
+    def test_download_not_trained(self):
+        response = self.request_download(
+            str(self.repository_authorization.uuid), self.repository_version_language
+        )
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_download_other_repository(self):
+        self.request_create(
+            str(self.repository_authorization.uuid), self.repository_version_language
+        )
+        other_authorization = RepositoryAuthorization.objects.create(
+            user=self.user,
+            repository=Repository.objects.create(
+                owner=self.owner,
+                name="Other",
+                slug="other",
+                language=languages.LANGUAGE_EN,
+            ),
+            role=3,
+        )
+        response = self.request_download(
+            str(other_authorization.uuid), self.repository_version_language
+        )
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_download_not_contributor(self):
+        self.request_create(
+            str(self.repository_authorization.uuid), self.repository_version_language
+        )
+        self.repository_authorization.role = RepositoryAuthorization.ROLE_USER
+        self.repository_authorization.save()
+        response = self.request_download(
+            str(self.repository_authorization.uuid), self.repository_version_language
+        )
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+
+class EvaluateResultsBulkTestCase(TestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+
+        self.owner, self.owner_token = create_user_and_token("owner")
+        self.user, self.user_token = create_user_and_token()
+
+        self.repository = Repository.objects.create(
+            owner=self.owner,
+            name="Testing",
+            slug="test",
+            language=languages.LANGUAGE_EN,
+        )
+
+        self.repository_authorization = RepositoryAuthorization.objects.create(
+            user=self.user, repository=self.repository, role=3
+        )
+
+        self.repository_version = RepositoryVersion.objects.create(
+            repository=self.repository, name="test"
+        )
+
+        self.repository_version_language = RepositoryVersionLanguage.objects.create(
+            repository_version=self.repository_version,
+            language=languages.LANGUAGE_EN,
+            algorithm="neural_network_internal",
+        )
+
+        for value in ["name", "city"]:
+            RepositoryEntity.objects.create(
+                repository_version=self.repository_version, value=value
+            )
+
+        self.evaluate_result = RepositoryEvaluateResult.objects.create(
+            repository_version_language=self.repository_version_language,
+            intent_results=RepositoryEvaluateResultScore.objects.create(),
+            entity_results=RepositoryEvaluateResultScore.objects.create(),
+        )
+
+    def request(self, token, data):
+        authorization_header = {"HTTP_AUTHORIZATION": "Bearer {}".format(token)}
+        request = self.factory.post(
+            "/v2/repository/nlp/authorization/evaluate/evaluate_results_bulk/",
+            json.dumps(data),
+            content_type="application/json",
+            **authorization_header
+        )
+        response = RepositoryAuthorizationEvaluateViewSet.as_view(
+            {"post": "evaluate_results_bulk"}
+        )(request)
+        response.render()
+        content_data = json.loads(response.content)
+        return (response, content_data)
+
+    def test_okay(self):
+        score = {"precision": 0.5, "recall": 0.5, "f1_score": 0.5, "support": 2}
+        data = {
+            "evaluate_id": self.evaluate_result.pk,
+            "intents": [dict(score, intent_key="greet"), dict(score, intent_key="bye")],
+            "entities": [
+                dict(score, entity_key="name"),
+                dict(score, entity_key="city"),
+            ],
+        }
+        with self.assertNumQueries(8):
+            response, content_data = self.request(
+                str(self.repository_authorization.uuid), data
+            )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            sorted(
+                self.evaluate_result.evaluate_result_intent.values_list(
+                    "intent", flat=True
+                )
+            ),
+            ["bye", "greet"],
+        )
+        self.assertEqual(
+            sorted(
+                self.evaluate_result.evaluate_result_entity.values_list(
+                    "entity__value", flat=True
+                )
+            ),
+            ["city", "name"],
+        )
+
+    def test_entity_not_found(self):
+        data = {
+            "evaluate_id": self.evaluate_result.pk,
+            "intents": [{"intent_key": "greet"}],
+            "entities": [{"entity_key": "unknown"}],
+        }
+        response, content_data = self.request(
+            str(self.repository_authorization.uuid), data
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(self.evaluate_result.evaluate_result_intent.exists())
+
+
+class TrainLanguagesTestCase(TestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+
+        self.owner, self.owner_token = create_user_and_token("owner")
+        self.user, self.user_token = create_user_and_token()
+
+        self.repository = Repository.objects.create(
+            owner=self.owner,
+            name="Testing",
+            slug="test",
+            language=languages.LANGUAGE_EN,
+        )
+
+        self.repository_authorization = RepositoryAuthorization.objects.create(
+            user=self.user, repository=self.repository, role=3
+        )
+
+        self.repository_version_language = self.repository.current_version()
+        self.repository_version = self.repository_version_language.repository_version
+
+        self.example_intent_1 = RepositoryIntent.objects.create(
+            text="greet", repository_version=self.repository_version
+        )
+        for text in ["hi", "hello"]:
+            RepositoryExample.objects.create(
+                repository_version_language=self.repository_version_language,
+                text=text,
+                intent=self.example_intent_1,
+            )
+
+    def request(self, token):
+        authorization_header = {"HTTP_AUTHORIZATION": "Bearer {}".format(token)}
+        request = self.factory.get(
+            "/v2/repository/nlp/authorization/train-languages/{}/".format(token),
+            **authorization_header
+        )
+        response = RepositoryAuthorizationTrainLanguagesViewSet.as_view(
+            {"get": "retrieve"}
+        )(request, pk=token)
+        response.render()
+        content_data = json.loads(response.content)
+        return (response, content_data)
+
+    def test_okay(self):
+        response, content_data = self.request(str(self.repository_authorization.uuid))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(content_data), 1)
+        self.assertEqual(
+            content_data[0].get("current_version_id"),
+            self.repository_version_language.pk,
+        )
+        self.assertEqual(content_data[0].get("language"), languages.LANGUAGE_EN)
+        # no version language is created for the other languages
+        self.assertEqual(self.repository_version.version_languages.count(), 1)
+
+    def test_weak_intent(self):
+        RepositoryExample.objects.create(
+            repository_version_language=self.repository_version_language,
+            text="bye",
+            intent=RepositoryIntent.objects.create(
+                text="bye", repository_version=self.repository_version
+            ),
+        )
+        response, content_data = self.request(str(self.repository_authorization.uuid))
+        self.assertEqual(content_data, [])
+
+    def test_fixed_number_of_queries(self):
+        token = str(self.repository_authorization.uuid)
+        # warm the token cache so both requests authenticate the same way
+        self.request(token)
+        with CaptureQueriesContext(connection) as one_language:
+            self.request(token)
+
+        RepositoryExample.objects.create(
+            repository_version_language=self.repository_version.get_version_language(
+                languages.LANGUAGE_PT
+            ),
+            text="oi",
+            intent=self.example_intent_1,
+        )
+        with CaptureQueriesContext(connection) as two_languages:
+            self.request(token)
+
+        self.assertEqual(
+            len(one_language.captured_queries), len(two_languages.captured_queries)
+        )
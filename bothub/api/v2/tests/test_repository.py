@@ -4,6 +4,7 @@ import uuid
 from django.core.files.uploadedfile import SimpleUploadedFile
 from django.test import RequestFactory
 from django.test import TestCase
+from django.test import override_settings
 from django.test.client import MULTIPART_CONTENT
 from rest_framework import status
 
@@ -490,6 +491,112 @@ class IntentsInRepositorySerializerTestCase(TestCase):
         self.assertEqual(intent.get("examples__count"), 1)
 
 
+@override_settings(
+    CACHES={
+        "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+        "local": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+    }
+)
+class RepositoryDashboardCacheTestCase(TestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+
+        self.owner, self.owner_token = create_user_and_token("owner")
+        self.user, self.user_token = create_user_and_token("user")
+        self.category = RepositoryCategory.objects.create(name="Category 1")
+
+        self.repository = create_repository_from_mockup(
+            self.owner, **get_valid_mockups([self.category])[0]
+        )
+        self.version_language = self.repository.current_version()
+        self.repository.repository_score.get_or_create()
+
+    def request(self, token=None):
+        return RetriveRepositoryTestCase.request(self, self.repository, token)
+
+    def test_cached_until_write(self):
+        response, content_data = self.request(self.owner_token)
+        self.assertEqual(content_data.get("description"), "")
+
+        Repository.objects.filter(pk=self.repository.pk).update(description="cached")
+        response, content_data = self.request(self.owner_token)
+        self.assertEqual(content_data.get("description"), "")
+
+        intent = RepositoryIntent.objects.create(
+            text="greet", repository_version=self.version_language.repository_version
+        )
+        RepositoryExample.objects.create(
+            repository_version_language=self.version_language, text="hi", intent=intent
+        )
+        response, content_data = self.request(self.owner_token)
+        self.assertEqual(content_data.get("description"), "cached")
+        self.assertEqual(content_data.get("intents_list"), ["greet"])
+
+    def test_user_fields(self):
+        response, content_data = self.request(self.owner_token)
+        self.assertEqual(
+            content_data.get("authorization").get("role"),
+            RepositoryAuthorization.ROLE_ADMIN,
+        )
+        self.assertFalse(content_data.get("available_request_authorization"))
+
+        response, content_data = self.request(self.user_token)
+        self.assertEqual(
+            content_data.get("authorization").get("role"),
+            RepositoryAuthorization.ROLE_NOT_SETTED,
+        )
+        self.assertTrue(content_data.get("available_request_authorization"))
+
+        response, content_data = self.request()
+        self.assertIsNone(content_data.get("authorization"))
+
+
+class RepositorySparseFieldsetTestCase(TestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+
+        self.owner, self.owner_token = create_user_and_token("owner")
+        self.category = RepositoryCategory.objects.create(name="Category 1")
+
+        self.repository = create_repository_from_mockup(
+            self.owner, **get_valid_mockups([self.category])[0]
+        )
+
+    def request(self, query):
+        repository_version = self.repository.current_version().repository_version
+        request = self.factory.get(
+            "/v2/repository/info/{}/{}/".format(
+                self.repository.uuid, repository_version.pk
+            ),
+            query,
+            **{"HTTP_AUTHORIZATION": "Token {}".format(self.owner_token.key)},
+        )
+        response = NewRepositoryViewSet.as_view({"get": "retrieve"})(
+            request, repository__uuid=self.repository.uuid, pk=repository_version.pk
+        )
+        response.render()
+        content_data = json.loads(response.content)
+        return (response, content_data)
+
+    def test_fields(self):
+        response, content_data = self.request({"fields": "name,ready_for_parse"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            content_data, {"name": self.repository.name, "ready_for_parse": False}
+        )
+
+    def test_omit(self):
+        response, content_data = self.request({"omit": "groups,authorization"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn("groups", content_data)
+        self.assertNotIn("authorization", content_data)
+        self.assertIn("other_group", content_data)
+
+        response, content_data = self.request({})
+        self.assertIn("groups", content_data)
+        self.assertIn("authorization", content_data)
+
+
 class RepositoriesViewSetTestCase(TestCase):
     def setUp(self):
         self.factory = RequestFactory()
@@ -6,6 +6,7 @@ from rest_framework.exceptions import PermissionDenied
 
 from bothub.common.models import Repository
 from bothub.common.models import RepositoryTranslatedExample
+from bothub.common.models import RepositoryVersion
 
 
 class TranslationsFilter(filters.FilterSet):
@@ -49,11 +50,10 @@ class TranslationsFilter(filters.FilterSet):
                 raise PermissionDenied()
             if request.query_params.get("repository_version"):
                 return RepositoryTranslatedExample.objects.filter(
-                    original_example__repository_version_language__repository_version__repository=repository
+                    original_example__repository=repository
                 )
             return RepositoryTranslatedExample.objects.filter(
-                original_example__repository_version_language__repository_version__repository=repository,
-                repository_version_language__repository_version__is_default=True,
+                original_example__repository=repository, is_default_version=True
             )
         except Repository.DoesNotExist:
             raise NotFound(_("Repository {} does not exist").format(value))
@@ -61,16 +61,14 @@ class TranslationsFilter(filters.FilterSet):
             raise NotFound(_("Invalid repository_uuid"))
 
     def filter_from_language(self, queryset, name, value):
-        return queryset.filter(
-            original_example__repository_version_language__language=value
-        )
+        return queryset.filter(original_example__language=value)
 
     def filter_to_language(self, queryset, name, value):
         return queryset.filter(language=value)
 
     def filter_repository_version(self, queryset, name, value):
         return queryset.filter(
-            repository_version_language__repository_version__pk=value
+            repository_version=RepositoryVersion.source_version_of(value)
         )
 
     def filter_original_example_id(self, queryset, name, value):
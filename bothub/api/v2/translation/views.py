@@ -128,6 +128,8 @@ class RepositoryTranslatedExporterViewSet(
 
     def retrieve(self, request, *args, **kwargs):  # pragma: no cover
         repository_version = self.get_object()
+        # a version sharing the content of its parent exports the parent rows
+        source_version = repository_version.source_version
 
         serializer = RepositoryTranslatedImportSerializer(data=request.query_params)
         serializer.is_valid(raise_exception=True)
@@ -137,11 +139,11 @@ class RepositoryTranslatedExporterViewSet(
         for_the_language = serializer.data.get("for_the_language")
 
         queryset = RepositoryExample.objects.filter(
-            repository_version_language__repository_version=repository_version
+            repository_version_language__repository_version=source_version
         )
 
         examples = repository_version.repository.examples(
-            queryset=queryset, version_default=repository_version.is_default
+            queryset=queryset, version_default=source_version.is_default
         ).annotate(
             translation_count=Count(
                 "translations", filter=Q(translations__language=for_the_language)
@@ -176,11 +178,7 @@ class RepositoryTranslatedExporterViewSet(
         for count, example in enumerate(examples, start=14):
             worksheet.insert_rows(count)
             worksheet.cell(row=count, column=2, value=str(example.pk))
-            worksheet.cell(
-                row=count,
-                column=3,
-                value=str(example.repository_version_language.repository_version.pk),
-            )
+            worksheet.cell(row=count, column=3, value=str(repository_version.pk))
             worksheet.cell(
                 row=count,
                 column=4,
@@ -240,6 +238,7 @@ class RepositoryTranslatedExporterViewSet(
         serializer.is_valid(raise_exception=True)
 
         for_language = serializer.data.get("language", None)
+        RepositoryVersion.copy_before_write(kwargs.get("pk"))
 
         workbook = openpyxl.load_workbook(filename=request.data.get("file"))
         worksheet = workbook.get_sheet_by_name("Translate")
@@ -272,11 +271,22 @@ class RepositoryTranslatedExporterViewSet(
                 if text_translated:
                     example = RepositoryExample.objects.filter(
                         pk=example_id,
-                        repository_version_language__repository_version=repository_version,
                         repository_version_language__repository_version__repository=kwargs.get(
                             "repository__uuid"
                         ),
                     )
+                    exported = example.first()
+                    if (
+                        exported is not None
+                        and exported.repository_version_id != repository_version
+                    ):
+                        # exported while the version shared its parent content,
+                        # the id is the one of the parent row it was copied from
+                        example = RepositoryExample.objects.filter(
+                            repository_version=repository_version,
+                            language=exported.language,
+                            text=exported.text,
+                        )
                     if example.count() == 0:
                         worksheet.cell(
                             row=count, column=7, value="Sentence does not exist"
@@ -308,8 +318,8 @@ class RepositoryTranslatedExporterViewSet(
                         original_example=example, language=for_language
                     )
 
-                    if translated_examples.count() > 0:
-                        translated_examples.delete()
+                    for translated_example in translated_examples:
+                        translated_example.delete()
 
                     version_language = example.repository_version_language.repository_version.get_version_language(
                         language=for_language
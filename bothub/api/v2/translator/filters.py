@@ -174,7 +174,7 @@ class TranslatorExamplesFilter(filters.FilterSet):
                     )
                     | Q(
                         translations__entities__repository_translated_example__language=F(
-                            "repository_version_language__repository_version__repository__language"
+                            "repository__language"
                         )
                     ),
                     translations__entities__entity__in=F(
@@ -205,7 +205,7 @@ class TranslatorExamplesFilter(filters.FilterSet):
                     )
                     | Q(
                         translations__entities__repository_translated_example__language=F(
-                            "repository_version_language__repository_version__repository__language"
+                            "repository__language"
                         )
                     ),
                     translations__entities__entity__in=F(
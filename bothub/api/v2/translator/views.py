@@ -68,8 +68,8 @@ class TranslatorExamplesViewSet(mixins.ListModelMixin, GenericViewSet):
             # queryset just for schema generation metadata
             return RepositoryExample.objects.none()
         queryset = RepositoryExample.objects.filter(
-            repository_version_language__repository_version=self.request.auth.repository_version_language.repository_version,
-            repository_version_language__language=self.request.auth.repository_version_language.repository_version.repository.language,
+            repository_version=self.request.auth.repository_version_language.repository_version.source_version,
+            language=self.request.auth.repository_version_language.repository_version.repository.language,
         )
         return queryset
 
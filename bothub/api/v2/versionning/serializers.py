@@ -1,3 +1,4 @@
+from django.db import transaction
 from rest_framework import serializers
 from rest_framework.generics import get_object_or_404
 
@@ -48,9 +49,12 @@ class RepositoryVersionSeralizer(serializers.ModelSerializer):
         validated_data.pop("repository")
         if validated_data.get("is_default"):
             validated_data["is_default"] = True
-            RepositoryVersion.objects.filter(repository=instance.repository).update(
-                is_default=False
-            )
+            # saved one by one so the examples follow the default version
+            for version in RepositoryVersion.objects.filter(
+                repository=instance.repository, is_default=True
+            ).exclude(pk=instance.pk):
+                version.is_default = False
+                version.save(update_fields=["is_default"])
         return super().update(instance, validated_data)
 
     def create(self, validated_data):  # pragma: no cover
@@ -65,12 +69,15 @@ class RepositoryVersionSeralizer(serializers.ModelSerializer):
             is_default=False,
             repository=clone.repository,
             created_by=self.context["request"].user,
-            is_deleted=True,
+            parent=clone.source_version,
         )
         instance.save()
-
-        answer_task = celery_app.send_task(
-            "clone_version", args=[instance.pk, id_clone, repository.pk]
+        for language in clone.source_version.version_languages.values_list(
+            "language", flat=True
+        ):
+            instance.get_version_language(language)
+        # the content is copied in the background, never on a read
+        transaction.on_commit(
+            lambda: celery_app.send_task("materialize_version", args=[instance.pk])
         )
-        answer_task.wait()
         return instance
@@ -66,7 +66,7 @@ class NLPAuthentication(TokenAuthentication):
     def authenticate_credentials(self, key):
         model = self.get_model()
         try:
-            authorization = model.objects.get(uuid=key)
+            authorization = model.objects.get_cached(key)
             if not authorization.can_translate:
                 raise exceptions.PermissionDenied()
 
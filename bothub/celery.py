@@ -14,7 +14,16 @@ app.autodiscover_tasks(lambda: settings.INSTALLED_APPS)
 app.conf.beat_schedule = {
     "check-training-status": {
         "task": "bothub.common.tasks.trainings_check_task",
-        "schedule": 5.0,
+        "schedule": float(settings.NLP_TASK_STATUS_SWEEP_INTERVAL),
+    },
+    "flush-nlp-logs": {"task": "bothub.common.tasks.flush_nlp_logs", "schedule": 5.0},
+    "collect-orphan-entities": {
+        "task": "bothub.common.tasks.collect_orphan_entities",
+        "schedule": 60.0,
+    },
+    "refresh-dataset-fingerprints": {
+        "task": "bothub.common.tasks.refresh_dataset_fingerprints",
+        "schedule": 60.0,
     },
     "delete-nlp-logs": {
         "task": "bothub.common.tasks.delete_nlp_logs",
@@ -27,10 +27,7 @@ class RepositoryVersionInline(admin.TabularInline):
         trainers = []
         if obj:
             for version in obj.version_languages:
-                if (
-                    version.get_bot_data.bot_data != ""
-                    and version.get_bot_data.bot_data is not None
-                ):
+                if version.get_bot_data.has_bot_data:
                     trainers.append(
                         f"<a href='{reverse('download_bot_data', kwargs={'update_id': version.get_bot_data.pk})}'>{version.language.upper()}</a>"
                     )
@@ -0,0 +1,43 @@
+import logging
+
+from django.core.cache import cache
+from redis.exceptions import RedisError
+
+logger = logging.getLogger(__name__)
+
+
+def get(key, default=None):
+    """
+    Reads key from the redis cache, an unavailable redis reads as a miss
+    """
+    try:
+        return cache.get(key, default)
+    except RedisError as e:
+        logger.warning("Cache get of %s failed: %s", key, e)
+        return default
+
+
+def set(key, value, timeout):
+    try:
+        cache.set(key, value, timeout)
+    except RedisError as e:
+        logger.warning("Cache set of %s failed: %s", key, e)
+
+
+def get_or_set(key, default, timeout):
+    """
+    Like cache.get_or_set, default is returned without being kept when redis
+    is unavailable
+    """
+    try:
+        return cache.get_or_set(key, default, timeout)
+    except RedisError as e:
+        logger.warning("Cache get_or_set of %s failed: %s", key, e)
+        return default
+
+
+def delete_many(keys):
+    try:
+        cache.delete_many(keys)
+    except RedisError as e:
+        logger.warning("Cache delete of %s failed: %s", ", ".join(keys), e)
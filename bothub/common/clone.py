@@ -0,0 +1,310 @@
+from django.db import transaction
+from django.utils import timezone
+
+from bothub.common.models import (
+    RepositoryEntity,
+    RepositoryEntityGroup,
+    RepositoryEvaluate,
+    RepositoryEvaluateEntity,
+    RepositoryExample,
+    RepositoryExampleEntity,
+    RepositoryExampleSearchEntry,
+    RepositoryIntent,
+    RepositoryQueueTask,
+    RepositoryTranslatedExample,
+    RepositoryTranslatedExampleEntity,
+    RepositoryVersion,
+    RepositoryVersionLanguage,
+)
+
+CHUNK_SIZE = 1000
+
+
+class VersionCloner:
+    """
+    Copies the intents, groups, entities, examples, translations and
+    evaluations of the source version into the target version with bulk
+    inserts, chunk_size rows at a time with one transaction per chunk. The
+    copies are linked through maps from the source primary keys to the target
+    ones, and the progress of each language is published in its queue task
+    """
+
+    def __init__(self, source, target, id_queue="", chunk_size=CHUNK_SIZE):
+        self.source = source
+        self.target = target
+        self.id_queue = id_queue
+        self.chunk_size = chunk_size
+        self.now = timezone.now()
+        self.version_languages = {}
+        self.intents = {}
+        self.groups = {}
+        self.entities = {}
+        self.tasks = {}
+
+    def clone(self):
+        with transaction.atomic():
+            self.clone_version_languages()
+        try:
+            with transaction.atomic():
+                self.clone_intents()
+                self.clone_entities()
+            for source_language in self.source.version_languages:
+                self.clone_version_language(source_language)
+            self.target.rebuild_example_counters()
+            RepositoryVersion.bump_generation(self.target.pk)
+        except Exception:
+            self.discard()
+            RepositoryQueueTask.objects.filter(
+                pk__in=[task.pk for task in self.tasks.values()]
+            ).update(
+                status=RepositoryQueueTask.STATUS_FAILED, end_training=timezone.now()
+            )
+            raise
+
+    def discard(self):
+        """
+        Deletes the rows already copied into the target, the chunks committed
+        before a failure would leave it with part of the source content
+        """
+        with transaction.atomic():
+            for model in [
+                RepositoryExample,
+                RepositoryEvaluate,
+                RepositoryEntity,
+                RepositoryEntityGroup,
+                RepositoryIntent,
+            ]:
+                model.objects.filter(repository_version=self.target).delete()
+            self.target.rebuild_example_counters()
+
+    def clone_version_languages(self):
+        for version in self.source.version_languages:
+            # a version sharing its parent content may have opened languages
+            version_language, created = RepositoryVersionLanguage.objects.update_or_create(
+                repository_version=self.target,
+                language=version.language,
+                defaults={
+                    "training_started_at": version.training_started_at,
+                    "training_end_at": version.training_end_at,
+                    "failed_at": version.failed_at,
+                    "use_analyze_char": version.use_analyze_char,
+                    "use_name_entities": version.use_name_entities,
+                    "use_competing_intents": version.use_competing_intents,
+                    "algorithm": version.algorithm,
+                    "training_log": version.training_log,
+                    "last_update": version.last_update,
+                    "total_training_end": version.total_training_end,
+                    "training_fingerprint": version.training_fingerprint,
+                    "trained_fingerprint": version.trained_fingerprint,
+                    "dataset_fingerprint": version.dataset_fingerprint,
+                    "dataset_fingerprint_at": version.dataset_fingerprint_at,
+                },
+            )
+            trainer = version.get_bot_data
+            version_language.update_trainer(
+                trainer.bot_data, trainer.rasa_version, artifact=trainer.artifact
+            )
+            self.version_languages[version.language] = version_language
+            task = version_language.create_task(
+                id_queue=self.id_queue,
+                from_queue=RepositoryQueueTask.QUEUE_CELERY,
+                type_processing=RepositoryQueueTask.TYPE_PROCESSING_CLONE_VERSION,
+            )
+            task.status = RepositoryQueueTask.STATUS_PROCESSING
+            task.save(update_fields=["status"])
+            self.tasks[version.language] = task
+
+    def get_version_language(self, language):
+        if language not in self.version_languages:
+            self.version_languages[language] = self.target.get_version_language(
+                language
+            )
+        return self.version_languages[language]
+
+    def copy(self, model, rows, build):
+        """
+        Bulk creates one model instance per (pk, *values) row of the source and
+        returns the map from the source primary keys to the created ones
+        """
+        created = model.objects.bulk_create([build(*row[1:]) for row in rows])
+        return {row[0]: instance.pk for row, instance in zip(rows, created)}
+
+    def chunks(self, queryset, *fields):
+        """
+        Yields the (pk, *fields) rows of queryset in primary key order,
+        chunk_size rows at a time
+        """
+        last_pk = 0
+        while True:
+            rows = list(
+                queryset.filter(pk__gt=last_pk)
+                .order_by("pk")
+                .values_list("pk", *fields)[: self.chunk_size]
+            )
+            if not rows:
+                return
+            yield rows
+            last_pk = rows[-1][0]
+
+    def clone_intents(self):
+        self.intents = self.copy(
+            RepositoryIntent,
+            list(
+                RepositoryIntent.objects.filter(
+                    repository_version=self.source
+                ).values_list("pk", "text")
+            ),
+            lambda text: RepositoryIntent(repository_version=self.target, text=text),
+        )
+
+    def clone_entities(self):
+        self.groups = self.copy(
+            RepositoryEntityGroup,
+            list(
+                RepositoryEntityGroup.objects.filter(
+                    repository_version=self.source
+                ).values_list("pk", "value")
+            ),
+            lambda value: RepositoryEntityGroup(
+                repository_version=self.target, value=value
+            ),
+        )
+        self.entities = self.copy(
+            RepositoryEntity,
+            list(
+                RepositoryEntity.objects.filter(
+                    repository_version=self.source
+                ).values_list("pk", "value", "group")
+            ),
+            lambda value, group: RepositoryEntity(
+                repository_version=self.target,
+                value=value,
+                group_id=self.groups.get(group),
+            ),
+        )
+
+    def clone_version_language(self, source_language):
+        task = self.tasks[source_language.language]
+        examples = RepositoryExample.objects.filter(
+            repository_version_language=source_language
+        )
+        evaluates = RepositoryEvaluate.objects.filter(
+            repository_version_language=source_language
+        )
+        total = examples.count() + evaluates.count()
+        done = 0
+        for rows in self.chunks(examples, "text", "intent", "is_corrected"):
+            with transaction.atomic():
+                self.clone_examples(rows, task.repositoryversionlanguage)
+            done += len(rows)
+            self.publish_progress(task, done, total)
+        for rows in self.chunks(evaluates, "text", "intent"):
+            with transaction.atomic():
+                self.clone_evaluates(rows, task.repositoryversionlanguage)
+            done += len(rows)
+            self.publish_progress(task, done, total)
+        task.status = RepositoryQueueTask.STATUS_SUCCESS
+        task.progress = 100
+        task.end_training = timezone.now()
+        task.save(update_fields=["status", "progress", "end_training"])
+
+    def publish_progress(self, task, done, total):
+        task.progress = done * 100 // total
+        task.save(update_fields=["progress"])
+
+    def clone_examples(self, rows, version_language):
+        examples = self.copy(
+            RepositoryExample,
+            rows,
+            lambda text, intent, is_corrected: RepositoryExample(
+                repository_version_language=version_language,
+                repository_id=self.target.repository_id,
+                repository_version=self.target,
+                is_default_version=self.target.is_default,
+                language=version_language.language,
+                text=text,
+                intent_id=self.intents[intent],
+                is_corrected=is_corrected,
+                last_update=self.now,
+            ),
+        )
+        RepositoryExampleEntity.objects.bulk_create(
+            [
+                RepositoryExampleEntity(
+                    repository_example_id=examples[example],
+                    entity_id=self.entities[entity],
+                    start=start,
+                    end=end,
+                )
+                for example, entity, start, end in RepositoryExampleEntity.objects.filter(
+                    repository_example__in=examples.keys()
+                ).values_list(
+                    "repository_example", "entity", "start", "end"
+                )
+            ]
+        )
+        translations = self.copy(
+            RepositoryTranslatedExample,
+            list(
+                RepositoryTranslatedExample.objects.filter(
+                    original_example__in=examples.keys()
+                ).values_list("pk", "original_example", "language", "text")
+            ),
+            lambda example, language, text: RepositoryTranslatedExample(
+                repository_version_language=self.get_version_language(language),
+                repository_id=self.target.repository_id,
+                repository_version=self.target,
+                is_default_version=self.target.is_default,
+                original_example_id=examples[example],
+                language=language,
+                text=text,
+            ),
+        )
+        RepositoryTranslatedExampleEntity.objects.bulk_create(
+            [
+                RepositoryTranslatedExampleEntity(
+                    repository_translated_example_id=translations[translation],
+                    entity_id=self.entities[entity],
+                    start=start,
+                    end=end,
+                )
+                for translation, entity, start, end in RepositoryTranslatedExampleEntity.objects.filter(
+                    repository_translated_example__in=translations.keys()
+                ).values_list(
+                    "repository_translated_example", "entity", "start", "end"
+                )
+            ]
+        )
+        RepositoryExampleSearchEntry.objects.rebuild(
+            RepositoryExample.objects.filter(pk__in=examples.values())
+        )
+
+    def clone_evaluates(self, rows, version_language):
+        evaluates = self.copy(
+            RepositoryEvaluate,
+            rows,
+            lambda text, intent: RepositoryEvaluate(
+                repository_version_language=version_language,
+                repository_id=self.target.repository_id,
+                repository_version=self.target,
+                is_default_version=self.target.is_default,
+                language=version_language.language,
+                text=text,
+                intent=intent,
+            ),
+        )
+        RepositoryEvaluateEntity.objects.bulk_create(
+            [
+                RepositoryEvaluateEntity(
+                    repository_evaluate_id=evaluates[evaluate],
+                    entity_id=self.entities.get(entity, entity),
+                    start=start,
+                    end=end,
+                )
+                for evaluate, entity, start, end in RepositoryEvaluateEntity.objects.filter(
+                    repository_evaluate__in=evaluates.keys()
+                ).values_list(
+                    "repository_evaluate", "entity", "start", "end"
+                )
+            ]
+        )
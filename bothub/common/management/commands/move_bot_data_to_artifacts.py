@@ -0,0 +1,37 @@
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand
+from django.core.validators import URLValidator
+
+from bothub.common import storages
+from bothub.common.models import RepositoryNLPTrain
+
+
+class Command(BaseCommand):
+    def handle(self, *args, **kwargs):
+        validator = URLValidator()
+        trainers = (
+            RepositoryNLPTrain.objects.filter(artifact="")
+            .exclude(bot_data="")
+            .values_list("pk", flat=True)
+        )
+        for pk in trainers.iterator():
+            bot_data = RepositoryNLPTrain.objects.values_list(
+                "bot_data", flat=True
+            ).get(pk=pk)
+            try:
+                validator(bot_data)
+                # already kept outside the database
+                continue
+            except ValidationError:
+                pass
+            try:
+                artifact = storages.save_artifact(
+                    storages.iter_base64_decoded(bot_data)
+                )
+                RepositoryNLPTrain.objects.filter(pk=pk).update(
+                    artifact=artifact, bot_data=""
+                )
+                print("Moved bot_data of trainer {}".format(pk))
+            except Exception as e:
+                print("Error " + str(pk))
+                print(str(e))
@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+
+from bothub.common.models import RepositoryVersion
+
+
+class Command(BaseCommand):
+    def handle(self, *args, **kwargs):
+        print("Rebuilding...")
+        versions = RepositoryVersion.objects.all()
+        for version in versions.iterator():
+            version.rebuild_example_counters()
+        print("{} versions rebuilt".format(versions.count()))
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from bothub.common.models import (
+    RepositoryExample,
+    RepositoryExampleSearchEntry,
+    RepositoryVersion,
+)
+
+
+class Command(BaseCommand):
+    def handle(self, *args, **kwargs):
+        print("Rebuilding...")
+        versions = RepositoryVersion.objects.all()
+        for version in versions.iterator():
+            RepositoryExampleSearchEntry.objects.rebuild(
+                RepositoryExample.objects.filter(repository_version=version)
+            )
+        print("{} versions rebuilt".format(versions.count()))
@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+
+from bothub.common.models import RepositoryAuthorization
+
+
+class Command(BaseCommand):
+    def handle(self, *args, **kwargs):
+        print("Updating...")
+        updated = RepositoryAuthorization.objects.all().refresh_effective_roles()
+        print("{} authorizations updated".format(updated))
@@ -0,0 +1,31 @@
+# Generated by Django 2.2.28 on 2026-10-18 17:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [("common", "0102_repositoryevaluateresult_cross_validation")]
+
+    operations = [
+        migrations.AddField(
+            model_name="repositoryversionlanguage",
+            name="trained_fingerprint",
+            field=models.CharField(
+                blank=True,
+                editable=False,
+                max_length=64,
+                verbose_name="trained fingerprint",
+            ),
+        ),
+        migrations.AddField(
+            model_name="repositoryversionlanguage",
+            name="training_fingerprint",
+            field=models.CharField(
+                blank=True,
+                editable=False,
+                max_length=64,
+                verbose_name="training fingerprint",
+            ),
+        ),
+    ]
@@ -0,0 +1,57 @@
+# Generated by Django 2.2.28 on 2026-10-18 17:33
+
+from django.db import migrations, models
+from django.db.models import Case, F, IntegerField, OuterRef, Q, Subquery, When
+from django.db.models.functions import Coalesce
+
+
+def noop(apps, schema_editor):  # pragma: no cover
+    pass
+
+
+def migration(apps, schema_editor):  # pragma: no cover
+    RepositoryAuthorization = apps.get_model("common", "RepositoryAuthorization")
+    OrganizationAuthorization = apps.get_model("common", "OrganizationAuthorization")
+
+    inherited_roles = (
+        OrganizationAuthorization.objects.filter(
+            user=OuterRef("user"),
+            organization__repositoryauthorization__repository=OuterRef("repository"),
+            organization__repositoryauthorization__role__gt=0,
+        )
+        .exclude(role=0)
+        .order_by("-role")
+        .values_list("role", flat=True)
+    )
+    RepositoryAuthorization.objects.update(
+        effective_role=Case(
+            When(Q(role__gte=1) | Q(user__isnull=True), then=F("role")),
+            default=Coalesce(Subquery(inherited_roles[:1]), 0),
+            output_field=IntegerField(),
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [("common", "0103_repositoryversionlanguage_training_fingerprint")]
+
+    operations = [
+        migrations.AddField(
+            model_name="repositoryauthorization",
+            name="effective_role",
+            field=models.PositiveIntegerField(
+                choices=[
+                    (0, "not set"),
+                    (1, "user"),
+                    (2, "contributor"),
+                    (3, "admin"),
+                    (4, "translate"),
+                ],
+                default=0,
+                editable=False,
+                verbose_name="effective role",
+            ),
+        ),
+        migrations.RunPython(migration, noop),
+    ]
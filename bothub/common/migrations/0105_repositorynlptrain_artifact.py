@@ -0,0 +1,21 @@
+# Generated by Django 2.2.28 on 2026-10-18 17:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [("common", "0104_repositoryauthorization_effective_role")]
+
+    operations = [
+        migrations.AddField(
+            model_name="repositorynlptrain",
+            name="artifact",
+            field=models.CharField(
+                blank=True,
+                help_text="SHA-256 of the trained model in the artifact storage",
+                max_length=64,
+                verbose_name="artifact",
+            ),
+        )
+    ]
@@ -0,0 +1,169 @@
+# Generated by Django 2.2.28 on 2026-10-18 17:52
+
+from collections import Counter
+
+from django.db import migrations, models
+from django.db.models import Count, F
+import django.db.models.deletion
+
+
+def noop(apps, schema_editor):  # pragma: no cover
+    pass
+
+
+def grouped_count(queryset, *fields):  # pragma: no cover
+    return Counter(
+        {
+            tuple(row[:-1]): row[-1]
+            for row in queryset.values_list(*fields)
+            .annotate(count=Count("pk"))
+            .order_by()
+        }
+    )
+
+
+def create_counters(model, field, examples, translations):  # pragma: no cover
+    counters = []
+    for key in set(examples) | set(translations):
+        repository_version_language, counted = key
+        counters.append(
+            model(
+                repository_version_language_id=repository_version_language,
+                examples_count=examples[key],
+                translations_count=translations[key],
+                **{"{}_id".format(field): counted}
+            )
+        )
+    model.objects.bulk_create(counters, batch_size=1000)
+
+
+def migration(apps, schema_editor):  # pragma: no cover
+    RepositoryExample = apps.get_model("common", "RepositoryExample")
+    RepositoryTranslatedExample = apps.get_model(
+        "common", "RepositoryTranslatedExample"
+    )
+    RepositoryExampleEntity = apps.get_model("common", "RepositoryExampleEntity")
+
+    create_counters(
+        apps.get_model("common", "RepositoryIntentCounter"),
+        "intent",
+        grouped_count(
+            RepositoryExample.objects, "repository_version_language", "intent"
+        ),
+        grouped_count(
+            RepositoryTranslatedExample.objects.filter(
+                language=F("repository_version_language__language")
+            ),
+            "repository_version_language",
+            "original_example__intent",
+        ),
+    )
+    create_counters(
+        apps.get_model("common", "RepositoryEntityCounter"),
+        "entity",
+        grouped_count(
+            RepositoryExampleEntity.objects,
+            "repository_example__repository_version_language",
+            "entity",
+        ),
+        grouped_count(
+            RepositoryExampleEntity.objects.filter(
+                repository_example__translations__language=F(
+                    "repository_example__translations__repository_version_language__language"
+                )
+            ),
+            "repository_example__translations__repository_version_language",
+            "entity",
+        ),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [("common", "0105_repositorynlptrain_artifact")]
+
+    operations = [
+        migrations.CreateModel(
+            name="RepositoryIntentCounter",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "examples_count",
+                    models.IntegerField(default=0, verbose_name="examples count"),
+                ),
+                (
+                    "translations_count",
+                    models.IntegerField(default=0, verbose_name="translations count"),
+                ),
+                (
+                    "intent",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="common.RepositoryIntent",
+                    ),
+                ),
+                (
+                    "repository_version_language",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="intent_counters",
+                        to="common.RepositoryVersionLanguage",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "repository intent counter",
+                "unique_together": {("repository_version_language", "intent")},
+            },
+        ),
+        migrations.CreateModel(
+            name="RepositoryEntityCounter",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "examples_count",
+                    models.IntegerField(default=0, verbose_name="examples count"),
+                ),
+                (
+                    "translations_count",
+                    models.IntegerField(default=0, verbose_name="translations count"),
+                ),
+                (
+                    "entity",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="common.RepositoryEntity",
+                    ),
+                ),
+                (
+                    "repository_version_language",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="entity_counters",
+                        to="common.RepositoryVersionLanguage",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "repository entity counter",
+                "unique_together": {("repository_version_language", "entity")},
+            },
+        ),
+        migrations.RunPython(migration, noop),
+    ]
@@ -0,0 +1,182 @@
+# Generated by Django 2.2.28 on 2026-10-18 18:05
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+import django.db.models.deletion
+
+
+def noop(apps, schema_editor):  # pragma: no cover
+    pass
+
+
+def migration(apps, schema_editor):  # pragma: no cover
+    RepositoryVersionLanguage = apps.get_model("common", "RepositoryVersionLanguage")
+    version_language = RepositoryVersionLanguage.objects.filter(
+        pk=OuterRef("repository_version_language")
+    )
+
+    def from_version_language(field):
+        return Subquery(version_language.values(field)[:1])
+
+    keys = {
+        "repository": from_version_language("repository_version__repository"),
+        "repository_version": from_version_language("repository_version"),
+        "is_default_version": Coalesce(
+            from_version_language("repository_version__is_default"), Value(False)
+        ),
+    }
+    apps.get_model("common", "RepositoryExample").objects.update(
+        language=from_version_language("language"), **keys
+    )
+    apps.get_model("common", "RepositoryEvaluate").objects.update(
+        language=from_version_language("language"), **keys
+    )
+    apps.get_model("common", "RepositoryTranslatedExample").objects.update(**keys)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [("common", "0106_repositoryintentcounter_repositoryentitycounter")]
+
+    operations = [
+        migrations.AddField(
+            model_name="repositoryevaluate",
+            name="is_default_version",
+            field=models.BooleanField(default=False, editable=False),
+        ),
+        migrations.AddField(
+            model_name="repositoryevaluate",
+            name="language",
+            field=models.CharField(
+                editable=False, max_length=5, null=True, verbose_name="language"
+            ),
+        ),
+        migrations.AddField(
+            model_name="repositoryevaluate",
+            name="repository",
+            field=models.ForeignKey(
+                editable=False,
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="+",
+                to="common.Repository",
+            ),
+        ),
+        migrations.AddField(
+            model_name="repositoryevaluate",
+            name="repository_version",
+            field=models.ForeignKey(
+                editable=False,
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="+",
+                to="common.RepositoryVersion",
+            ),
+        ),
+        migrations.AddField(
+            model_name="repositoryexample",
+            name="is_default_version",
+            field=models.BooleanField(default=False, editable=False),
+        ),
+        migrations.AddField(
+            model_name="repositoryexample",
+            name="language",
+            field=models.CharField(
+                default="", editable=False, max_length=5, verbose_name="language"
+            ),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name="repositoryexample",
+            name="repository",
+            field=models.ForeignKey(
+                editable=False,
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="+",
+                to="common.Repository",
+            ),
+        ),
+        migrations.AddField(
+            model_name="repositoryexample",
+            name="repository_version",
+            field=models.ForeignKey(
+                editable=False,
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="+",
+                to="common.RepositoryVersion",
+            ),
+        ),
+        migrations.AddField(
+            model_name="repositorytranslatedexample",
+            name="is_default_version",
+            field=models.BooleanField(default=False, editable=False),
+        ),
+        migrations.AddField(
+            model_name="repositorytranslatedexample",
+            name="repository",
+            field=models.ForeignKey(
+                editable=False,
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="+",
+                to="common.Repository",
+            ),
+        ),
+        migrations.AddField(
+            model_name="repositorytranslatedexample",
+            name="repository_version",
+            field=models.ForeignKey(
+                editable=False,
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="+",
+                to="common.RepositoryVersion",
+            ),
+        ),
+        migrations.RunPython(migration, noop),
+        migrations.AddIndex(
+            model_name="repositoryevaluate",
+            index=models.Index(
+                fields=["repository", "is_default_version", "language"],
+                name="common_evaluate_repository_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="repositoryevaluate",
+            index=models.Index(
+                fields=["repository_version", "language"],
+                name="common_evaluate_version_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="repositoryexample",
+            index=models.Index(
+                fields=["repository", "is_default_version", "language"],
+                name="common_example_repository_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="repositoryexample",
+            index=models.Index(
+                fields=["repository_version", "language"],
+                name="common_example_version_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="repositorytranslatedexample",
+            index=models.Index(
+                fields=["repository", "is_default_version", "language"],
+                name="common_translated_repo_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="repositorytranslatedexample",
+            index=models.Index(
+                fields=["repository_version", "language"],
+                name="common_translated_version_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,16 @@
+# Generated by Django 2.2.28 on 2026-10-18 18:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [("common", "0107_version_language_keys")]
+
+    operations = [
+        migrations.AddField(
+            model_name="repositoryversion",
+            name="entities_dirty",
+            field=models.BooleanField(default=False, editable=False),
+        )
+    ]
@@ -0,0 +1,65 @@
+# Generated by Django 2.2.28 on 2026-10-18 18:11
+
+from django.db import migrations, models
+from django.db.models import Max
+import django.db.models.deletion
+
+
+def noop(apps, schema_editor):  # pragma: no cover
+    pass
+
+
+def migration(apps, schema_editor):  # pragma: no cover
+    RepositoryEvaluateResult = apps.get_model("common", "RepositoryEvaluateResult")
+    RepositorySequence = apps.get_model("common", "RepositorySequence")
+    RepositorySequence.objects.bulk_create(
+        [
+            RepositorySequence(
+                repository_id=repository, name="evaluate_result", value=value
+            )
+            for repository, value in RepositoryEvaluateResult.objects.filter(
+                repository_version_language__isnull=False
+            )
+            .values_list("repository_version_language__repository_version__repository")
+            .annotate(Max("version"))
+            .order_by()
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [("common", "0108_repositoryversion_entities_dirty")]
+
+    operations = [
+        migrations.CreateModel(
+            name="RepositorySequence",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("name", models.CharField(max_length=64, verbose_name="name")),
+                ("value", models.PositiveIntegerField(default=1, verbose_name="value")),
+                (
+                    "repository",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="sequences",
+                        to="common.Repository",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "repository sequence",
+                "unique_together": {("repository", "name")},
+            },
+        ),
+        migrations.RunPython(migration, noop),
+    ]
@@ -0,0 +1,167 @@
+# Generated by Django 2.2.28 on 2026-10-18 18:13
+
+import unicodedata
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+TRIGRAM_INDEX = "common_search_entry_trgm_idx"
+
+
+def normalize(text):  # pragma: no cover
+    decomposed = unicodedata.normalize("NFKD", text.lower())
+    return " ".join(
+        "".join(char for char in decomposed if not unicodedata.combining(char)).split()
+    )
+
+
+def noop(apps, schema_editor):  # pragma: no cover
+    pass
+
+
+def migration(apps, schema_editor):  # pragma: no cover
+    RepositoryExample = apps.get_model("common", "RepositoryExample")
+    RepositoryTranslatedExample = apps.get_model(
+        "common", "RepositoryTranslatedExample"
+    )
+    RepositoryExampleSearchEntry = apps.get_model(
+        "common", "RepositoryExampleSearchEntry"
+    )
+    fields = ("repository", "repository_version", "is_default_version", "intent")
+    rows = [
+        (example, None, language, text, *keys)
+        for example, language, text, *keys in RepositoryExample.objects.filter(
+            repository__isnull=False
+        )
+        .values_list("pk", "language", "text", *fields)
+        .iterator()
+    ] + [
+        (example, translation, language, text, *keys)
+        for translation, example, language, text, *keys in (
+            RepositoryTranslatedExample.objects.filter(
+                original_example__repository__isnull=False
+            )
+            .values_list(
+                "pk",
+                "original_example",
+                "language",
+                "text",
+                *["original_example__{}".format(field) for field in fields],
+            )
+            .iterator()
+        )
+    ]
+    RepositoryExampleSearchEntry.objects.bulk_create(
+        [
+            RepositoryExampleSearchEntry(
+                example_id=example,
+                translation_id=translation,
+                language=language,
+                text=text,
+                normalized_text=normalize(text),
+                **{"{}_id".format(field): key for field, key in zip(fields, keys)},
+            )
+            for example, translation, language, text, *keys in rows
+        ],
+        batch_size=1000,
+    )
+
+
+def create_trigram_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return  # pragma: no cover
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_opclass WHERE opcname = 'gin_trgm_ops'")
+        if cursor.fetchone() is None:
+            # pg_trgm without its index support, searches scan the entries
+            return  # pragma: no cover
+    schema_editor.execute(
+        "CREATE INDEX {} ON common_repositoryexamplesearchentry "
+        "USING gin (normalized_text gin_trgm_ops)".format(TRIGRAM_INDEX)
+    )
+
+
+def drop_trigram_index(apps, schema_editor):  # pragma: no cover
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute("DROP INDEX IF EXISTS {}".format(TRIGRAM_INDEX))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [("common", "0109_repositorysequence")]
+
+    operations = [
+        migrations.CreateModel(
+            name="RepositoryExampleSearchEntry",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("is_default_version", models.BooleanField(default=False)),
+                ("language", models.CharField(max_length=5, verbose_name="language")),
+                ("text", models.TextField(verbose_name="text")),
+                ("normalized_text", models.TextField(verbose_name="normalized text")),
+                (
+                    "example",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="search_entries",
+                        to="common.RepositoryExample",
+                    ),
+                ),
+                (
+                    "intent",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="common.RepositoryIntent",
+                    ),
+                ),
+                (
+                    "repository",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="common.Repository",
+                    ),
+                ),
+                (
+                    "repository_version",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="common.RepositoryVersion",
+                    ),
+                ),
+                (
+                    "translation",
+                    models.ForeignKey(
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="search_entries",
+                        to="common.RepositoryTranslatedExample",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "repository example search entry",
+                "verbose_name_plural": "repository example search entries",
+            },
+        ),
+        migrations.AddIndex(
+            model_name="repositoryexamplesearchentry",
+            index=models.Index(
+                fields=["repository", "is_default_version", "language"],
+                name="common_search_entry_idx",
+            ),
+        ),
+        migrations.RunPython(migration, noop),
+        migrations.RunPython(create_trigram_index, drop_trigram_index),
+    ]
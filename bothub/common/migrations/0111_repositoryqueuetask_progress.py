@@ -0,0 +1,32 @@
+# Generated by Django 2.2.28 on 2026-10-18 18:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [("common", "0110_repositoryexamplesearchentry")]
+
+    operations = [
+        migrations.AddField(
+            model_name="repositoryqueuetask",
+            name="progress",
+            field=models.PositiveSmallIntegerField(
+                default=0,
+                help_text="Percentage of the task processed",
+                verbose_name="progress",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="repositoryqueuetask",
+            name="type_processing",
+            field=models.PositiveIntegerField(
+                choices=[
+                    (0, "NLP Tranining"),
+                    (1, "Repository Auto Translation"),
+                    (2, "Repository Version Clone"),
+                ],
+                verbose_name="Type Processing",
+            ),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 2.2.28 on 2026-10-18 18:22
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [("common", "0111_repositoryqueuetask_progress")]
+
+    operations = [
+        migrations.AddField(
+            model_name="repositoryversion",
+            name="parent",
+            field=models.ForeignKey(
+                blank=True,
+                editable=False,
+                help_text="Version whose content this version shares until its first write",
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="children",
+                to="common.RepositoryVersion",
+            ),
+        )
+    ]
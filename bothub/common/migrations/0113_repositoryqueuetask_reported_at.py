@@ -0,0 +1,18 @@
+# Generated by Django 2.2.28 on 2026-10-18 18:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [("common", "0112_repositoryversion_parent")]
+
+    operations = [
+        migrations.AddField(
+            model_name="repositoryqueuetask",
+            name="reported_at",
+            field=models.DateTimeField(
+                editable=False, null=True, verbose_name="reported at"
+            ),
+        )
+    ]
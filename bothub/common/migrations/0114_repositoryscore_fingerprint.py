@@ -0,0 +1,21 @@
+# Generated by Django 2.2.28 on 2026-10-18 18:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [("common", "0113_repositoryqueuetask_reported_at")]
+
+    operations = [
+        migrations.AddField(
+            model_name="repositoryscore",
+            name="fingerprint",
+            field=models.CharField(blank=True, editable=False, max_length=64),
+        ),
+        migrations.AddField(
+            model_name="repositoryscore",
+            name="version_generation",
+            field=models.CharField(blank=True, editable=False, max_length=32),
+        ),
+    ]
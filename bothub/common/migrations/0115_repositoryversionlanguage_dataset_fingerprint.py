@@ -0,0 +1,28 @@
+# Generated by Django 2.2.28 on 2026-10-18 18:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [("common", "0114_repositoryscore_fingerprint")]
+
+    operations = [
+        migrations.AddField(
+            model_name="repositoryversionlanguage",
+            name="dataset_fingerprint",
+            field=models.CharField(
+                blank=True,
+                editable=False,
+                max_length=64,
+                verbose_name="dataset fingerprint",
+            ),
+        ),
+        migrations.AddField(
+            model_name="repositoryversionlanguage",
+            name="dataset_fingerprint_at",
+            field=models.DateTimeField(
+                editable=False, null=True, verbose_name="dataset fingerprint at"
+            ),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 2.2.28 on 2026-10-18 18:52
+
+import bothub.common.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [("common", "0115_repositoryversionlanguage_dataset_fingerprint")]
+
+    operations = [
+        migrations.AlterField(
+            model_name="repositoryversion",
+            name="parent",
+            field=models.ForeignKey(
+                blank=True,
+                editable=False,
+                help_text="Version whose content this version shares until its first write",
+                null=True,
+                on_delete=bothub.common.models.materialize_children,
+                related_name="children",
+                to="common.RepositoryVersion",
+            ),
+        )
+    ]
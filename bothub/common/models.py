@@ -1,25 +1,51 @@
+import gzip
+import hashlib
+import json
+import tempfile
+import threading
 import uuid
+from collections import Counter, defaultdict
+from contextlib import contextmanager
 from functools import reduce
 
 import requests
 from django.conf import settings
+from django.contrib.postgres.search import TrigramSimilarity
+from django.core.cache import cache, caches
 from django.core.exceptions import ValidationError
+from django.core.files import File
 from django.core.mail import send_mail
 from django.core.validators import RegexValidator, _lazy_re_compile
-from django.db import models
-from django.db.models import Sum, Q, IntegerField, Case, When
+from django.db import IntegrityError, connection, models, transaction
+from django.db.models import (
+    Sum,
+    Q,
+    IntegerField,
+    Case,
+    When,
+    F,
+    OuterRef,
+    Subquery,
+    Count,
+)
+from django.db.models.functions import Coalesce
 from django.dispatch import receiver
 from django.template.loader import render_to_string
 from django.utils import timezone
+from django.utils.dateparse import parse_datetime
 from django.utils.translation import ugettext_lazy as _
+from django_redis import get_redis_connection
+from redis.exceptions import RedisError
 from rest_framework import status
 from rest_framework.exceptions import APIException
 
 from bothub.authentication.models import User, RepositoryOwner
+from . import caching
 from . import languages
+from . import search
+from . import storages
 from .exceptions import DoesNotHaveTranslation
 from .exceptions import RepositoryUpdateAlreadyStartedTraining
-from .exceptions import RepositoryUpdateAlreadyTrained
 from .exceptions import TrainingNotAllowed
 from .. import utils
 
@@ -565,9 +591,7 @@ class Repository(models.Model):
         examples = self.examples(
             language=language, queryset=queryset, version_default=version_default
         )
-        examples_languages = examples.values_list(
-            "repository_version_language__language", flat=True
-        )
+        examples_languages = examples.values_list("language", flat=True)
         translations_languages = (
             examples.annotate(translations_count=models.Count("translations"))
             .filter(translations_count__gt=0)
@@ -583,11 +607,8 @@ class Repository(models.Model):
 
     @property
     def languages_status(self):
-        return dict(
-            map(
-                lambda language: (language, self.language_status(language)),
-                settings.SUPPORTED_LANGUAGES.keys(),
-            )
+        return RepositoryExample.objects.languages_status(
+            self.examples(), self.language
         )
 
     def current_versions(
@@ -675,16 +696,12 @@ class Repository(models.Model):
     def examples(self, language=None, queryset=None, version_default=True):
         if queryset is None:
             queryset = RepositoryExample.objects
-        query = queryset.filter(
-            repository_version_language__repository_version__repository=self
-        )
+        query = queryset.filter(repository=self)
 
         if version_default:
-            query = query.filter(
-                repository_version_language__repository_version__is_default=True
-            )
+            query = query.filter(is_default_version=True)
         if language:
-            query = query.filter(repository_version_language__language=language)
+            query = query.filter(language=language)
         return query
 
     def evaluations(
@@ -692,15 +709,11 @@ class Repository(models.Model):
     ):  # pragma: no cover
         if queryset is None:
             queryset = RepositoryEvaluate.objects
-        query = queryset.filter(
-            repository_version_language__repository_version__repository=self
-        )
+        query = queryset.filter(repository=self)
         if version_default:
-            query = query.filter(
-                repository_version_language__repository_version__is_default=True
-            )
+            query = query.filter(is_default_version=True)
         if language:
-            query = query.filter(repository_version_language__language=language)
+            query = query.filter(language=language)
         return query  # pragma: no cover
 
     def evaluations_results(self, queryset=None, version_default=True):
@@ -715,41 +728,6 @@ class Repository(models.Model):
         )
         return query
 
-    def language_status(self, language):
-        is_base_language = self.language == language
-        examples = self.examples(language)
-        base_examples = self.examples(self.language)
-        base_translations_count = RepositoryTranslatedExample.objects.filter(
-            original_example__in=base_examples, language=language
-        ).count()
-
-        base_examples_count = base_examples.count()
-        base_translations_percentage = (
-            base_translations_count
-            / (base_examples_count if base_examples_count > 0 else 1)
-        ) * 100
-
-        return {
-            "is_base_language": is_base_language,
-            "examples": {
-                "count": examples.count(),
-                "entities": list(
-                    set(
-                        filter(
-                            lambda x: x,
-                            examples.values_list(
-                                "entities__entity", flat=True
-                            ).distinct(),
-                        )
-                    )
-                ),
-            },
-            "base_translations": {
-                "count": base_translations_count,
-                "percentage": base_translations_percentage,
-            },
-        }
-
     def current_version(self, language=None, is_default=True):
         language = language or self.language
 
@@ -799,6 +777,28 @@ class Repository(models.Model):
             )
         return query
 
+    @property
+    def training_generation(self):
+        """
+        Opaque token that changes whenever the trained state of the repository
+        may change, used to key the cached NLP info responses
+        """
+        return caching.get_or_set(
+            "repository_training_generation:{}".format(self.uuid),
+            uuid.uuid4().hex,
+            None,
+        )
+
+    def bump_training_generation(self):
+        caching.set(
+            "repository_training_generation:{}".format(self.uuid),
+            uuid.uuid4().hex,
+            None,
+        )
+
+    def bump_versions_generation(self):
+        RepositoryVersion.bump_generation(*self.versions.values_list("pk", flat=True))
+
     def get_user_authorization(self, user):
         if user.is_anonymous:
             return RepositoryAuthorization(repository=self)
@@ -813,6 +813,19 @@ class Repository(models.Model):
         )
 
 
+def materialize_children(collector, field, sub_objs, using):
+    """
+    on_delete of RepositoryVersion.parent, the versions still sharing the
+    content of a deleted version copy it first, unless they are deleted along
+    with it. Runs while the deletion is collected, for instance and queryset
+    deletes and for the cascade of a repository alike
+    """
+    deleted = collector.data.get(field.model, ())
+    for version in sub_objs:
+        if version not in deleted:
+            version.materialize()
+
+
 class RepositoryVersion(models.Model):
     class Meta:
         verbose_name = _("repository version")
@@ -833,17 +846,277 @@ class RepositoryVersion(models.Model):
     )
     created_at = models.DateTimeField(_("created at"), auto_now_add=True)
     is_deleted = models.BooleanField(_("is deleted"), default=False)
+    entities_dirty = models.BooleanField(default=False, editable=False)
+    parent = models.ForeignKey(
+        "self",
+        materialize_children,
+        related_name="children",
+        null=True,
+        blank=True,
+        editable=False,
+        help_text=_("Version whose content this version shares until its first write"),
+    )
 
     @property
     def version_languages(self):
         return RepositoryVersionLanguage.objects.filter(repository_version=self)
 
+    @property
+    def source_version(self):
+        """
+        The version that holds the rows of the content of this version, itself
+        unless it still shares the content of its parent
+        """
+        version = self
+        while version.parent_id is not None:
+            version = version.parent
+        return version
+
+    @classmethod
+    def source_version_of(cls, pk):
+        """
+        source_version of the version pk, for the lookups scoped by a version
+        primary key
+        """
+        version = cls.objects.filter(pk=pk).first()
+        return pk if version is None else version.source_version
+
+    def materialize(self):
+        """
+        Copies the content shared with the parent into rows of this version,
+        which stops sharing it
+        """
+        from bothub.common.clone import VersionCloner
+
+        with transaction.atomic():
+            parent = (
+                RepositoryVersion.objects.select_for_update()
+                .filter(pk=self.pk)
+                .values_list("parent", flat=True)
+                .first()
+            )
+            if parent is not None:
+                source = RepositoryVersion.objects.get(pk=parent).source_version
+                # cleared first, the cloner opens the languages of this version
+                RepositoryVersion.objects.filter(pk=self.pk).update(parent=None)
+                self.parent = None
+                try:
+                    VersionCloner(source, self).clone()
+                except Exception:
+                    self.parent_id = parent
+                    raise
+        self.parent = None
+
+    @classmethod
+    def copy_before_write(cls, pk):
+        """
+        Materializes the version pk if it shares the content of its parent, and
+        the versions sharing its content, before a row of pk is written.
+        Returns the version pk, loaded by the same lookup
+        """
+        if pk is None:
+            return None
+        repository_version = None
+        for version in cls.objects.filter(Q(pk=pk) | Q(parent=pk)):
+            if version.pk == pk:
+                repository_version = version
+            if version.parent_id is not None:
+                version.materialize()
+        return repository_version
+
+    @staticmethod
+    def generation_key(pk):
+        return "repository_version_generation:{}".format(pk)
+
+    @property
+    def generation(self):
+        """
+        Opaque token that changes on every write to the version or to its
+        repository, used to key the cached repository dashboard payload
+        """
+        return caching.get_or_set(
+            RepositoryVersion.generation_key(self.pk), uuid.uuid4().hex, None
+        )
+
+    @classmethod
+    def bump_generation(cls, *pks):
+        """
+        Best effort, a write never fails on an unavailable redis
+        """
+        pks = {pk for pk in pks if pk is not None}
+        if pks:
+            caching.delete_many([cls.generation_key(pk) for pk in pks])
+
+    def sync_default_version_keys(self):
+        """
+        Propagates is_default to the denormalized copies kept on the examples,
+        translations, evaluations and search entries of this version
+        """
+        for model in (
+            RepositoryExample,
+            RepositoryTranslatedExample,
+            RepositoryEvaluate,
+            RepositoryExampleSearchEntry,
+        ):
+            model.objects.filter(repository_version=self).exclude(
+                is_default_version=self.is_default
+            ).update(is_default_version=self.is_default)
+
+    @classmethod
+    def mark_entities_dirty(cls, pk):
+        cls.objects.filter(pk=pk, entities_dirty=False).update(entities_dirty=True)
+
+    def collect_orphan_entities(self, batch_size=1000):
+        """
+        Deletes the entities no example of this version uses anymore, and the
+        groups they leave empty, batch_size entities at a time. Returns how
+        many entities were deleted
+        """
+        orphans = self.entities.exclude(
+            pk__in=RepositoryExampleEntity.objects.filter(
+                repository_example__repository_version=self
+            ).values("entity")
+        )
+        total = 0
+        while True:
+            batch = list(orphans.values_list("pk", "group")[:batch_size])
+            if not batch:
+                return total
+            pks, groups = zip(*batch)
+            with transaction.atomic():
+                # the usage is checked again in case an example took one back
+                deleted = orphans.filter(pk__in=pks).delete()[1]
+                RepositoryEntityGroup.objects.filter(
+                    pk__in=[group for group in groups if group is not None],
+                    entities__isnull=True,
+                ).delete()
+            total += deleted.get(RepositoryEntity._meta.label, 0)
+
     def get_version_language(self, language):
         version_language, created = RepositoryVersionLanguage.objects.get_or_create(
             repository_version=self, language=language
         )
         return version_language
 
+    def training_requirements(self, version_languages):
+        """
+        Works out requirements_to_train for several languages of this version
+        from the example counters, returns a dict mapping each version
+        language pk to its requirements and its number of examples
+        """
+        pks = [version_language.pk for version_language in version_languages]
+
+        queued = set(
+            RepositoryQueueTask.objects.filter(
+                repositoryversionlanguage__in=pks,
+                status__in=[
+                    RepositoryQueueTask.STATUS_PENDING,
+                    RepositoryQueueTask.STATUS_PROCESSING,
+                ],
+                type_processing=RepositoryQueueTask.TYPE_PROCESSING_TRAINING,
+            ).values_list("repositoryversionlanguage", flat=True)
+        )
+
+        intents = {pk: Counter() for pk in pks}
+        entities = {pk: Counter() for pk in pks}
+        for counters, field, counted in [
+            (RepositoryIntentCounter.objects, "intent__text", intents),
+            (RepositoryEntityCounter.objects, "entity__value", entities),
+        ]:
+            for pk, value, count in (
+                counters.filter(repository_version_language__in=pks)
+                .annotate(count=F("examples_count") + F("translations_count"))
+                .filter(count__gt=0)
+                .values_list("repository_version_language", field, "count")
+            ):
+                counted[pk][value] = count
+
+        result = {}
+        for pk in pks:
+            examples_count = sum(intents[pk].values())
+            if pk in queued:
+                result[pk] = ([_("This bot version is being trained.")], examples_count)
+                continue
+            r = []
+            if "" in intents[pk]:
+                r.append(_("All examples need have a intent."))
+            for intent, count in sorted(intents[pk].items()):
+                if count < RepositoryVersionLanguage.MIN_EXAMPLES_PER_INTENT:
+                    r.append(
+                        _(
+                            'The "{}" intention has only {} sentence\nAdd 1 more sentence to that intention (minimum is {})'
+                        ).format(
+                            intent,
+                            count,
+                            RepositoryVersionLanguage.MIN_EXAMPLES_PER_INTENT,
+                        )
+                    )
+            for entity, count in sorted(entities[pk].items()):
+                if count < RepositoryVersionLanguage.MIN_EXAMPLES_PER_ENTITY:
+                    r.append(
+                        _(
+                            'The entity "{}" has only {} sentence\nAdd 1 more sentence to that entity (minimum is {})'
+                        ).format(
+                            entity,
+                            count,
+                            RepositoryVersionLanguage.MIN_EXAMPLES_PER_ENTITY,
+                        )
+                    )
+            result[pk] = (r, examples_count)
+        return result
+
+    def version_languages_ready_for_train(self, languages):
+        """
+        Returns the existing version languages among languages that are ready
+        for train, without creating the missing ones
+        """
+        version_languages = list(
+            self.version_languages.filter(language__in=languages).select_related(
+                "repository_version__repository"
+            )
+        )
+        requirements = self.training_requirements(version_languages)
+        ready = []
+        for version_language in version_languages:
+            requirements_to_train, examples_count = requirements[version_language.pk]
+            if version_language.is_ready_for_train(
+                requirements_to_train, examples_count
+            ):
+                ready.append(version_language)
+        return ready
+
+    def intents_examples_count(self, language=None):
+        """
+        Maps the pk of each intent of this version to its number of original
+        examples, optionally limited to one language
+        """
+        counters = RepositoryIntentCounter.objects.filter(
+            repository_version_language__repository_version=self
+        )
+        if language:
+            counters = counters.filter(repository_version_language__language=language)
+        return dict(
+            counters.values_list("intent").annotate(Sum("examples_count")).order_by()
+        )
+
+    def rebuild_example_counters(self):
+        with transaction.atomic():
+            RepositoryIntentCounter.objects.rebuild(
+                self,
+                RepositoryIntentCounter.count(
+                    RepositoryExample.objects.filter(repository_version=self),
+                    RepositoryTranslatedExample.objects.filter(repository_version=self),
+                ),
+            )
+            RepositoryEntityCounter.objects.rebuild(
+                self,
+                RepositoryEntityCounter.count(
+                    RepositoryExampleEntity.objects.filter(
+                        repository_example__repository_version=self
+                    )
+                ),
+            )
+
     @classmethod
     def get_migration_types(cls):
         """
@@ -886,56 +1159,18 @@ class RepositoryVersion(models.Model):
 
     @property
     def languages_status(self):
-        return dict(
-            map(
-                lambda language: (language, self.language_status(language)),
-                settings.SUPPORTED_LANGUAGES.keys(),
-            )
-        )
-
-    def language_status(self, language):
-        is_base_language = self.repository.language == language
-        queryset = RepositoryExample.objects.filter(
-            repository_version_language__repository_version=self
-        )
-        examples = self.repository.examples(
-            language, queryset=queryset, version_default=self.is_default
-        )
-        base_examples = self.repository.examples(
-            self.repository.language, queryset=queryset, version_default=self.is_default
-        )
-        base_translations = RepositoryTranslatedExample.objects.filter(
-            original_example__in=base_examples, language=language
-        )
-
-        examples_count = examples.count()
-        base_examples_count = base_examples.count()
-        base_translations_count = base_translations.count()
-        base_translations_percentage = (
-            base_translations_count
-            / (base_examples_count if base_examples_count > 0 else 1)
-        ) * 100
-
-        return {
-            "is_base_language": is_base_language,
-            "examples": {
-                "count": examples_count,
-                "entities": list(
-                    set(
-                        filter(
-                            lambda x: x,
-                            examples.values_list(
-                                "entities__entity", flat=True
-                            ).distinct(),
-                        )
-                    )
+        cache_key = "repository_languages_status:{}:{}".format(self.pk, self.generation)
+        languages_status = caching.get(cache_key)
+        if languages_status is None:
+            languages_status = RepositoryExample.objects.languages_status(
+                self.repository.examples(
+                    queryset=RepositoryExample.objects.filter(repository_version=self),
+                    version_default=self.is_default,
                 ),
-            },
-            "base_translations": {
-                "count": base_translations_count,
-                "percentage": base_translations_percentage,
-            },
-        }
+                self.repository.language,
+            )
+            caching.set(cache_key, languages_status, settings.REDIS_TIMEOUT)
+        return languages_status
 
 
 class RepositoryVersionLanguage(models.Model):
@@ -972,99 +1207,84 @@ class RepositoryVersionLanguage(models.Model):
     total_training_end = models.IntegerField(
         _("total training end"), default=0, blank=False, null=False
     )
+    training_fingerprint = models.CharField(
+        _("training fingerprint"), max_length=64, blank=True, editable=False
+    )
+    trained_fingerprint = models.CharField(
+        _("trained fingerprint"), max_length=64, blank=True, editable=False
+    )
+    dataset_fingerprint = models.CharField(
+        _("dataset fingerprint"), max_length=64, blank=True, editable=False
+    )
+    dataset_fingerprint_at = models.DateTimeField(
+        _("dataset fingerprint at"), null=True, editable=False
+    )
 
     @property
     def examples(self):
-        examples = self.repository_version.repository.examples(
-            version_default=self.repository_version.is_default
+        repository_version = self.repository_version.source_version
+        examples = repository_version.repository.examples(
+            version_default=repository_version.is_default
         ).filter(
-            models.Q(
-                repository_version_language__language=self.language,
-                repository_version_language=self,
-            )
+            models.Q(language=self.language, repository_version=repository_version)
             | models.Q(
                 translations__language=self.language,
-                translations__repository_version_language=self,
+                translations__repository_version=repository_version,
             )
         )
         return examples.distinct()
 
+    def touch(self):
+        """
+        Records a change in the examples of the version language, deferred to
+        the end of the block inside bulk_ingest
+        """
+        state = bulk_ingest_state()
+        if state is not None:
+            state["version_languages"].add(self.pk)
+            state["repository_versions"].add(self.repository_version_id)
+            return
+        self.last_update = timezone.now()
+        self.save(update_fields=["last_update"])
+
     @property
     def requirements_to_train(self):
-        try:
-            self.validate_init_train()
-        except RepositoryUpdateAlreadyTrained:  # pragma: no cover
-            return [_("This bot version has already been trained.")]
-        except RepositoryUpdateAlreadyStartedTraining:  # pragma: no cover
-            return [_("This bot version is being trained.")]
-
-        r = []
-
-        intents = self.examples.values_list("intent__text", flat=True)
-
-        if "" in intents:
-            r.append(_("All examples need have a intent."))
-
-        weak_intents = (
-            self.examples.values("intent__text")
-            .annotate(intent_count=models.Count("id"))
-            .order_by()
-            .exclude(intent_count__gte=self.MIN_EXAMPLES_PER_INTENT)
-        )
-        if weak_intents.exists():
-            for i in weak_intents:
-                r.append(
-                    _(
-                        'The "{}" intention has only {} sentence\nAdd 1 more sentence to that intention (minimum is {})'
-                    ).format(
-                        i.get("intent__text"),
-                        i.get("intent_count"),
-                        self.MIN_EXAMPLES_PER_INTENT,
-                    )
-                )
-
-        weak_entities = (
-            self.examples.annotate(es_count=models.Count("entities"))
-            .filter(es_count__gte=1)
-            .values("entities__entity__value")
-            .annotate(entities_count=models.Count("id"))
-            .order_by()
-            .exclude(entities_count__gte=self.MIN_EXAMPLES_PER_ENTITY)
-        )
-        if weak_entities.exists():
-            for e in weak_entities:
-                r.append(
-                    _(
-                        'The entity "{}" has only {} sentence\nAdd 1 more sentence to that entity (minimum is {})'
-                    ).format(
-                        e.get("entities__entity__value"),
-                        e.get("entities_count"),
-                        self.MIN_EXAMPLES_PER_ENTITY,
-                    )
-                )
-
-        return r
+        requirements, examples_count = self.repository_version.training_requirements(
+            [self]
+        )[self.pk]
+        return requirements
 
-    @property
-    def ready_for_train(self):
-        if len(self.requirements_to_train) > 0:
+    def is_ready_for_train(self, requirements, examples_count):
+        if len(requirements) > 0:
             return False
 
         if self.training_end_at is not None and self.last_update is not None:
             if self.last_update <= self.training_end_at:
                 return False
+            # the fingerprint of the examples is only known for the last_update
+            # the refresh_dataset_fingerprints task computed it at
+            if (
+                self.trained_fingerprint
+                and self.dataset_fingerprint_at == self.last_update
+                and self.dataset_fingerprint == self.trained_fingerprint
+            ):
+                return False
 
-        if not self.added.exists() and not self.translated_added.exists():
-            return False
-
-        if self.examples.count() == 0:
-            return False
+        return examples_count > 0
 
-        return len(self.requirements_to_train) == 0
+    @property
+    def ready_for_train(self):
+        return self.is_ready_for_train(
+            *self.repository_version.training_requirements([self])[self.pk]
+        )
 
     @property
     def intents(self):
-        return list(set(self.examples.values_list("intent", flat=True)))
+        return list(
+            self.intent_counters.filter(
+                Q(examples_count__gt=0) | Q(translations_count__gt=0)
+            ).values_list("intent", flat=True)
+        )
 
     @property
     def warnings(self):
@@ -1109,6 +1329,7 @@ class RepositoryVersionLanguage(models.Model):
         )
         self.use_name_entities = self.repository_version.repository.use_name_entities
         self.use_analyze_char = self.repository_version.repository.use_analyze_char
+        self.training_fingerprint = self.build_training_snapshot()
         self.save(
             update_fields=[
                 "training_started_at",
@@ -1116,6 +1337,7 @@ class RepositoryVersionLanguage(models.Model):
                 "use_competing_intents",
                 "use_name_entities",
                 "use_analyze_char",
+                "training_fingerprint",
             ]
         )
         self.repository_version.save(update_fields=["created_by"])
@@ -1134,23 +1356,181 @@ class RepositoryVersionLanguage(models.Model):
         )
         return trainer
 
-    def update_trainer(self, bot_data, rasa_version):
+    def update_trainer(self, bot_data, rasa_version, artifact=""):
         trainer, created = RepositoryNLPTrain.objects.get_or_create(
             repositoryversionlanguage=self, rasa_version=rasa_version
         )
         trainer.bot_data = bot_data
-        trainer.save(update_fields=["bot_data"])
+        trainer.artifact = artifact
+        trainer.save(update_fields=["bot_data", "artifact"])
 
-    def save_training(self, bot_data, rasa_version):
+    def save_training(self, bot_data, rasa_version, artifact=""):
         last_time = timezone.now()
 
         self.training_end_at = last_time
         self.last_update = last_time
-        self.update_trainer(bot_data, rasa_version=rasa_version)
+        self.trained_fingerprint = self.training_fingerprint
+        self.update_trainer(bot_data, rasa_version=rasa_version, artifact=artifact)
         self.total_training_end += 1
         self.save(
-            update_fields=["total_training_end", "training_end_at", "last_update"]
+            update_fields=[
+                "total_training_end",
+                "training_end_at",
+                "last_update",
+                "trained_fingerprint",
+            ]
+        )
+        self.repository_version.repository.bump_training_generation()
+
+    def iter_training_examples(self, chunk_size=2000):
+        """
+        Yields the rasa nlu training data of this version language, original
+        examples first and then the translations, using a fixed number of
+        queries. Entities are merged with their examples by primary key order.
+        """
+        repository_version = self.repository_version
+
+        originals = RepositoryExample.objects.filter(repository_version_language=self)
+        translations = RepositoryTranslatedExample.objects.filter(
+            repository_version_language=self,
+            language=self.language,
+            original_example__repository=repository_version.repository,
+        ).exclude(original_example__repository_version_language=self)
+        if repository_version.is_default:
+            translations = translations.filter(
+                original_example__is_default_version=True
+            )
+
+        entity_fields = ("start", "end", "entity__value", "entity__group__value")
+
+        yield from self._merge_training_entities(
+            originals.order_by("pk")
+            .values_list("pk", "text", "intent__text")
+            .iterator(chunk_size=chunk_size),
+            RepositoryExampleEntity.objects.filter(repository_example__in=originals)
+            .order_by("repository_example", "pk")
+            .values_list("repository_example", *entity_fields)
+            .iterator(chunk_size=chunk_size),
+        )
+        yield from self._merge_training_entities(
+            translations.order_by("pk")
+            .values_list("pk", "text", "original_example__intent__text")
+            .iterator(chunk_size=chunk_size),
+            RepositoryTranslatedExampleEntity.objects.filter(
+                repository_translated_example__in=translations
+            )
+            .order_by("repository_translated_example", "pk")
+            .values_list("repository_translated_example", *entity_fields)
+            .iterator(chunk_size=chunk_size),
+        )
+
+    @staticmethod
+    def _merge_training_entities(examples, entities):
+        entities = iter(entities)
+        pending = next(entities, None)
+
+        for pk, text, intent in examples:
+            example_entities = []
+            while pending is not None and pending[0] <= pk:
+                if pending[0] == pk:
+                    example_pk, start, end, entity, group = pending
+                    entity_data = {
+                        "start": start,
+                        "end": end,
+                        "value": text[start:end],
+                        "entity": entity,
+                    }
+                    if group is not None:
+                        entity_data["role"] = group
+                    example_entities.append(entity_data)
+                pending = next(entities, None)
+
+            yield {"text": text, "intent": intent, "entities": example_entities}
+
+    @property
+    def training_snapshot_header(self):
+        repository = self.repository_version.repository
+        return {
+            "language": self.language,
+            "algorithm": repository.algorithm,
+            "use_name_entities": repository.use_name_entities,
+            "use_competing_intents": repository.use_competing_intents,
+            "use_analyze_char": repository.use_analyze_char,
+        }
+
+    def write_training_snapshot(self, fileobj=None):
+        """
+        Serializes the training data as a json document, gzipped into fileobj
+        when one is given, and returns its fingerprint. The fingerprint does
+        not depend on the examples order, so an edit that is later reverted
+        keeps the same fingerprint.
+        """
+        header = json.dumps(self.training_snapshot_header, sort_keys=True)
+        snapshot = (
+            gzip.GzipFile(fileobj=fileobj, mode="wb", mtime=0) if fileobj else None
         )
+        digests = []
+
+        if snapshot:
+            snapshot.write('{}, "examples": ['.format(header[:-1]).encode())
+        for example in self.iter_training_examples():
+            line = json.dumps(example, sort_keys=True).encode()
+            if snapshot:
+                snapshot.write(b", " + line if digests else line)
+            digests.append(hashlib.sha256(line).digest())
+        if snapshot:
+            snapshot.write(b"]}")
+            snapshot.close()
+
+        fingerprint = hashlib.sha256(header.encode())
+        for digest in sorted(digests):
+            fingerprint.update(digest)
+        return fingerprint.hexdigest()
+
+    def refresh_dataset_fingerprint(self):
+        """
+        Fingerprints the training data changed since the last training, at most
+        once per last_update, so an edit that was reverted is not trained again
+        """
+        if (
+            not self.trained_fingerprint
+            or self.training_end_at is None
+            or self.last_update is None
+            or self.last_update <= self.training_end_at
+            or self.dataset_fingerprint_at == self.last_update
+        ):
+            return
+        fingerprint = self.write_training_snapshot()
+        # a write meanwhile moved last_update, the fingerprint is already stale
+        RepositoryVersionLanguage.objects.filter(
+            pk=self.pk, last_update=self.last_update
+        ).update(
+            dataset_fingerprint=fingerprint, dataset_fingerprint_at=self.last_update
+        )
+        self.dataset_fingerprint = fingerprint
+        self.dataset_fingerprint_at = self.last_update
+
+    @staticmethod
+    def training_snapshot_name(fingerprint):
+        return "{}.json.gz".format(fingerprint)
+
+    def build_training_snapshot(self):
+        with tempfile.SpooledTemporaryFile(max_size=8 * 1024 * 1024) as snapshot:
+            fingerprint = self.write_training_snapshot(snapshot)
+            snapshot.seek(0)
+            storages.save_content_addressed(
+                storages.training_snapshot_storage(),
+                self.training_snapshot_name(fingerprint),
+                File(snapshot),
+            )
+        return fingerprint
+
+    def open_training_snapshot(self):
+        storage = storages.training_snapshot_storage()
+        name = self.training_snapshot_name(self.training_fingerprint)
+        if not self.training_fingerprint or not storage.exists(name):
+            return None
+        return storage.open(name)
 
     @property
     def get_bot_data(self):
@@ -1167,12 +1547,33 @@ class RepositoryNLPTrain(models.Model):
         unique_together = ["repositoryversionlanguage", "rasa_version"]
 
     bot_data = models.TextField(_("bot data"), blank=True)
+    artifact = models.CharField(
+        _("artifact"),
+        max_length=64,
+        blank=True,
+        help_text=_("SHA-256 of the trained model in the artifact storage"),
+    )
     repositoryversionlanguage = models.ForeignKey(
         RepositoryVersionLanguage, models.CASCADE, related_name="trainers"
     )
     rasa_version = models.CharField(_("Rasa Version Code"), max_length=20)
     created_at = models.DateTimeField(_("created at"), auto_now_add=True)
 
+    @property
+    def has_bot_data(self):
+        return bool(self.artifact or self.bot_data)
+
+    def open_artifact(self):
+        return storages.artifact_storage().open(storages.artifact_name(self.artifact))
+
+    def artifact_url(self):
+        try:
+            return storages.artifact_storage().url(
+                storages.artifact_name(self.artifact)
+            )
+        except (NotImplementedError, ValueError):
+            return ""
+
 
 class RepositoryQueueTask(models.Model):
     class Meta:
@@ -1194,9 +1595,11 @@ class RepositoryQueueTask(models.Model):
     ]
     TYPE_PROCESSING_TRAINING = 0
     TYPE_PROCESSING_AUTO_TRANSLATE = 1
+    TYPE_PROCESSING_CLONE_VERSION = 2
     TYPE_PROCESSING_CHOICES = [
         (TYPE_PROCESSING_TRAINING, _("NLP Tranining")),
         (TYPE_PROCESSING_AUTO_TRANSLATE, _("Repository Auto Translation")),
+        (TYPE_PROCESSING_CLONE_VERSION, _("Repository Version Clone")),
     ]
 
     repositoryversionlanguage = models.ForeignKey(
@@ -1215,6 +1618,137 @@ class RepositoryQueueTask(models.Model):
     type_processing = models.PositiveIntegerField(
         _("Type Processing"), choices=TYPE_PROCESSING_CHOICES
     )
+    progress = models.PositiveSmallIntegerField(
+        _("progress"), default=0, help_text=_("Percentage of the task processed")
+    )
+    reported_at = models.DateTimeField(_("reported at"), null=True, editable=False)
+
+    def report_status(self, status, ml_units=None, end_training=None):
+        """
+        Saves the status pushed by the NLP service, the task is left out of
+        the polling of trainings_check_task for a while after it
+        """
+        fields = ["status", "reported_at"]
+        self.status = status
+        self.reported_at = timezone.now()
+        if ml_units is not None:
+            self.ml_units = ml_units
+            fields.append("ml_units")
+        if end_training is not None or status == RepositoryQueueTask.STATUS_SUCCESS:
+            self.end_training = end_training or self.reported_at
+            fields.append("end_training")
+        self.save(update_fields=fields)
+
+
+class RepositoryNLPLogManager(models.Manager):
+    BUFFER_KEY = "nlp_logs_buffer"
+    BUFFER_LOCK = "nlp_logs_buffer_lock"
+
+    def bulk_ingest(self, entries):
+        """
+        Saves a batch of logs with their ranked intents using bulk_create and
+        adds them to the daily reports, entries are dicts with the log fields,
+        user and repository_version_language as primary keys, log_intent and
+        optionally the created_at the log was received
+        """
+        logs = self.bulk_create(
+            [
+                RepositoryNLPLog(
+                    text=entry.get("text"),
+                    user_agent=entry.get("user_agent"),
+                    from_backend=entry.get("from_backend"),
+                    repository_version_language_id=entry.get(
+                        "repository_version_language"
+                    ),
+                    nlp_log=entry.get("nlp_log", ""),
+                    user_id=entry.get("user"),
+                )
+                for entry in entries
+            ]
+        )
+        # auto_now_add stamps the insert time, buffered logs keep the time
+        # they were received
+        received = defaultdict(list)
+        for log, entry in zip(logs, entries):
+            if entry.get("created_at"):
+                log.created_at = parse_datetime(entry["created_at"])
+                received[log.created_at].append(log.pk)
+        for created_at, pks in received.items():
+            self.filter(pk__in=pks).update(created_at=created_at)
+        RepositoryNLPLogIntent.objects.bulk_create(
+            [
+                RepositoryNLPLogIntent(
+                    intent=intent.get("intent"),
+                    confidence=intent.get("confidence"),
+                    is_default=intent.get("is_default"),
+                    repository_nlp_log=log,
+                )
+                for log, entry in zip(logs, entries)
+                for intent in entry.get("log_intent", [])
+            ]
+        )
+        RepositoryReports.objects.add_reports(
+            Counter(
+                (
+                    entry.get("repository_version_language"),
+                    entry.get("user"),
+                    log.created_at.date(),
+                )
+                for log, entry in zip(logs, entries)
+            )
+        )
+        return logs
+
+    def buffer(self, entries):
+        """
+        Appends the entries to the redis write-behind buffer flushed by the
+        flush_nlp_logs task
+        """
+        created_at = timezone.now().isoformat()
+        get_redis_connection("default").rpush(
+            self.BUFFER_KEY,
+            *[json.dumps(dict(entry, created_at=created_at)) for entry in entries],
+        )
+
+    def flush_buffer(self, batch_size=None):
+        """
+        Moves up to batch_size buffered entries to the database, returns how
+        many were taken from the buffer. The entries are only removed from it
+        after the transaction commits, so callers must hold BUFFER_LOCK
+        """
+        batch_size = batch_size or settings.NLP_LOG_FLUSH_BATCH_SIZE
+        redis = get_redis_connection("default")
+        entries = [
+            json.loads(entry)
+            for entry in redis.lrange(self.BUFFER_KEY, 0, batch_size - 1)
+        ]
+        if entries:
+            with transaction.atomic():
+                self.bulk_ingest(self.saveable(entries))
+            redis.ltrim(self.BUFFER_KEY, len(entries), -1)
+        return len(entries)
+
+    def saveable(self, entries):
+        """
+        Leaves out the buffered entries whose version language or user was
+        deleted while they waited, they would fail the whole batch otherwise
+        """
+        version_languages = set(
+            RepositoryVersionLanguage.objects.filter(
+                pk__in={entry.get("repository_version_language") for entry in entries}
+            ).values_list("pk", flat=True)
+        )
+        users = set(
+            RepositoryOwner.objects.filter(
+                pk__in={entry.get("user") for entry in entries}
+            ).values_list("pk", flat=True)
+        )
+        return [
+            entry
+            for entry in entries
+            if entry.get("repository_version_language") in version_languages
+            and entry.get("user") in users
+        ]
 
 
 class RepositoryNLPLog(models.Model):
@@ -1243,6 +1777,8 @@ class RepositoryNLPLog(models.Model):
     user = models.ForeignKey(RepositoryOwner, models.CASCADE)
     created_at = models.DateTimeField(_("created at"), auto_now_add=True)
 
+    objects = RepositoryNLPLogManager()
+
     def intents(self, repository_nlp_log):
         return RepositoryNLPLogIntent.objects.filter(
             repository_nlp_log=repository_nlp_log
@@ -1265,6 +1801,61 @@ class RepositoryNLPLogIntent(models.Model):
     )
 
 
+class RepositoryReportsManager(models.Manager):
+    def add_reports(self, counts):
+        """
+        Adds to the daily counters, counts maps (repository_version_language,
+        user, report_date) primary keys to the number of new logs
+        """
+        if not counts:
+            return
+        # a stable order keeps concurrent batches from deadlocking
+        rows = sorted(counts.items())
+        if connection.vendor == "postgresql":
+            self._upsert_reports(rows)
+            return
+        for (repository_version_language, user, report_date), count in rows:
+            reports = self.filter(
+                repository_version_language=repository_version_language,
+                user=user,
+                report_date=report_date,
+            )
+            if reports.update(count_reports=F("count_reports") + count):
+                continue
+            try:
+                with transaction.atomic():
+                    self.create(
+                        repository_version_language_id=repository_version_language,
+                        user_id=user,
+                        report_date=report_date,
+                        count_reports=count,
+                    )
+            except IntegrityError:
+                # created by a concurrent request since the update
+                reports.update(count_reports=F("count_reports") + count)
+
+    def _upsert_reports(self, rows):
+        opts = self.model._meta
+        quote_name = connection.ops.quote_name
+        columns = [
+            quote_name(opts.get_field(name).column)
+            for name in ["repository_version_language", "user", "report_date"]
+        ]
+        count_column = quote_name(opts.get_field("count_reports").column)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "INSERT INTO {table} ({columns}, {count}) VALUES {values} "
+                "ON CONFLICT ({columns}) DO UPDATE "
+                "SET {count} = {table}.{count} + EXCLUDED.{count}".format(
+                    table=quote_name(opts.db_table),
+                    columns=", ".join(columns),
+                    count=count_column,
+                    values=", ".join(["(%s, %s, %s, %s)"] * len(rows)),
+                ),
+                [value for key, count in rows for value in (*key, count)],
+            )
+
+
 class RepositoryReports(models.Model):
     class Meta:
         verbose_name = _("repository report")
@@ -1281,6 +1872,75 @@ class RepositoryReports(models.Model):
     count_reports = models.IntegerField(default=0)
     report_date = models.DateField(_("report date"))
 
+    objects = RepositoryReportsManager()
+
+
+class RepositorySequenceManager(models.Manager):
+    def next_value(self, repository, name):
+        """
+        Increments and returns the name sequence of repository, starting at 1.
+        The row lock taken by the increment serializes concurrent callers
+        until their transaction ends
+        """
+        if connection.vendor == "postgresql":
+            return self._upsert_next_value(repository, name)
+        with transaction.atomic():
+            sequences = self.filter(repository=repository, name=name)
+            if not sequences.update(value=F("value") + 1):
+                try:
+                    with transaction.atomic():
+                        return self.create(repository=repository, name=name).value
+                except IntegrityError:
+                    # created by a concurrent request since the update
+                    sequences.update(value=F("value") + 1)
+            return sequences.values_list("value", flat=True).get()
+
+    def _upsert_next_value(self, repository, name):
+        opts = self.model._meta
+        quote_name = connection.ops.quote_name
+        columns = [
+            quote_name(opts.get_field(field).column) for field in ["repository", "name"]
+        ]
+        value_column = quote_name(opts.get_field("value").column)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "INSERT INTO {table} ({columns}, {value}) VALUES (%s, %s, 1) "
+                "ON CONFLICT ({columns}) DO UPDATE "
+                "SET {value} = {table}.{value} + 1 RETURNING {value}".format(
+                    table=quote_name(opts.db_table),
+                    columns=", ".join(columns),
+                    value=value_column,
+                ),
+                [repository.pk, name],
+            )
+            return cursor.fetchone()[0]
+
+
+class RepositorySequence(models.Model):
+    class Meta:
+        verbose_name = _("repository sequence")
+        unique_together = ["repository", "name"]
+
+    EVALUATE_RESULT = "evaluate_result"
+
+    repository = models.ForeignKey(Repository, models.CASCADE, related_name="sequences")
+    name = models.CharField(_("name"), max_length=64)
+    value = models.PositiveIntegerField(_("value"), default=1)
+
+    objects = RepositorySequenceManager()
+
+
+class VersionContentQuerySet(models.QuerySet):
+    """
+    Materializes a version that shares the content of its parent before its
+    rows are looked up to create one, so the lookup finds the copied rows
+    """
+
+    def get_or_create(self, defaults=None, **kwargs):
+        version = kwargs.get("repository_version", kwargs.get("repository_version_id"))
+        RepositoryVersion.copy_before_write(getattr(version, "pk", version))
+        return super().get_or_create(defaults=defaults, **kwargs)
+
 
 class RepositoryIntent(models.Model):
     class Meta:
@@ -1300,34 +1960,196 @@ class RepositoryIntent(models.Model):
     )
     created_at = models.DateTimeField(_("created at"), auto_now_add=True)
 
+    objects = VersionContentQuerySet.as_manager()
+
     def __str__(self):
         return self.text
 
 
-class RepositoryExample(models.Model):
-    class Meta:
-        verbose_name = _("repository example")
-        verbose_name_plural = _("repository examples")
+class RepositoryExampleManager(models.Manager):
+    def languages_status(self, examples, base_language):
+        """
+        Works out the status of every supported language for examples with
+        three grouped queries: the examples count, the entities and the
+        translations of the base language examples for each language
+        """
+        examples_count = dict(
+            examples.values_list("language").annotate(models.Count("pk")).order_by()
+        )
+        entities = {}
+        for example_language, entity in (
+            examples.filter(entities__isnull=False)
+            .values_list("language", "entities__entity")
+            .distinct()
+            .order_by()
+        ):
+            entities.setdefault(example_language, []).append(entity)
+        base_translations_count = dict(
+            RepositoryTranslatedExample.objects.filter(
+                original_example__in=examples.filter(language=base_language)
+            )
+            .values_list("language")
+            .annotate(models.Count("pk"))
+            .order_by()
+        )
+
+        base_examples_count = examples_count.get(base_language, 0)
+        languages_status = {}
+        for language in settings.SUPPORTED_LANGUAGES.keys():
+            translations_count = base_translations_count.get(language, 0)
+            languages_status[language] = {
+                "is_base_language": language == base_language,
+                "examples": {
+                    "count": examples_count.get(language, 0),
+                    "entities": sorted(entities.get(language, [])),
+                },
+                "base_translations": {
+                    "count": translations_count,
+                    "percentage": (
+                        translations_count
+                        / (base_examples_count if base_examples_count > 0 else 1)
+                    )
+                    * 100,
+                },
+            }
+        return languages_status
+
+
+class VersionLanguageKeysBase(models.Model):
+    """
+    Copies of the repository, version and default flag of the version language,
+    kept on the row so the example listings filter without joining through it
+    """
+
+    class Meta:
+        abstract = True
+
+    repository = models.ForeignKey(
+        Repository, models.CASCADE, related_name="+", editable=False, null=True
+    )
+    repository_version = models.ForeignKey(
+        RepositoryVersion, models.CASCADE, related_name="+", editable=False, null=True
+    )
+    is_default_version = models.BooleanField(default=False, editable=False)
+
+    def set_version_language_keys(self):
+        """
+        Also copies the shared content of the version before the row is written
+        """
+        if self.repository_version_language is None:
+            return
+        repository_version = RepositoryVersion.copy_before_write(
+            self.repository_version_language.repository_version_id
+        )
+        self.repository_version_language.repository_version = repository_version
+        self.repository_version = repository_version
+        self.repository_id = repository_version.repository_id
+        self.is_default_version = repository_version.is_default
+
+
+class RepositoryExample(VersionLanguageKeysBase):
+    class Meta:
+        verbose_name = _("repository example")
+        verbose_name_plural = _("repository examples")
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(
+                name="common_example_repository_idx",
+                fields=("repository", "is_default_version", "language"),
+            ),
+            models.Index(
+                name="common_example_version_idx",
+                fields=("repository_version", "language"),
+            ),
+        ]
 
     repository_version_language = models.ForeignKey(
         RepositoryVersionLanguage, models.CASCADE, related_name="added", editable=False
     )
+    language = models.CharField(_("language"), max_length=5, editable=False)
     text = models.TextField(_("text"), help_text=_("Example text"))
     intent = models.ForeignKey(RepositoryIntent, models.CASCADE)
     created_at = models.DateTimeField(_("created at"), auto_now_add=True)
     last_update = models.DateTimeField(_("last update"))
     is_corrected = models.BooleanField(default=False)
 
+    objects = RepositoryExampleManager()
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # the loaded intent and text tell which of them a save changes
+        instance.loaded_values = dict(zip(field_names, values))
+        return instance
+
+    def changed(self, field, update_fields):
+        if update_fields is not None and field not in update_fields:
+            return False
+        attname = self._meta.get_field(field).attname
+        loaded_values = getattr(self, "loaded_values", {})
+        return attname not in loaded_values or loaded_values[attname] != getattr(
+            self, attname
+        )
+
     def save(self, *args, **kwargs):
         self.last_update = timezone.now()
-        self.repository_version_language.last_update = timezone.now()
-        self.repository_version_language.save(update_fields=["last_update"])
-        super(RepositoryExample, self).save(*args, **kwargs)
+        self.repository_version_language.touch()
+        self.set_version_language_keys()
+        self.language = self.repository_version_language.language
+        adding = self._state.adding
+        update_fields = kwargs.get("update_fields")
+        previous_intent = None
+        if not adding and self.changed("intent", update_fields):
+            previous_intent = (
+                RepositoryExample.objects.filter(pk=self.pk)
+                .values_list("intent", flat=True)
+                .first()
+            )
+        with transaction.atomic():
+            super(RepositoryExample, self).save(*args, **kwargs)
+            if adding:
+                RepositoryIntentCounter.objects.add_counts(
+                    (
+                        Counter(
+                            {(self.repository_version_language_id, self.intent_id): 1}
+                        ),
+                        Counter(),
+                    ),
+                    self.repository_version_id,
+                )
+            elif previous_intent not in [None, self.intent_id]:
+                self.move_intent_counters(previous_intent)
+                self.search_entries.update(intent=self.intent)
+            if adding or self.changed("text", update_fields):
+                RepositoryExampleSearchEntry.objects.index(self, adding=adding)
+        self.loaded_values = {"intent_id": self.intent_id, "text": self.text}
+
+    def touch(self):
+        state = bulk_ingest_state()
+        if state is not None:
+            state["examples"].add(self.pk)
+            return
+        self.last_update = timezone.now()
+        self.save(update_fields=["last_update"])
 
-    @property
-    def language(self):
-        return self.repository_version_language.language
+    def move_intent_counters(self, previous_intent):
+        """
+        Moves this example and its translations from the counters of
+        previous_intent to the counters of its current intent
+        """
+        counts = RepositoryIntentCounter.count(
+            RepositoryExample.objects.filter(pk=self.pk), self.translations.all()
+        )
+        for counter in counts:
+            counter.update(
+                {
+                    (repository_version_language, previous_intent): -count
+                    for (repository_version_language, intent), count in list(
+                        counter.items()
+                    )
+                }
+            )
+        RepositoryIntentCounter.objects.add_counts(counts, self.repository_version_id)
 
     def has_valid_entities(self, language=None):  # pragma: no cover
         if not language or language == self.repository_version_language.language:
@@ -1351,18 +2173,31 @@ class RepositoryExample(models.Model):
         return self.get_translation(language).entities.all()
 
     def delete(self, using=None, keep_parents=False):
-        self.repository_version_language.last_update = timezone.now()
-        self.repository_version_language.save(update_fields=["last_update"])
-
-        instance = super().delete(using, keep_parents)
-
-        repository_version = self.repository_version_language.repository_version
-
-        RepositoryEntity.objects.exclude(
-            pk__in=RepositoryExampleEntity.objects.filter(
-                repository_example__repository_version_language__repository_version=repository_version
-            ).values("entity")
-        ).filter(repository_version=repository_version).delete()
+        RepositoryVersion.copy_before_write(self.repository_version_id)
+        self.repository_version_language.touch()
+
+        with transaction.atomic():
+            # the cascade removes the translations and entities without
+            # going through their own delete
+            RepositoryIntentCounter.objects.add_counts(
+                RepositoryIntentCounter.count(
+                    RepositoryExample.objects.filter(pk=self.pk),
+                    self.translations.all(),
+                ),
+                self.repository_version_id,
+                sign=-1,
+            )
+            RepositoryEntityCounter.objects.add_counts(
+                RepositoryEntityCounter.count(self.entities.all()),
+                self.repository_version_id,
+                sign=-1,
+            )
+            instance = super().delete(using, keep_parents)
+            # the entities left without examples are deleted later by the
+            # collect_orphan_entities task
+            RepositoryVersion.mark_entities_dirty(
+                self.repository_version_language.repository_version_id
+            )
 
         return instance
 
@@ -1392,12 +2227,22 @@ class RepositoryTranslatedExampleManager(models.Manager):
         )
 
 
-class RepositoryTranslatedExample(models.Model):
+class RepositoryTranslatedExample(VersionLanguageKeysBase):
     class Meta:
         verbose_name = _("repository translated example")
         verbose_name_plural = _("repository translated examples")
         unique_together = ["original_example", "language"]
         ordering = ["-created_at"]
+        indexes = [
+            models.Index(
+                name="common_translated_repo_idx",
+                fields=("repository", "is_default_version", "language"),
+            ),
+            models.Index(
+                name="common_translated_version_idx",
+                fields=("repository_version", "language"),
+            ),
+        ]
 
     repository_version_language = models.ForeignKey(
         RepositoryVersionLanguage,
@@ -1425,18 +2270,40 @@ class RepositoryTranslatedExample(models.Model):
     objects = RepositoryTranslatedExampleManager()
 
     def save(self, *args, **kwargs):
-        self.original_example.last_update = timezone.now()
-        self.original_example.save(update_fields=["last_update"])
-        self.repository_version_language.last_update = timezone.now()
-        self.repository_version_language.save(update_fields=["last_update"])
-        super(RepositoryTranslatedExample, self).save(*args, **kwargs)
+        self.original_example.touch()
+        self.repository_version_language.touch()
+        self.set_version_language_keys()
+        adding = self._state.adding
+        with transaction.atomic():
+            super(RepositoryTranslatedExample, self).save(*args, **kwargs)
+            if adding:
+                self.add_to_counters()
+            RepositoryExampleSearchEntry.objects.index(self.original_example, self)
 
     def delete(self, using=None, keep_parents=False):
-        self.original_example.last_update = timezone.now()
-        self.original_example.save(update_fields=["last_update"])
-        self.repository_version_language.last_update = timezone.now()
-        self.repository_version_language.save(update_fields=["last_update"])
-        super(RepositoryTranslatedExample, self).delete(using, keep_parents)
+        RepositoryVersion.copy_before_write(self.repository_version_id)
+        self.original_example.touch()
+        self.repository_version_language.touch()
+        with transaction.atomic():
+            self.add_to_counters(sign=-1)
+            super(RepositoryTranslatedExample, self).delete(using, keep_parents)
+
+    def add_to_counters(self, sign=1):
+        translations = RepositoryTranslatedExample.objects.filter(pk=self.pk)
+        RepositoryIntentCounter.objects.add_counts(
+            RepositoryIntentCounter.count(
+                RepositoryExample.objects.none(), translations
+            ),
+            self.repository_version_id,
+            sign=sign,
+        )
+        RepositoryEntityCounter.objects.add_counts(
+            RepositoryEntityCounter.count(
+                self.original_example.entities.all(), translations
+            ),
+            self.repository_version_id,
+            sign=sign,
+        )
 
     def entities_list_lambda_sort(item):
         return item.get("entity")
@@ -1476,6 +2343,115 @@ class RepositoryTranslatedExample(models.Model):
         )
 
 
+class RepositoryExampleSearchEntryManager(models.Manager):
+    def entry_fields(self, example, translation=None):
+        text = (translation or example).text
+        return {
+            "repository_id": example.repository_id,
+            "repository_version_id": example.repository_version_id,
+            "is_default_version": example.is_default_version,
+            "language": translation.language if translation else example.language,
+            "intent_id": example.intent_id,
+            "text": text,
+            "normalized_text": search.normalize(text),
+        }
+
+    def index(self, example, translation=None, adding=False):
+        """
+        Writes the search entry of the example, or of its translation, adding
+        tells it was just created and has no entry yet
+        """
+        fields = self.entry_fields(example, translation)
+        if adding or not self.filter(example=example, translation=translation).update(
+            **fields
+        ):
+            self.create(example=example, translation=translation, **fields)
+
+    def rebuild(self, examples):
+        """
+        Replaces the search entries of examples and of their translations
+        """
+        with transaction.atomic():
+            self.filter(example__in=examples).delete()
+            entries = []
+            for example in examples.iterator():
+                entries.append(
+                    self.model(example=example, **self.entry_fields(example))
+                )
+            for translation in RepositoryTranslatedExample.objects.filter(
+                original_example__in=examples
+            ).select_related("original_example"):
+                entries.append(
+                    self.model(
+                        example=translation.original_example,
+                        translation=translation,
+                        **self.entry_fields(translation.original_example, translation),
+                    )
+                )
+            self.bulk_create(entries, batch_size=1000)
+
+    def search(self, repositories, language, text, exclude_intents=(), limit=5):
+        """
+        Texts of the default version examples and translations of the
+        repositories in language most similar to text, from the most similar
+        """
+        entries = self.filter(
+            repository__in=repositories, language=language, is_default_version=True
+        ).exclude(intent__text__in=exclude_intents)
+        query = search.normalize(text)
+        if connection.vendor == "postgresql":
+            return list(
+                entries.filter(normalized_text__trigram_similar=query)
+                .annotate(similarity=TrigramSimilarity("normalized_text", query))
+                .order_by("-similarity", "pk")
+                .values_list("text", flat=True)[:limit]
+            )
+        return self.search_ngram_index(entries, query, limit)
+
+    def search_ngram_index(self, entries, query, limit):
+        texts = dict(entries.values_list("pk", "text"))
+        index = search.NgramIndex(entries.values_list("pk", "normalized_text"))
+        return [texts[pk] for pk in index.search(query, limit)]
+
+
+class RepositoryExampleSearchEntry(models.Model):
+    """
+    Normalized text of an example or of one of its translations, searched by
+    trigram similarity. PostgreSQL keeps a GIN trigram index on normalized_text
+    """
+
+    class Meta:
+        verbose_name = _("repository example search entry")
+        verbose_name_plural = _("repository example search entries")
+        indexes = [
+            models.Index(
+                name="common_search_entry_idx",
+                fields=("repository", "is_default_version", "language"),
+            )
+        ]
+
+    example = models.ForeignKey(
+        RepositoryExample, models.CASCADE, related_name="search_entries"
+    )
+    translation = models.ForeignKey(
+        RepositoryTranslatedExample,
+        models.CASCADE,
+        related_name="search_entries",
+        null=True,
+    )
+    repository = models.ForeignKey(Repository, models.CASCADE, related_name="+")
+    repository_version = models.ForeignKey(
+        RepositoryVersion, models.CASCADE, related_name="+"
+    )
+    is_default_version = models.BooleanField(default=False)
+    language = models.CharField(_("language"), max_length=5)
+    intent = models.ForeignKey(RepositoryIntent, models.CASCADE, related_name="+")
+    text = models.TextField(_("text"))
+    normalized_text = models.TextField(_("normalized text"))
+
+    objects = RepositoryExampleSearchEntryManager()
+
+
 class RepositoryEntityGroup(models.Model):
     class Meta:
         unique_together = ["repository_version", "value"]
@@ -1491,6 +2467,8 @@ class RepositoryEntityGroup(models.Model):
     )
     created_at = models.DateTimeField(_("created at"), auto_now_add=True)
 
+    objects = VersionContentQuerySet.as_manager()
+
     def examples(self, queryset=None, version_default=None):  # pragma: no cover
         return self.repository_version.repository.examples(
             queryset=queryset, version_default=version_default
@@ -1501,13 +2479,14 @@ class RepositoryEntityGroup(models.Model):
             Before deleting the group it updates all the entities and places
             it as not grouped so that they are not deleted
         """
+        RepositoryVersion.copy_before_write(self.repository_version_id)
         self.entities.filter(
             repository_version=self.repository_version, group=self
         ).update(group=None)
         return super().delete(using=using, keep_parents=keep_parents)
 
 
-class RepositoryEntityQueryset(models.QuerySet):
+class RepositoryEntityQueryset(VersionContentQuerySet):
     """
     Customized QuerySet created on account of evaluate, when creating a test phrase in evaluate, it sends to the model
      entity of evaluate the reference of the entities in the examples, it was done just when there is no entity,
@@ -1570,23 +2549,23 @@ class EntityBaseQueryset(models.QuerySet):  # pragma: no cover
         if type(entity) is not RepositoryEntity:
             instance = self.model(**kwargs)
             if "repository_evaluate_id" in instance.__dict__:
-                evaluate = instance.repository_evaluate
-                repository_version = (
-                    evaluate.repository_version_language.repository_version
-                )
+                repository_version = instance.repository_evaluate.repository_version_id
             elif "evaluate_result_id" in instance.__dict__:
                 result = instance.evaluate_result
                 repository_version = (
-                    result.repository_version_language.repository_version
+                    result.repository_version_language.repository_version_id
                 )
             else:
-                repository_version = (
-                    instance.example.repository_version_language.repository_version
-                )
+                repository_version = instance.example.repository_version_id
 
             entity, created = RepositoryEntity.objects.get_or_create(
-                repository_version=repository_version, value=entity
+                repository_version_id=repository_version, value=entity
             )
+            instance.entity = entity
+            # get_or_create already copied the shared content of the version
+            instance.version_copied = True
+            instance.save(force_insert=True, using=self.db)
+            return instance
 
         return super().create(entity=entity, **kwargs)
 
@@ -1653,6 +2632,22 @@ class EntityBase(models.Model):
         }
 
 
+class RepositoryExampleEntityQueryset(EntityBaseQueryset):
+    def delete(self):
+        with transaction.atomic():
+            RepositoryEntityCounter.objects.add_counts(
+                RepositoryEntityCounter.count(self),
+                *self.values_list("entity__repository_version", flat=True).distinct(),
+                sign=-1,
+            )
+            return super().delete()
+
+
+class RepositoryExampleEntityManager(models.Manager):
+    def get_queryset(self):
+        return RepositoryExampleEntityQueryset(self.model, using=self._db)
+
+
 class RepositoryExampleEntity(EntityBase):
     repository_example = models.ForeignKey(
         RepositoryExample,
@@ -1662,6 +2657,32 @@ class RepositoryExampleEntity(EntityBase):
         help_text=_("Example object"),
     )
 
+    objects = RepositoryExampleEntityManager()
+
+    def save(self, *args, **kwargs):
+        adding = self._state.adding
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            if adding:
+                RepositoryEntityCounter.objects.add_counts(
+                    RepositoryEntityCounter.count(
+                        RepositoryExampleEntity.objects.filter(pk=self.pk)
+                    ),
+                    self.entity.repository_version_id,
+                )
+
+    def delete(self, using=None, keep_parents=False):
+        RepositoryVersion.copy_before_write(self.entity.repository_version_id)
+        with transaction.atomic():
+            RepositoryEntityCounter.objects.add_counts(
+                RepositoryEntityCounter.count(
+                    RepositoryExampleEntity.objects.filter(pk=self.pk)
+                ),
+                self.entity.repository_version_id,
+                sign=-1,
+            )
+            return super().delete(using, keep_parents)
+
     def get_example(self):
         return self.repository_example
 
@@ -1679,6 +2700,281 @@ class RepositoryTranslatedExampleEntity(EntityBase):
         return self.repository_translated_example
 
 
+def grouped_count(queryset, *fields):
+    return Counter(
+        {
+            tuple(row[:-1]): row[-1]
+            for row in queryset.values_list(*fields)
+            .annotate(count=models.Count("pk"))
+            .order_by()
+        }
+    )
+
+
+_bulk_ingest = threading.local()
+
+
+def bulk_ingest_state():
+    return getattr(_bulk_ingest, "state", None)
+
+
+@contextmanager
+def bulk_ingest():
+    """
+    Imports examples and translations without touching the version languages,
+    original examples and counters on every row, they are updated once per
+    affected row when the outermost block ends
+    """
+    if bulk_ingest_state() is not None:
+        yield
+        return
+    state = _bulk_ingest.state = {
+        "version_languages": set(),
+        "repository_versions": set(),
+        "examples": set(),
+        "counts": {},
+    }
+    try:
+        yield
+    finally:
+        _bulk_ingest.state = None
+        # a broken transaction is rolled back together with the imported rows
+        if not transaction.get_connection().needs_rollback:
+            apply_bulk_ingest(state)
+
+
+def apply_bulk_ingest(state):
+    now = timezone.now()
+    RepositoryExample.objects.filter(pk__in=state["examples"]).update(last_update=now)
+    version_languages = RepositoryVersionLanguage.objects.filter(
+        pk__in=state["version_languages"]
+    )
+    version_languages.update(last_update=now)
+    RepositoryVersion.bump_generation(*state["repository_versions"])
+    for model, counts in state["counts"].items():
+        model.objects.add_counts(counts)
+
+
+class RepositoryExampleCounterManager(models.Manager):
+    def add_counts(self, counts, *repository_versions, sign=1):
+        """
+        Adds to the counters, counts is the pair of examples and translations
+        counters mapping (repository_version_language, counted) primary keys
+        to the number of new rows, sign=-1 takes them away. The generation of
+        repository_versions, the versions owning those version languages, is
+        bumped
+        """
+        state = bulk_ingest_state()
+        if state is not None:
+            state["repository_versions"].update(repository_versions)
+            pending = state["counts"].setdefault(self.model, (Counter(), Counter()))
+            for pending_counter, counter in zip(pending, counts):
+                pending_counter.update(
+                    {key: sign * count for key, count in counter.items()}
+                )
+            return
+        examples, translations = counts
+        field = self.model.COUNTED_FIELD
+        keys = sorted(set(examples) | set(translations))
+        if keys:
+            RepositoryVersion.bump_generation(*repository_versions)
+        # a stable order keeps concurrent changes from deadlocking
+        for key in keys:
+            examples_count = sign * examples[key]
+            translations_count = sign * translations[key]
+            if not examples_count and not translations_count:
+                continue
+            repository_version_language, counted = key
+            counters = self.filter(
+                repository_version_language=repository_version_language,
+                **{field: counted},
+            )
+            changes = {
+                "examples_count": F("examples_count") + examples_count,
+                "translations_count": F("translations_count") + translations_count,
+            }
+            if (
+                counters.update(**changes)
+                or min(examples_count, translations_count) < 0
+            ):
+                # nothing to take away from a counter deleted with its owner
+                continue
+            try:
+                with transaction.atomic():
+                    self.create(
+                        repository_version_language_id=repository_version_language,
+                        examples_count=examples_count,
+                        translations_count=translations_count,
+                        **{"{}_id".format(field): counted},
+                    )
+            except IntegrityError:
+                # created by a concurrent request since the update
+                counters.update(**changes)
+
+    def rebuild(self, repository_version, counts):
+        """
+        Replaces the counters of every language of repository_version
+        """
+        examples, translations = counts
+        field = self.model.COUNTED_FIELD
+        self.filter(
+            repository_version_language__repository_version=repository_version
+        ).delete()
+        counters = []
+        for key in sorted(set(examples) | set(translations)):
+            repository_version_language, counted = key
+            counters.append(
+                self.model(
+                    repository_version_language_id=repository_version_language,
+                    examples_count=examples[key],
+                    translations_count=translations[key],
+                    **{"{}_id".format(field): counted},
+                )
+            )
+        self.bulk_create(counters, batch_size=1000)
+
+
+class RepositoryIntentCounter(models.Model):
+    class Meta:
+        verbose_name = _("repository intent counter")
+        unique_together = ["repository_version_language", "intent"]
+
+    COUNTED_FIELD = "intent"
+
+    repository_version_language = models.ForeignKey(
+        RepositoryVersionLanguage, models.CASCADE, related_name="intent_counters"
+    )
+    intent = models.ForeignKey(RepositoryIntent, models.CASCADE)
+    examples_count = models.IntegerField(_("examples count"), default=0)
+    translations_count = models.IntegerField(_("translations count"), default=0)
+
+    objects = RepositoryExampleCounterManager()
+
+    @staticmethod
+    def count(examples, translations):
+        """
+        Counts the original examples and the translations of each version
+        language and intent
+        """
+        return (
+            grouped_count(examples, "repository_version_language", "intent"),
+            grouped_count(
+                translations.filter(
+                    language=F("repository_version_language__language")
+                ),
+                "repository_version_language",
+                "original_example__intent",
+            ),
+        )
+
+
+class RepositoryEntityCounter(models.Model):
+    class Meta:
+        verbose_name = _("repository entity counter")
+        unique_together = ["repository_version_language", "entity"]
+
+    COUNTED_FIELD = "entity"
+
+    repository_version_language = models.ForeignKey(
+        RepositoryVersionLanguage, models.CASCADE, related_name="entity_counters"
+    )
+    entity = models.ForeignKey(RepositoryEntity, models.CASCADE)
+    examples_count = models.IntegerField(_("examples count"), default=0)
+    translations_count = models.IntegerField(_("translations count"), default=0)
+
+    objects = RepositoryExampleCounterManager()
+
+    @staticmethod
+    def count(example_entities, translations=None):
+        """
+        Counts the entities of the original examples in their own version
+        language and in the version language of each translation, limited to
+        translations when given
+        """
+        translated = {
+            "repository_example__translations__language": F(
+                "repository_example__translations__repository_version_language__language"
+            )
+        }
+        if translations is not None:
+            translated["repository_example__translations__in"] = translations
+        return (
+            Counter()
+            if translations is not None
+            else grouped_count(
+                example_entities,
+                "repository_example__repository_version_language",
+                "entity",
+            ),
+            grouped_count(
+                example_entities.filter(**translated),
+                "repository_example__translations__repository_version_language",
+                "entity",
+            ),
+        )
+
+
+class RepositoryAuthorizationQuerySet(models.QuerySet):
+    def refresh_effective_roles(self):
+        """
+        Recomputes in a single UPDATE the role each authorization has once the
+        roles inherited from its user organizations are taken into account
+        """
+        return self.update(
+            effective_role=Case(
+                When(
+                    Q(role__gte=RepositoryAuthorization.ROLE_USER)
+                    | Q(user__isnull=True),
+                    then=F("role"),
+                ),
+                default=Coalesce(
+                    Subquery(
+                        RepositoryAuthorization.inherited_roles(
+                            OuterRef("user"), OuterRef("repository")
+                        )[:1]
+                    ),
+                    RepositoryAuthorization.ROLE_NOT_SETTED,
+                ),
+                output_field=IntegerField(),
+            )
+        )
+
+
+class RepositoryAuthorizationManager(
+    models.Manager.from_queryset(RepositoryAuthorizationQuerySet)
+):
+    @staticmethod
+    def cache_key(uuid):
+        return "repository_authorization:{}".format(uuid)
+
+    def get_cached(self, uuid):
+        """
+        Resolves a token with its user, repository and effective role, looking
+        at the in process cache, then at redis and only then at the database
+        """
+        key = self.cache_key(uuid)
+        authorization = caches["local"].get(key)
+        if authorization is None:
+            queryset = self.select_related("user", "repository")
+            try:
+                authorization = cache.get(key)
+                if authorization is None:
+                    authorization = queryset.get(uuid=uuid)
+                    # short lived, a missed invalidation only lasts this long
+                    cache.set(key, authorization, settings.AUTHORIZATION_CACHE_TIMEOUT)
+            except RedisError:
+                authorization = queryset.get(uuid=uuid)
+            caches["local"].set(key, authorization)
+        return authorization
+
+    def invalidate_cached(self, uuids):
+        keys = [self.cache_key(uuid) for uuid in uuids]
+        if keys:
+            # best effort, AUTHORIZATION_CACHE_TIMEOUT bounds a missed delete
+            caching.delete_many(keys)
+            caches["local"].delete_many(keys)
+
+
 class RepositoryAuthorization(models.Model):
     class Meta:
         verbose_name = _("repository authorization")
@@ -1716,36 +3012,49 @@ class RepositoryAuthorization(models.Model):
         _("role"), choices=ROLE_CHOICES, default=ROLE_NOT_SETTED
     )
     created_at = models.DateTimeField(_("created at"), auto_now_add=True)
+    effective_role = models.PositiveIntegerField(
+        _("effective role"),
+        choices=ROLE_CHOICES,
+        default=ROLE_NOT_SETTED,
+        editable=False,
+    )
+
+    objects = RepositoryAuthorizationManager()
 
     def save(self, *args, **kwargs):
         if self.is_owner:
             self.role = RepositoryAuthorization.ROLE_ADMIN
+        if self.role < RepositoryAuthorization.ROLE_USER and self.user_id:
+            self.effective_role = (
+                RepositoryAuthorization.inherited_roles(
+                    self.user_id, self.repository_id
+                ).first()
+                or RepositoryAuthorization.ROLE_NOT_SETTED
+            )
+        else:
+            self.effective_role = self.role
         super(RepositoryAuthorization, self).save(*args, **kwargs)
 
+    @staticmethod
+    def inherited_roles(user, repository):
+        """
+        Roles the user has in the organizations authorized in the repository,
+        highest first
+        """
+        return (
+            OrganizationAuthorization.objects.filter(
+                user=user,
+                organization__repositoryauthorization__repository=repository,
+                organization__repositoryauthorization__role__gt=RepositoryAuthorization.ROLE_NOT_SETTED,
+            )
+            .exclude(role=OrganizationAuthorization.ROLE_NOT_SETTED)
+            .order_by("-role")
+            .values_list("role", flat=True)
+        )
+
     @property
     def get_role(self):
-        if self.role < RepositoryAuthorization.ROLE_USER and self.user:
-            org = (
-                self.user.organization_user_authorization.exclude(
-                    role=RepositoryAuthorization.ROLE_NOT_SETTED
-                )
-                .filter(
-                    Q(
-                        organization__in=RepositoryAuthorization.objects.filter(
-                            repository=self.repository,
-                            user__in=self.user.organization_user_authorization.exclude(
-                                role=OrganizationAuthorization.ROLE_NOT_SETTED
-                            ).values_list("organization", flat=True),
-                        )
-                        .exclude(role=OrganizationAuthorization.ROLE_NOT_SETTED)
-                        .order_by("-role")
-                        .values_list("user")
-                    )
-                )
-                .order_by("-role")
-            ).first()
-            return org.role if org else RepositoryAuthorization.LEVEL_NOTHING
-        return self.role
+        return self.effective_role
 
     @property
     def level(self):
@@ -1956,12 +3265,22 @@ class RequestRepositoryAuthorization(models.Model):
             pass
 
 
-class RepositoryEvaluate(models.Model):
+class RepositoryEvaluate(VersionLanguageKeysBase):
     class Meta:
         verbose_name = _("repository evaluate test")
         verbose_name_plural = _("repository evaluate tests")
         ordering = ["-created_at"]
         db_table = "common_repository_evaluate"
+        indexes = [
+            models.Index(
+                name="common_evaluate_repository_idx",
+                fields=("repository", "is_default_version", "language"),
+            ),
+            models.Index(
+                name="common_evaluate_version_idx",
+                fields=("repository_version", "language"),
+            ),
+        ]
 
     repository_version_language = models.ForeignKey(
         RepositoryVersionLanguage,
@@ -1978,11 +3297,14 @@ class RepositoryEvaluate(models.Model):
         help_text=_("Evaluate intent reference"),
         validators=[validate_item_key],
     )
+    language = models.CharField(_("language"), max_length=5, editable=False, null=True)
     created_at = models.DateTimeField(_("created at"), auto_now_add=True)
 
-    @property
-    def language(self):
-        return self.repository_version_language.language
+    def save(self, *args, **kwargs):
+        self.set_version_language_keys()
+        if self.repository_version_language is not None:
+            self.language = self.repository_version_language.language
+        super().save(*args, **kwargs)
 
     def get_text(self, language=None):  # pragma: no cover
         if not language or language == self.repository_version_language.language:
@@ -2080,8 +3402,11 @@ class RepositoryEvaluateResult(models.Model):
     cross_validation = models.BooleanField(_("cross validation"), default=False)
 
     def save(self, *args, **kwargs):
-        repository = self.repository_version_language.repository_version.repository
-        self.version = repository.evaluations_results().count() + 1
+        if self._state.adding:
+            self.version = RepositorySequence.objects.next_value(
+                self.repository_version_language.repository_version.repository,
+                RepositorySequence.EVALUATE_RESULT,
+            )
         return super().save(*args, **kwargs)
 
 
@@ -2154,6 +3479,88 @@ class RepositoryTranslator(models.Model):
     created_at = models.DateTimeField(_("created at"), auto_now_add=True)
 
 
+class RepositoryScoreManager(models.Manager):
+    def datasets(self, versions):
+        """
+        Builds the scoring dataset of each version from its examples and
+        evaluations in the repository language, with one grouped query for
+        all the versions
+        """
+        pks = [version.pk for version in versions]
+        examples_count = dict(
+            RepositoryIntentCounter.objects.filter(
+                repository_version_language__repository_version__in=pks,
+                repository_version_language__language=F(
+                    "repository_version_language__repository_version__repository__language"
+                ),
+            )
+            .values_list("intent")
+            .annotate(Sum("examples_count"))
+            .order_by()
+        )
+        evaluate_count = dict(
+            RepositoryEvaluate.objects.filter(
+                repository_version__in=pks, language=F("repository__language")
+            )
+            .values_list("repository_version")
+            .annotate(Count("pk"))
+            .order_by()
+        )
+        datasets = {
+            pk: {
+                "intentions": [],
+                "train": {},
+                "train_count": 0,
+                "evaluate_count": evaluate_count.get(pk, 0),
+            }
+            for pk in pks
+        }
+        for version, intent, text in (
+            RepositoryIntent.objects.filter(repository_version__in=pks)
+            .order_by("pk")
+            .values_list("repository_version", "pk", "text")
+        ):
+            count = examples_count.get(intent, 0)
+            datasets[version]["intentions"].append(text)
+            datasets[version]["train"][text] = count
+            datasets[version]["train_count"] += count
+        return datasets
+
+    def refresh(self, versions):
+        """
+        Scores the repositories of the default versions whose generation
+        changed since they were last scored. A score is only saved when its
+        dataset fingerprint changed, returns how many were saved
+        """
+        generations = {version.pk: version.generation for version in versions}
+        scores = {
+            score.repository_id: score
+            for score in self.filter(
+                repository__in=[version.repository_id for version in versions]
+            )
+        }
+        changed = [
+            version
+            for version in versions
+            if version.repository_id not in scores
+            or scores[version.repository_id].version_generation
+            != generations[version.pk]
+        ]
+        datasets = self.datasets(changed)
+        saved = 0
+        for version in changed:
+            score = scores.get(version.repository_id)
+            if score is None:
+                score, created = self.get_or_create(repository=version.repository)
+            generation = generations[version.pk]
+            if score.set_scores(datasets[version.pk]):
+                # saving the score bumps the generation of the version
+                saved += 1
+                generation = version.generation
+            self.filter(pk=score.pk).update(version_generation=generation)
+        return saved
+
+
 class RepositoryScore(models.Model):
     class Meta:
         unique_together = ["repository"]
@@ -2169,6 +3576,46 @@ class RepositoryScore(models.Model):
     intents_size_recommended = models.TextField(null=True)
     evaluate_size_score = models.FloatField(default=0.0)
     evaluate_size_recommended = models.TextField(null=True)
+    fingerprint = models.CharField(max_length=64, blank=True, editable=False)
+    version_generation = models.CharField(max_length=32, blank=True, editable=False)
+
+    objects = RepositoryScoreManager()
+
+    def set_scores(self, dataset):
+        """
+        Saves the scores of dataset unless it has the fingerprint of the last
+        scored one, returns whether they were saved
+        """
+        fingerprint = hashlib.sha256(
+            json.dumps(dataset, sort_keys=True).encode()
+        ).hexdigest()
+        if fingerprint == self.fingerprint:
+            return False
+
+        intentions_balance = utils.intentions_balance_score(dataset)
+        intentions_size = utils.intentions_size_score(dataset)
+        evaluate_size = utils.evaluate_size_score(dataset)
+
+        self.intents_balance_score = float(intentions_balance.get("score"))
+        self.intents_balance_recommended = intentions_balance.get("recommended")
+        self.intents_size_score = float(intentions_size.get("score"))
+        self.intents_size_recommended = intentions_size.get("recommended")
+        self.evaluate_size_score = float(evaluate_size.get("score"))
+        self.evaluate_size_recommended = evaluate_size.get("recommended")
+        self.fingerprint = fingerprint
+
+        self.save(
+            update_fields=[
+                "intents_balance_score",
+                "intents_balance_recommended",
+                "intents_size_score",
+                "intents_size_recommended",
+                "evaluate_size_score",
+                "evaluate_size_recommended",
+                "fingerprint",
+            ]
+        )
+        return True
 
 
 @receiver(models.signals.pre_save, sender=RequestRepositoryAuthorization)
@@ -2204,13 +3651,128 @@ def send_request_rejected_email(instance, **kwargs):
     instance.send_request_rejected_email()
 
 
+@receiver(models.signals.post_save, sender=RepositoryAuthorization)
+@receiver(models.signals.post_delete, sender=RepositoryAuthorization)
+def refresh_repository_authorization_role(instance, **kwargs):
+    uuids = [instance.uuid]
+    if instance.user_id and instance.user.is_organization:
+        # members of an organization inherit its role in the repository
+        members = RepositoryAuthorization.objects.filter(
+            repository=instance.repository_id,
+            user__in=OrganizationAuthorization.objects.filter(
+                organization=instance.user_id
+            ).values("user"),
+        )
+        members.refresh_effective_roles()
+        uuids += members.values_list("uuid", flat=True)
+    RepositoryAuthorization.objects.invalidate_cached(uuids)
+
+
+@receiver(models.signals.post_save, sender=OrganizationAuthorization)
+@receiver(models.signals.post_delete, sender=OrganizationAuthorization)
+def refresh_organization_member_roles(instance, **kwargs):
+    authorizations = RepositoryAuthorization.objects.filter(user=instance.user_id)
+    authorizations.refresh_effective_roles()
+    RepositoryAuthorization.objects.invalidate_cached(
+        authorizations.values_list("uuid", flat=True)
+    )
+
+
+@receiver(models.signals.post_save, sender=Repository)
+def invalidate_repository_authorizations_cache(instance, **kwargs):
+    RepositoryAuthorization.objects.invalidate_cached(
+        instance.authorizations.values_list("uuid", flat=True)
+    )
+    instance.bump_training_generation()
+
+
+@receiver(models.signals.post_save, sender=RepositoryVersion)
+@receiver(models.signals.post_delete, sender=RepositoryVersion)
+def bump_repository_training_generation(instance, **kwargs):
+    instance.repository.bump_training_generation()
+
+
+@receiver(models.signals.post_save, sender=RepositoryVersion)
+def sync_repository_version_default_keys(instance, created, update_fields, **kwargs):
+    if not created and (update_fields is None or "is_default" in update_fields):
+        if instance.is_default and instance.parent_id is not None:
+            instance.materialize()
+        instance.sync_default_version_keys()
+
+
+@receiver(models.signals.pre_save, sender=RepositoryIntent)
+@receiver(models.signals.pre_save, sender=RepositoryEntityGroup)
+@receiver(models.signals.pre_save, sender=RepositoryEntity)
+def copy_shared_version_before_save(instance, **kwargs):
+    # the examples, translations and evaluations copy it in
+    # set_version_language_keys
+    RepositoryVersion.copy_before_write(instance.repository_version_id)
+
+
+@receiver(models.signals.pre_save, sender=RepositoryExampleEntity)
+@receiver(models.signals.pre_save, sender=RepositoryTranslatedExampleEntity)
+@receiver(models.signals.pre_save, sender=RepositoryEvaluateEntity)
+def copy_shared_version_before_entity_save(instance, **kwargs):
+    if getattr(instance, "version_copied", False):
+        return
+    # the entity is of the version of the example, and already loaded
+    RepositoryVersion.copy_before_write(instance.entity.repository_version_id)
+
+
+@receiver(models.signals.post_save, sender=Repository)
+@receiver(models.signals.post_save, sender=RepositoryVersion)
+@receiver(models.signals.post_delete, sender=RepositoryVersion)
+@receiver(models.signals.post_save, sender=RepositoryScore)
+def bump_repository_versions_generation(instance, **kwargs):
+    repository = instance if isinstance(instance, Repository) else instance.repository
+    repository.bump_versions_generation()
+
+
+@receiver(models.signals.post_save, sender=RepositoryAuthorization)
+@receiver(models.signals.post_delete, sender=RepositoryAuthorization)
+def bump_repository_authorizations_generation(instance, created=False, **kwargs):
+    # the authorization created on a first visit has no role to list
+    if created and instance.role == RepositoryAuthorization.ROLE_NOT_SETTED:
+        return
+    instance.repository.bump_versions_generation()
+
+
+@receiver(models.signals.m2m_changed, sender=Repository.categories.through)
+def bump_repository_categories_generation(instance, **kwargs):
+    if isinstance(instance, Repository):
+        instance.bump_versions_generation()
+
+
+@receiver(models.signals.post_save, sender=RepositoryVersionLanguage)
+@receiver(models.signals.post_delete, sender=RepositoryVersionLanguage)
+@receiver(models.signals.post_save, sender=RepositoryIntent)
+@receiver(models.signals.post_delete, sender=RepositoryIntent)
+@receiver(models.signals.post_save, sender=RepositoryEntity)
+@receiver(models.signals.post_delete, sender=RepositoryEntity)
+@receiver(models.signals.post_save, sender=RepositoryEntityGroup)
+@receiver(models.signals.post_delete, sender=RepositoryEntityGroup)
+def bump_repository_version_generation(instance, **kwargs):
+    RepositoryVersion.bump_generation(instance.repository_version_id)
+
+
+@receiver(models.signals.post_save, sender=RepositoryEvaluate)
+@receiver(models.signals.post_delete, sender=RepositoryEvaluate)
+def bump_repository_evaluate_generation(instance, **kwargs):
+    if instance.repository_version_language_id:
+        RepositoryVersion.bump_generation(
+            instance.repository_version_language.repository_version_id
+        )
+
+
 @receiver(models.signals.post_save, sender=RepositoryNLPLog)
 def save_log_nlp(instance, created, **kwargs):
     if created:
-        report, created = RepositoryReports.objects.get_or_create(
-            repository_version_language=instance.repository_version_language,
-            user=instance.user,
-            report_date=timezone.now().date(),
+        RepositoryReports.objects.add_reports(
+            {
+                (
+                    instance.repository_version_language_id,
+                    instance.user_id,
+                    timezone.now().date(),
+                ): 1
+            }
         )
-        report.count_reports += 1
-        report.save(update_fields=["count_reports"])
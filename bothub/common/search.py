@@ -0,0 +1,75 @@
+import heapq
+import re
+import unicodedata
+
+SIMILARITY_THRESHOLD = 0.3
+
+word_regex = re.compile(r"[^\W_]+")
+
+
+def normalize(text):
+    """
+    Lower case text without accents, the form kept in the search index
+    """
+    decomposed = unicodedata.normalize("NFKD", text.lower())
+    return " ".join(
+        "".join(char for char in decomposed if not unicodedata.combining(char)).split()
+    )
+
+
+def trigrams(text):
+    """
+    Set of trigrams of text built like pg_trgm does, each word padded with two
+    spaces in front and one behind
+    """
+    grams = set()
+    for word in word_regex.findall(text.lower()):
+        padded = "  {} ".format(word)
+        grams.update(padded[i : i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+def similarity(a, b):
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+class NgramIndex:
+    """
+    In memory trigram index used when the database has no pg_trgm, it ranks
+    the documents with the same similarity as the trigram_similar lookup
+    """
+
+    def __init__(self, documents=()):
+        self.documents = {}
+        self.postings = {}
+        for key, text in documents:
+            self.add(key, text)
+
+    def add(self, key, text):
+        grams = trigrams(text)
+        self.documents[key] = grams
+        for gram in grams:
+            self.postings.setdefault(gram, set()).add(key)
+
+    def search(self, text, limit, threshold=SIMILARITY_THRESHOLD):
+        """
+        Returns the keys of the limit documents most similar to text, from the
+        most similar, ignoring the ones below threshold
+        """
+        grams = trigrams(text)
+        candidates = set()
+        for gram in grams:
+            candidates |= self.postings.get(gram, set())
+        scored = [
+            (similarity(grams, self.documents[key]), key) for key in sorted(candidates)
+        ]
+        return [
+            key
+            for score, key in heapq.nlargest(
+                limit,
+                (item for item in scored if item[0] >= threshold),
+                key=lambda item: item[0],
+            )
+        ]
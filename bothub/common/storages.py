@@ -0,0 +1,122 @@
+import base64
+import hashlib
+import tempfile
+
+import boto3
+from botocore.exceptions import ClientError
+from django.conf import settings
+from django.core.files import File
+from django.core.files.storage import Storage, get_storage_class
+from django.utils.deconstruct import deconstructible
+
+
+def training_snapshot_storage():
+    return get_storage_class(settings.TRAINING_SNAPSHOT_STORAGE)(
+        location=settings.TRAINING_SNAPSHOT_ROOT
+    )
+
+
+def save_content_addressed(storage, name, content):
+    """
+    Content addressed names are immutable, a blob already stored under the same
+    name is kept and never written again
+    """
+    if not storage.exists(name):
+        storage.save(name, content)
+    return name
+
+
+@deconstructible
+class S3ArtifactStorage(Storage):
+    """
+    Minimal S3 compatible storage using the engine AWS settings, the location is
+    used as the key prefix inside the bucket
+    """
+
+    def __init__(self, location=""):
+        self.location = location.strip("/")
+        self.bucket_name = settings.AWS_BUCKET_NAME
+        self.client = boto3.client(
+            "s3",
+            endpoint_url=settings.AWS_ACCESS_ENDPOINT_URL,
+            aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
+            aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
+            region_name=settings.AWS_REGION_NAME,
+        )
+
+    def key(self, name):
+        return "{}/{}".format(self.location, name) if self.location else name
+
+    def _open(self, name, mode="rb"):
+        content = tempfile.SpooledTemporaryFile(
+            max_size=settings.FILE_UPLOAD_MAX_MEMORY_SIZE
+        )
+        self.client.download_fileobj(self.bucket_name, self.key(name), content)
+        content.seek(0)
+        return File(content, name)
+
+    def _save(self, name, content):
+        content.seek(0)
+        self.client.upload_fileobj(
+            content,
+            self.bucket_name,
+            self.key(name),
+            ExtraArgs={"ContentType": "application/gzip"},
+        )
+        return name
+
+    def exists(self, name):
+        try:
+            self.client.head_object(Bucket=self.bucket_name, Key=self.key(name))
+        except ClientError:
+            return False
+        return True
+
+    def delete(self, name):
+        self.client.delete_object(Bucket=self.bucket_name, Key=self.key(name))
+
+    def size(self, name):
+        return self.client.head_object(Bucket=self.bucket_name, Key=self.key(name))[
+            "ContentLength"
+        ]
+
+    def url(self, name):
+        return "{}/{}/{}".format(
+            self.client.meta.endpoint_url, self.bucket_name, self.key(name)
+        )
+
+
+def artifact_storage():
+    return get_storage_class(settings.ARTIFACT_STORAGE)(location=settings.ARTIFACT_ROOT)
+
+
+def artifact_name(digest):
+    return "{}/{}.tar.gz".format(digest[:2], digest)
+
+
+def save_artifact(chunks):
+    """
+    Streams the chunks into the artifact storage and returns their SHA-256 hex
+    digest, which is the only reference kept in the database
+    """
+    sha256 = hashlib.sha256()
+    with tempfile.SpooledTemporaryFile(
+        max_size=settings.FILE_UPLOAD_MAX_MEMORY_SIZE
+    ) as content:
+        for chunk in chunks:
+            sha256.update(chunk)
+            content.write(chunk)
+        digest = sha256.hexdigest()
+        content.seek(0)
+        save_content_addressed(artifact_storage(), artifact_name(digest), File(content))
+    return digest
+
+
+def iter_base64_decoded(data, chunk_size=64 * 1024):
+    """
+    Decodes a base64 string in chunks so the whole decoded model is never held
+    in memory next to its encoded copy
+    """
+    chunk_size -= chunk_size % 4
+    for start in range(0, len(data), chunk_size):
+        yield base64.b64decode(data[start : start + chunk_size])
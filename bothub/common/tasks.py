@@ -1,71 +1,169 @@
 import json
+import math
 import random
 import requests
+from concurrent.futures import ThreadPoolExecutor
 from datetime import timedelta
 from urllib.parse import urlencode
 from django.conf import settings
 from django.db import transaction
-from django.db.models import Q, Count
+from django.db.models import F, Q, Count
 from django.utils import timezone
+from django_redis import get_redis_connection
+from redis.exceptions import LockError
+from requests.adapters import HTTPAdapter
 
 from bothub import translate
 from bothub.celery import app
+from bothub.common.clone import VersionCloner
 from bothub.common.models import (
     RepositoryQueueTask,
     RepositoryVersion,
-    RepositoryVersionLanguage,
     RepositoryExample,
-    RepositoryExampleEntity,
-    RepositoryEntityGroup,
-    RepositoryEntity,
     RepositoryTranslatedExample,
     RepositoryTranslatedExampleEntity,
-    RepositoryEvaluate,
-    RepositoryEvaluateEntity,
     RepositoryIntent,
     Repository,
     RepositoryNLPLog,
     RepositoryScore,
+    RepositoryVersionLanguage,
+    bulk_ingest,
 )
-from bothub.utils import (
-    intentions_balance_score,
-    intentions_size_score,
-    evaluate_size_score,
-    request_nlp,
+from bothub.utils import request_nlp
+
+
+TRAININGS_CHECK_LOCK = "trainings_check_task"
+
+NLP_LOGS_FLUSH_LOCK_TIMEOUT = 300
+
+TASK_QUEUE_SERVICES = {
+    RepositoryQueueTask.QUEUE_AIPLATFORM: "ai-platform",
+    RepositoryQueueTask.QUEUE_CELERY: "celery",
+}
+
+task_queue_session = requests.Session()
+task_queue_session.mount(
+    "http://", HTTPAdapter(pool_maxsize=settings.NLP_TASK_QUEUE_WORKERS)
+)
+task_queue_session.mount(
+    "https://", HTTPAdapter(pool_maxsize=settings.NLP_TASK_QUEUE_WORKERS)
 )
 
 
+def task_queue_params(train):
+    return {
+        "id_task": train.id_queue,
+        "from_queue": TASK_QUEUE_SERVICES.get(train.from_queue),
+    }
+
+
+def fetch_task_status(train):
+    try:
+        return task_queue_session.get(
+            url=f"{settings.BOTHUB_NLP_BASE_URL}v2/task-queue/",
+            params=urlencode(task_queue_params(train)),
+            timeout=settings.NLP_TASK_QUEUE_TIMEOUT,
+        ).json()
+    except (requests.exceptions.RequestException, ValueError):
+        return None
+
+
+def fetch_tasks_status(trains):
+    """
+    Maps the pk of each training task to its status in the NLP service. With
+    NLP_TASK_QUEUE_BATCH all of them are asked in one request answered with
+    the list of their statuses, otherwise one request per task is made from
+    a pool of NLP_TASK_QUEUE_WORKERS threads. The tasks the service did not
+    answer about are left out
+    """
+    if not trains:
+        return {}
+    if settings.NLP_TASK_QUEUE_BATCH:
+        try:
+            results = task_queue_session.post(
+                url=f"{settings.BOTHUB_NLP_BASE_URL}v2/task-queue/batch/",
+                json={"tasks": [task_queue_params(train) for train in trains]},
+                timeout=settings.NLP_TASK_QUEUE_TIMEOUT,
+            ).json()
+        except (requests.exceptions.RequestException, ValueError):
+            return {}
+        by_id_queue = {result.get("id_task"): result for result in results}
+        return {
+            train.pk: by_id_queue[train.id_queue]
+            for train in trains
+            if train.id_queue in by_id_queue
+        }
+    with ThreadPoolExecutor(max_workers=settings.NLP_TASK_QUEUE_WORKERS) as executor:
+        results = executor.map(fetch_task_status, trains)
+        return {
+            train.pk: result
+            for train, result in zip(trains, results)
+            if result is not None
+        }
+
+
+def polling_timeout(trains):
+    """
+    Longest the status of trains may take to be fetched, the requests are
+    made NLP_TASK_QUEUE_WORKERS at a time unless NLP_TASK_QUEUE_BATCH is set
+    """
+    if settings.NLP_TASK_QUEUE_BATCH:
+        rounds = 1
+    else:
+        rounds = math.ceil(len(trains) / settings.NLP_TASK_QUEUE_WORKERS)
+    return rounds * settings.NLP_TASK_QUEUE_TIMEOUT
+
+
 @app.task()
 def trainings_check_task():
-    trainers = RepositoryQueueTask.objects.filter(
-        Q(status=RepositoryQueueTask.STATUS_PENDING)
-        | Q(status=RepositoryQueueTask.STATUS_PROCESSING)
+    # beat keeps scheduling while a slow run is still polling, the lock
+    # expires on its own if the worker dies holding it
+    lock = get_redis_connection("default").lock(
+        TRAININGS_CHECK_LOCK, timeout=settings.NLP_TASK_QUEUE_TIMEOUT * 6
+    )
+    if not lock.acquire(blocking=False):
+        return
+    try:
+        check_trainings(lock)
+    finally:
+        try:
+            lock.release()
+        except LockError:  # pragma: no cover
+            pass
+
+
+def check_trainings(lock=None):
+    trainers = list(
+        RepositoryQueueTask.objects.filter(
+            Q(status=RepositoryQueueTask.STATUS_PENDING)
+            | Q(status=RepositoryQueueTask.STATUS_PROCESSING)
+        )
+    )
+    # the trainings the NLP service pushed a status for lately are not polled
+    reported_after = timezone.now() - timedelta(
+        seconds=settings.NLP_TASK_STATUS_RECONCILE_AFTER
     )
+    polled = [
+        train
+        for train in trainers
+        if train.type_processing == RepositoryQueueTask.TYPE_PROCESSING_TRAINING
+        and (train.reported_at is None or train.reported_at <= reported_after)
+    ]
+    if lock is not None:
+        # held for as long as the polling of that many tasks may take
+        lock.extend(polling_timeout(polled))
+    results = fetch_tasks_status(polled)
     for train in trainers:
-        if train.type_processing == RepositoryQueueTask.TYPE_PROCESSING_TRAINING:
-            services = {
-                RepositoryQueueTask.QUEUE_AIPLATFORM: "ai-platform",
-                RepositoryQueueTask.QUEUE_CELERY: "celery",
-            }
-            result = requests.get(
-                url=f"{settings.BOTHUB_NLP_BASE_URL}v2/task-queue/",
-                params=urlencode(
-                    {
-                        "id_task": train.id_queue,
-                        "from_queue": services.get(train.from_queue),
-                    }
-                ),
-            ).json()
-
-            if int(result.get("status")) != train.status:
-                fields = ["status", "ml_units"]
-                train.status = result.get("status")
-                if train.status == RepositoryQueueTask.STATUS_SUCCESS:
-                    train.end_training = timezone.now()
-                    fields.append("end_training")
-                train.ml_units = result.get("ml_units")
-                train.save(update_fields=fields)
-                continue
+        result = results.get(train.pk)
+        if result is not None and int(result.get("status")) != train.status:
+            fields = ["status", "ml_units"]
+            train.status = result.get("status")
+            if train.status == RepositoryQueueTask.STATUS_SUCCESS:
+                train.end_training = timezone.now()
+                fields.append("end_training")
+            train.ml_units = result.get("ml_units")
+            train.save(update_fields=fields)
+            continue
 
         # Verifica o treinamento que esta em execução, caso o tempo de criação seja maior que 2 horas
         # ele torna a task como falha
@@ -80,158 +178,76 @@ def debug_parse_text(instance_id, id_clone, repository, *args, **kwargs):
     clone = RepositoryVersion.objects.get(pk=id_clone, repository=repository)
     instance = RepositoryVersion.objects.get(pk=instance_id)
 
-    for version in clone.version_languages:
-        # Prepare languages for versioning before creating phrases
-        RepositoryVersionLanguage.objects.create(
-            language=version.language,
-            training_started_at=version.training_started_at,
-            training_end_at=version.training_end_at,
-            failed_at=version.failed_at,
-            use_analyze_char=version.use_analyze_char,
-            use_name_entities=version.use_name_entities,
-            use_competing_intents=version.use_competing_intents,
-            algorithm=version.algorithm,
-            repository_version=instance,
-            training_log=version.training_log,
-            last_update=version.last_update,
-            total_training_end=version.total_training_end,
-        )
-
-    for version in clone.version_languages:
-        version_language = instance.get_version_language(version.language)
-
-        version_language.update_trainer(
-            version.get_bot_data.bot_data, version.get_bot_data.rasa_version
-        )
-
-        examples = RepositoryExample.objects.filter(repository_version_language=version)
-
-        for example in examples:
-            intent, created = RepositoryIntent.objects.get_or_create(
-                text=example.intent.text,
-                repository_version=version_language.repository_version,
-            )
-            example_id = RepositoryExample.objects.create(
-                repository_version_language=version_language,
-                text=example.text,
-                intent=intent,
-                created_at=example.created_at,
-                last_update=example.last_update,
-            )
-
-            example_entites = RepositoryExampleEntity.objects.filter(
-                repository_example=example
-            )
+    VersionCloner(clone, instance, id_queue=debug_parse_text.request.id or "").clone()
 
-            for example_entity in example_entites:
-                if example_entity.entity.group:
-                    group, created_group = RepositoryEntityGroup.objects.get_or_create(
-                        repository_version=instance,
-                        value=example_entity.entity.group.value,
-                    )
-                    entity, created_entity = RepositoryEntity.objects.get_or_create(
-                        repository_version=instance,
-                        value=example_entity.entity.value,
-                        group=group,
-                    )
-                    RepositoryExampleEntity.objects.create(
-                        repository_example=example_id,
-                        start=example_entity.start,
-                        end=example_entity.end,
-                        entity=entity,
-                        created_at=example_entity.created_at,
-                    )
-                else:
-                    entity, created = RepositoryEntity.objects.get_or_create(
-                        repository_version=instance, value=example_entity.entity.value
-                    )
-                    RepositoryExampleEntity.objects.create(
-                        repository_example=example_id,
-                        start=example_entity.start,
-                        end=example_entity.end,
-                        entity=entity,
-                        created_at=example_entity.created_at,
-                    )
+    instance.is_deleted = False
+    instance.save(update_fields=["is_deleted"])
+    return True
 
-            translated_examples = RepositoryTranslatedExample.objects.filter(
-                original_example=example
-            )
 
-            for translated_example in translated_examples:
-                translated = RepositoryTranslatedExample.objects.create(
-                    repository_version_language=instance.get_version_language(
-                        translated_example.language
-                    ),
-                    original_example=example_id,
-                    language=translated_example.language,
-                    text=translated_example.text,
-                    created_at=translated_example.created_at,
-                    clone_repository=True,
-                )
+@app.task(name="materialize_version")
+def materialize_version(repository_version):
+    """
+    Copies the content a new version shares with its parent, the reads of the
+    version resolve through its source version until then
+    """
+    version = RepositoryVersion.objects.filter(pk=repository_version).first()
+    if version is not None:
+        version.materialize()
+    return True
 
-                translated_entity_examples = RepositoryTranslatedExampleEntity.objects.filter(
-                    repository_translated_example=translated_example
-                )
 
-                for translated_entity in translated_entity_examples:
-                    if translated_entity.entity.group:
-                        group, created_group = RepositoryEntityGroup.objects.get_or_create(
-                            repository_version=instance,
-                            value=translated_entity.entity.group.value,
-                        )
-                        entity, created_entity = RepositoryEntity.objects.get_or_create(
-                            repository_version=instance,
-                            value=translated_entity.entity.value,
-                            group=group,
-                        )
-                        RepositoryTranslatedExampleEntity.objects.create(
-                            repository_translated_example=translated,
-                            start=translated_entity.start,
-                            end=translated_entity.end,
-                            entity=entity,
-                            created_at=translated_entity.created_at,
-                        )
-                    else:
-                        entity, created_entity = RepositoryEntity.objects.get_or_create(
-                            repository_version=instance,
-                            value=translated_entity.entity.value,
-                        )
-                        RepositoryTranslatedExampleEntity.objects.create(
-                            repository_translated_example=translated,
-                            start=translated_entity.start,
-                            end=translated_entity.end,
-                            entity=entity,
-                            created_at=translated_entity.created_at,
-                        )
-
-        evaluates = RepositoryEvaluate.objects.filter(
-            repository_version_language=version
-        )
+@app.task()
+def flush_nlp_logs():
+    """
+    Saves the NLP logs buffered in redis when NLP_LOG_WRITE_BEHIND is enabled,
+    batch after batch until the buffer is empty
+    """
+    # a batch stays in the buffer until it is saved, only one worker may
+    # read it at a time
+    lock = get_redis_connection("default").lock(
+        RepositoryNLPLog.objects.BUFFER_LOCK, timeout=NLP_LOGS_FLUSH_LOCK_TIMEOUT
+    )
+    if not lock.acquire(blocking=False):
+        return 0
+    total = 0
+    try:
+        while True:
+            flushed = RepositoryNLPLog.objects.flush_buffer()
+            total += flushed
+            if flushed < settings.NLP_LOG_FLUSH_BATCH_SIZE:
+                return total
+    finally:
+        try:
+            lock.release()
+        except LockError:  # pragma: no cover
+            pass
 
-        for evaluate in evaluates:
-            evaluate_id = RepositoryEvaluate.objects.create(
-                repository_version_language=version_language,
-                text=evaluate.text,
-                intent=evaluate.intent,
-                created_at=evaluate.created_at,
-            )
 
-            evaluate_entities = RepositoryEvaluateEntity.objects.filter(
-                repository_evaluate=evaluate
-            )
+@app.task()
+def collect_orphan_entities():
+    """
+    Deletes the entities left without examples in the versions marked by
+    example deletes
+    """
+    for version in RepositoryVersion.objects.filter(entities_dirty=True):
+        # cleared first so the deletes made meanwhile mark the version again
+        RepositoryVersion.objects.filter(pk=version.pk).update(entities_dirty=False)
+        version.collect_orphan_entities()
 
-            for evaluate_entity in evaluate_entities:
-                RepositoryEvaluateEntity.objects.create(
-                    repository_evaluate=evaluate_id,
-                    start=evaluate_entity.start,
-                    end=evaluate_entity.end,
-                    entity=evaluate_entity.entity,
-                    created_at=evaluate_entity.created_at,
-                )
 
-    instance.is_deleted = False
-    instance.save(update_fields=["is_deleted"])
-    return True
+@app.task()
+def refresh_dataset_fingerprints():
+    """
+    Fingerprints the training data of the trained version languages edited
+    since their last training, so the readiness for train never hashes it
+    """
+    for version_language in (
+        RepositoryVersionLanguage.objects.exclude(trained_fingerprint="")
+        .filter(last_update__gt=F("training_end_at"))
+        .exclude(dataset_fingerprint_at=F("last_update"))
+    ):
+        version_language.refresh_dataset_fingerprint()
 
 
 @app.task()
@@ -275,6 +291,7 @@ def repositories_count_authorizations():
 
 
 @app.task(name="auto_translation")
+@bulk_ingest()
 def auto_translation(
     repository_version, source_language, target_language, *args, **kwargs
 ):
@@ -291,8 +308,7 @@ def auto_translation(
 
     examples = (
         RepositoryExample.objects.filter(
-            repository_version_language__repository_version=repository_version,
-            repository_version_language__language=source_language,
+            repository_version=repository_version, language=source_language
         )
         .annotate(
             translation_count=Count(
@@ -344,94 +360,22 @@ def auto_translation(
 
 
 @app.task()
-def repository_score():  # pragma: no cover
-    for version in RepositoryVersion.objects.filter(is_default=True):
-        dataset = {}
-        intents = []
-        train = {}
-        train_total = 0
-
-        repository_examples = RepositoryExample.objects.filter(
-            repository_version_language__repository_version=version,
-            repository_version_language__language=version.repository.language,
-        )
-
-        filtered_examples = list(
-            map(
-                lambda intent: {
-                    "value": intent.text,
-                    "examples__count": version.repository.examples(
-                        queryset=repository_examples, version_default=version.is_default
-                    )
-                    .filter(intent=intent)
-                    .count(),
-                },
-                version.version_intents.all(),
-            )
-        )
-
-        repository_evaluate = RepositoryEvaluate.objects.filter(
-            repository_version_language__repository_version=version,
-            repository_version_language__language=version.repository.language,
-        )
-
-        filtered_evaluate_sentences = dict(
-            map(
-                lambda x: (
-                    x,
-                    version.repository.evaluations(
-                        language=x,
-                        queryset=repository_evaluate,
-                        version_default=version.is_default,
-                    ).count(),
-                ),
-                version.repository.available_languages(
-                    queryset=RepositoryExample.objects.filter(
-                        repository_version_language__repository_version=version,
-                        repository_version_language__language=version.repository.language,
-                    ),
-                    version_default=version.is_default,
-                ),
-            )
-        )
-
-        for example in filtered_examples:
-            train[example["value"]] = example["examples__count"]
-            intents.append(example["value"])
-            train_total += example["examples__count"]
-
-        dataset["intentions"] = intents
-        dataset["train_count"] = train_total
-        dataset["train"] = train
-        dataset["evaluate_count"] = filtered_evaluate_sentences[
-            version.repository.language
-        ]
-
-        intentions_balance = intentions_balance_score(dataset)
-        intentions_size = intentions_size_score(dataset)
-        evaluate_size = evaluate_size_score(dataset)
-
-        score, created = RepositoryScore.objects.get_or_create(
-            repository=version.repository
-        )
-
-        score.intents_balance_score = float(intentions_balance.get("score"))
-        score.intents_balance_recommended = intentions_balance.get("recommended")
-        score.intents_size_score = float(intentions_size.get("score"))
-        score.intents_size_recommended = intentions_size.get("recommended")
-        score.evaluate_size_score = float(evaluate_size.get("score"))
-        score.evaluate_size_recommended = evaluate_size.get("recommended")
-
-        score.save(
-            update_fields=[
-                "intents_balance_score",
-                "intents_balance_recommended",
-                "intents_size_score",
-                "intents_size_recommended",
-                "evaluate_size_score",
-                "evaluate_size_recommended",
-            ]
-        )
+def repository_score():
+    """
+    Scores the default versions that changed since their last score, in
+    batches
+    """
+    BATCH_SIZE = 500
+    versions = RepositoryVersion.objects.filter(is_default=True).select_related(
+        "repository"
+    )
+    max_id = -1
+    while True:
+        batch = list(versions.filter(pk__gt=max_id).order_by("pk")[:BATCH_SIZE])
+        if not batch:
+            break
+        max_id = batch[-1].pk
+        RepositoryScore.objects.refresh(batch)
 
 
 @app.task(name="word_suggestions")
@@ -1,21 +1,52 @@
+import gzip
+import json
+import uuid
+
 from django.conf import settings
 from django.core.exceptions import ValidationError
+from django.db import connection
 from django.test import TestCase
+from django.test import override_settings
 from django.utils import timezone
+from django_redis import get_redis_connection
 
 from bothub.authentication.models import User
+from bothub.common.models import Organization
+from bothub.common.models import OrganizationAuthorization
 from . import languages
+from . import search
+from .clone import VersionCloner
 from .exceptions import DoesNotHaveTranslation
 from .exceptions import TrainingNotAllowed
 from .models import Repository, RepositoryIntent
 from .models import RepositoryAuthorization
 from .models import RepositoryEntity
+from .models import RepositoryEntityCounter
 from .models import RepositoryEntityGroup
+from .models import RepositoryEvaluate
+from .models import RepositoryEvaluateEntity
 from .models import RepositoryExample
 from .models import RepositoryExampleEntity
+from .models import RepositoryExampleSearchEntry
+from .models import RepositoryIntentCounter
+from .models import RepositoryNLPLog
+from .models import RepositoryQueueTask
+from .models import RepositoryReports
+from .models import RepositoryScore
+from .models import RepositorySequence
 from .models import RepositoryTranslatedExample
 from .models import RepositoryTranslatedExampleEntity
+from .models import RepositoryVersion
+from .models import RepositoryVersionLanguage
 from .models import RequestRepositoryAuthorization
+from .models import bulk_ingest
+from .tasks import TRAININGS_CHECK_LOCK
+from .tasks import check_trainings
+from .tasks import debug_parse_text
+from .tasks import materialize_version
+from .tasks import refresh_dataset_fingerprints
+from .tasks import repository_score
+from .tasks import trainings_check_task
 
 
 class RepositoryVersionTestCase(TestCase):
@@ -230,12 +261,46 @@ class RepositoryTestCase(TestCase):
         )
 
     def test_languages_status(self):
-        languages_status = self.repository.languages_status
+        with self.assertNumQueries(3):
+            languages_status = self.repository.languages_status
         self.assertListEqual(
             list(languages_status.keys()), list(settings.SUPPORTED_LANGUAGES.keys())
         )
-        # TODO: Update test_languages_status test
-        #       Create expeted result
+        self.assertEqual(
+            languages_status.get(languages.LANGUAGE_PT),
+            {
+                "is_base_language": False,
+                "examples": {"count": 1, "entities": []},
+                "base_translations": {"count": 1, "percentage": 100.0},
+            },
+        )
+        self.assertEqual(
+            languages_status.get(languages.LANGUAGE_EN),
+            {
+                "is_base_language": True,
+                "examples": {"count": 1, "entities": []},
+                "base_translations": {"count": 0, "percentage": 0.0},
+            },
+        )
+
+    def test_version_languages_status(self):
+        example = RepositoryExample.objects.create(
+            repository_version_language=self.repository.current_version(),
+            text="my name is user",
+            intent=self.example_intent_1,
+        )
+        entity = RepositoryExampleEntity.objects.create(
+            repository_example=example, start=11, end=15, entity="name"
+        )
+        languages_status = self.repository_version.languages_status
+        self.assertEqual(
+            languages_status.get(languages.LANGUAGE_EN).get("examples"),
+            {"count": 2, "entities": [entity.entity.pk]},
+        )
+        self.assertEqual(
+            languages_status.get(languages.LANGUAGE_PT).get("base_translations"),
+            {"count": 1, "percentage": 50.0},
+        )
 
     def test_last_trained_update(self):
         self.assertFalse(self.repository.last_trained_update())
@@ -359,6 +424,34 @@ class RepositoryExampleTestCase(TestCase):
         )
         self.assertEqual(self.example.language, self.language)
 
+    def test_version_language_keys(self):
+        repository_version = self.example.repository_version_language.repository_version
+        translation = RepositoryTranslatedExample.objects.create(
+            original_example=self.example, language=languages.LANGUAGE_PT, text="oi"
+        )
+        for instance in [self.example, translation]:
+            self.assertEqual(instance.repository, self.repository)
+            self.assertEqual(instance.repository_version, repository_version)
+            self.assertTrue(instance.is_default_version)
+        self.assertEqual(translation.language, languages.LANGUAGE_PT)
+
+    def test_default_version_change(self):
+        repository_version = self.example.repository_version_language.repository_version
+        RepositoryTranslatedExample.objects.create(
+            original_example=self.example, language=languages.LANGUAGE_PT, text="oi"
+        )
+        repository_version.is_default = False
+        repository_version.save(update_fields=["is_default"])
+
+        self.assertFalse(
+            RepositoryExample.objects.filter(is_default_version=True).exists()
+        )
+        self.assertFalse(
+            RepositoryTranslatedExample.objects.filter(is_default_version=True).exists()
+        )
+        self.assertFalse(self.repository.examples().exists())
+        self.assertEqual(self.repository.examples(version_default=False).count(), 1)
+
 
 class RepositoryAuthorizationTestCase(TestCase):
     def setUp(self):
@@ -503,6 +596,890 @@ class RepositoryAuthorizationTestCase(TestCase):
         self.assertTrue(authorization_user.can_contribute)
 
 
+class RepositoryAuthorizationEffectiveRoleTestCase(TestCase):
+    def setUp(self):
+        self.owner = User.objects.create_user("owner@user.com", "owner")
+        self.user = User.objects.create_user("fake@user.com", "user")
+        self.organization = Organization.objects.create(
+            name="Organization 1", nickname="organization1"
+        )
+
+        self.repository = Repository.objects.create(
+            owner=self.owner.repository_owner, name="Test", slug="test"
+        )
+        self.authorization = self.repository.get_user_authorization(self.user)
+        RepositoryAuthorization.objects.create(
+            user=self.organization,
+            repository=self.repository,
+            role=RepositoryAuthorization.ROLE_ADMIN,
+        )
+        self.organization_authorization = OrganizationAuthorization.objects.create(
+            user=self.user,
+            organization=self.organization,
+            role=OrganizationAuthorization.ROLE_CONTRIBUTOR,
+        )
+
+    def test_inherited_role(self):
+        authorization = RepositoryAuthorization.objects.get(pk=self.authorization.pk)
+        self.assertEqual(
+            authorization.effective_role, RepositoryAuthorization.ROLE_CONTRIBUTOR
+        )
+        with self.assertNumQueries(0):
+            self.assertEqual(
+                authorization.get_role, RepositoryAuthorization.ROLE_CONTRIBUTOR
+            )
+
+    def test_own_role_overrides_inherited(self):
+        self.authorization.role = RepositoryAuthorization.ROLE_USER
+        self.authorization.save()
+        self.assertEqual(self.authorization.get_role, RepositoryAuthorization.ROLE_USER)
+
+    def test_organization_authorization_deleted(self):
+        self.organization_authorization.delete()
+        authorization = RepositoryAuthorization.objects.get(pk=self.authorization.pk)
+        self.assertEqual(
+            authorization.get_role, RepositoryAuthorization.ROLE_NOT_SETTED
+        )
+
+    def test_refresh_effective_roles(self):
+        RepositoryAuthorization.objects.update(
+            effective_role=RepositoryAuthorization.ROLE_NOT_SETTED
+        )
+        RepositoryAuthorization.objects.all().refresh_effective_roles()
+        authorization = RepositoryAuthorization.objects.get(pk=self.authorization.pk)
+        self.assertEqual(
+            authorization.get_role, RepositoryAuthorization.ROLE_CONTRIBUTOR
+        )
+        owner_authorization = self.repository.get_user_authorization(self.owner)
+        self.assertEqual(
+            owner_authorization.get_role, RepositoryAuthorization.ROLE_ADMIN
+        )
+
+
+UNAVAILABLE_REDIS_CACHES = {
+    "default": {
+        "BACKEND": "django_redis.cache.RedisCache",
+        "LOCATION": "redis://127.0.0.1:1/0",
+    },
+    "local": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+}
+
+
+@override_settings(
+    CACHES={
+        "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+        "local": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+    }
+)
+class RepositoryAuthorizationCacheTestCase(TestCase):
+    def setUp(self):
+        self.owner = User.objects.create_user("owner@user.com", "owner")
+        self.user = User.objects.create_user("fake@user.com", "user")
+        self.organization = Organization.objects.create(
+            name="Organization 1", nickname="organization1"
+        )
+
+        self.repository = Repository.objects.create(
+            owner=self.owner.repository_owner, name="Test", slug="test"
+        )
+        self.authorization = self.repository.get_user_authorization(self.user)
+
+    def test_cached(self):
+        authorization = RepositoryAuthorization.objects.get_cached(
+            self.authorization.uuid
+        )
+        self.assertEqual(authorization.level, RepositoryAuthorization.LEVEL_READER)
+        with self.assertNumQueries(0):
+            authorization = RepositoryAuthorization.objects.get_cached(
+                self.authorization.uuid
+            )
+            self.assertEqual(authorization.user.pk, self.user.pk)
+            self.assertEqual(authorization.repository, self.repository)
+            self.assertFalse(authorization.can_contribute)
+
+    def test_invalidate_on_role_change(self):
+        RepositoryAuthorization.objects.get_cached(self.authorization.uuid)
+        self.authorization.role = RepositoryAuthorization.ROLE_CONTRIBUTOR
+        self.authorization.save()
+        authorization = RepositoryAuthorization.objects.get_cached(
+            self.authorization.uuid
+        )
+        self.assertTrue(authorization.can_contribute)
+
+    def test_invalidate_on_organization_role_change(self):
+        RepositoryAuthorization.objects.create(
+            user=self.organization,
+            repository=self.repository,
+            role=RepositoryAuthorization.ROLE_CONTRIBUTOR,
+        )
+        organization_authorization = OrganizationAuthorization.objects.create(
+            user=self.user,
+            organization=self.organization,
+            role=OrganizationAuthorization.ROLE_USER,
+        )
+        authorization = RepositoryAuthorization.objects.get_cached(
+            self.authorization.uuid
+        )
+        self.assertFalse(authorization.can_contribute)
+
+        organization_authorization.role = OrganizationAuthorization.ROLE_CONTRIBUTOR
+        organization_authorization.save()
+        authorization = RepositoryAuthorization.objects.get_cached(
+            self.authorization.uuid
+        )
+        self.assertTrue(authorization.can_contribute)
+
+    def test_invalid_token(self):
+        with self.assertRaises(RepositoryAuthorization.DoesNotExist):
+            RepositoryAuthorization.objects.get_cached(uuid.uuid4())
+
+    @override_settings(CACHES=UNAVAILABLE_REDIS_CACHES)
+    def test_redis_unavailable(self):
+        authorization = RepositoryAuthorization.objects.get_cached(
+            self.authorization.uuid
+        )
+        self.assertEqual(authorization.pk, self.authorization.pk)
+
+    @override_settings(CACHES=UNAVAILABLE_REDIS_CACHES)
+    def test_writes_redis_unavailable(self):
+        self.repository.name = "Renamed"
+        self.repository.save()
+        self.authorization.role = RepositoryAuthorization.ROLE_CONTRIBUTOR
+        self.authorization.save()
+        self.assertEqual(len(self.repository.training_generation), 32)
+
+
+class RepositorySequenceTestCase(TestCase):
+    def setUp(self):
+        self.owner = User.objects.create_user("owner@user.com", "owner")
+        self.repository = Repository.objects.create(
+            owner=self.owner.repository_owner, name="Test", slug="test"
+        )
+        self.other = Repository.objects.create(
+            owner=self.owner.repository_owner, name="Other", slug="other"
+        )
+
+    def test_next_value(self):
+        self.assertEqual(
+            [
+                RepositorySequence.objects.next_value(self.repository, "test")
+                for i in range(3)
+            ],
+            [1, 2, 3],
+        )
+        self.assertEqual(RepositorySequence.objects.next_value(self.other, "test"), 1)
+        self.assertEqual(
+            RepositorySequence.objects.next_value(
+                self.repository, RepositorySequence.EVALUATE_RESULT
+            ),
+            1,
+        )
+
+
+class RepositoryReportsTestCase(TestCase):
+    def setUp(self):
+        self.owner = User.objects.create_user("owner@user.com", "owner")
+        self.repository = Repository.objects.create(
+            owner=self.owner.repository_owner, name="Test", slug="test"
+        )
+        self.version_language = self.repository.current_version()
+
+    def test_count_logs(self):
+        for text in ["hi", "hello"]:
+            RepositoryNLPLog.objects.create(
+                text=text,
+                user_agent="python-requests/2.20.1",
+                from_backend=False,
+                repository_version_language=self.version_language,
+                user=self.owner,
+            )
+        report = RepositoryReports.objects.get(
+            repository_version_language=self.version_language, user=self.owner
+        )
+        self.assertEqual(report.count_reports, 2)
+
+    def test_add_reports(self):
+        today = timezone.now().date()
+        yesterday = today - timezone.timedelta(days=1)
+        key = (self.version_language.pk, self.owner.pk)
+        RepositoryReports.objects.add_reports({key + (today,): 3})
+        RepositoryReports.objects.add_reports(
+            {key + (today,): 2, key + (yesterday,): 1}
+        )
+        self.assertEqual(
+            dict(
+                RepositoryReports.objects.filter(
+                    repository_version_language=self.version_language
+                ).values_list("report_date", "count_reports")
+            ),
+            {today: 5, yesterday: 1},
+        )
+
+
+class RepositoryExampleCountersTestCase(TestCase):
+    def setUp(self):
+        self.owner = User.objects.create_user("owner@user.com", "owner")
+        self.repository = Repository.objects.create(
+            owner=self.owner.repository_owner,
+            name="Test",
+            slug="test",
+            language=languages.LANGUAGE_EN,
+        )
+        self.version_language = self.repository.current_version()
+        self.version = self.version_language.repository_version
+        self.greet = RepositoryIntent.objects.create(
+            text="greet", repository_version=self.version
+        )
+        self.bye = RepositoryIntent.objects.create(
+            text="bye", repository_version=self.version
+        )
+        self.example = RepositoryExample.objects.create(
+            repository_version_language=self.version_language,
+            text="my name is user",
+            intent=self.greet,
+        )
+        self.entity = RepositoryExampleEntity.objects.create(
+            repository_example=self.example, start=11, end=15, entity="name"
+        )
+        self.translation = RepositoryTranslatedExample.objects.create(
+            original_example=self.example,
+            language=languages.LANGUAGE_PT,
+            text="meu nome é user",
+        )
+
+    def counters(self):
+        return {
+            model.__name__: set(
+                model.objects.filter(
+                    repository_version_language__repository_version=self.version
+                ).values_list(
+                    "repository_version_language__language",
+                    "{}__pk".format(model.COUNTED_FIELD),
+                    "examples_count",
+                    "translations_count",
+                )
+            )
+            for model in [RepositoryIntentCounter, RepositoryEntityCounter]
+        }
+
+    def assertCountersRebuilt(self):
+        counters = self.counters()
+        self.version.rebuild_example_counters()
+        self.assertEqual(
+            {
+                name: {row for row in rows if any(row[2:])}
+                for name, rows in counters.items()
+            },
+            self.counters(),
+        )
+
+    def test_created(self):
+        entity = self.entity.entity.pk
+        self.assertEqual(
+            self.counters(),
+            {
+                "RepositoryIntentCounter": {
+                    (languages.LANGUAGE_EN, self.greet.pk, 1, 0),
+                    (languages.LANGUAGE_PT, self.greet.pk, 0, 1),
+                },
+                "RepositoryEntityCounter": {
+                    (languages.LANGUAGE_EN, entity, 1, 0),
+                    (languages.LANGUAGE_PT, entity, 0, 1),
+                },
+            },
+        )
+        self.assertCountersRebuilt()
+
+    def test_change_intent(self):
+        self.example.intent = self.bye
+        self.example.save()
+        self.assertEqual(
+            self.version.intents_examples_count(), {self.greet.pk: 0, self.bye.pk: 1}
+        )
+        self.assertCountersRebuilt()
+
+    def test_edit_text(self):
+        example = RepositoryExample.objects.get(pk=self.example.pk)
+        example.text = "my name is someone"
+        # the version language lookup and touch, the version lookup, then the
+        # example and search entry updates in a savepoint, the intent is
+        # unchanged and not looked up
+        with self.assertNumQueries(7):
+            example.save()
+        self.assertEqual(
+            RepositoryExampleSearchEntry.objects.get(
+                example=example, translation=None
+            ).text,
+            "my name is someone",
+        )
+        self.assertCountersRebuilt()
+
+    def test_delete_entities(self):
+        RepositoryExampleEntity.objects.filter(repository_example=self.example).delete()
+        self.assertCountersRebuilt()
+
+    def test_delete_translation(self):
+        self.translation.delete()
+        self.assertCountersRebuilt()
+
+    def test_delete_example(self):
+        self.example.delete()
+        self.assertEqual(self.version.intents_examples_count(), {self.greet.pk: 0})
+        self.assertCountersRebuilt()
+
+    @override_settings(CACHES=UNAVAILABLE_REDIS_CACHES)
+    def test_redis_unavailable(self):
+        self.example.intent = self.bye
+        self.example.save()
+        self.translation.delete()
+        self.assertEqual(
+            self.version.intents_examples_count(), {self.greet.pk: 0, self.bye.pk: 1}
+        )
+        self.assertCountersRebuilt()
+
+    def test_bulk_ingest(self):
+        last_update = RepositoryVersionLanguage.objects.get(
+            pk=self.version_language.pk
+        ).last_update
+        generation = self.version.generation
+        with bulk_ingest():
+            for text in ["hi", "hello"]:
+                example = RepositoryExample.objects.create(
+                    repository_version_language=self.version_language,
+                    text=text,
+                    intent=self.bye,
+                )
+                RepositoryExampleEntity.objects.create(
+                    repository_example=example, start=0, end=2, entity="name"
+                )
+                RepositoryTranslatedExample.objects.create(
+                    original_example=example, language=languages.LANGUAGE_PT, text=text
+                )
+            self.assertEqual(
+                RepositoryVersionLanguage.objects.get(
+                    pk=self.version_language.pk
+                ).last_update,
+                last_update,
+            )
+            self.assertEqual(self.version.intents_examples_count(), {self.greet.pk: 1})
+        self.assertGreater(
+            RepositoryVersionLanguage.objects.get(
+                pk=self.version_language.pk
+            ).last_update,
+            last_update,
+        )
+        self.assertEqual(
+            self.version.intents_examples_count(), {self.greet.pk: 1, self.bye.pk: 2}
+        )
+        self.assertNotEqual(self.version.generation, generation)
+        self.assertCountersRebuilt()
+
+
+class RepositoryExampleSearchTestCase(TestCase):
+    def setUp(self):
+        self.owner = User.objects.create_user("owner@user.com", "owner")
+        self.repository = Repository.objects.create(
+            owner=self.owner.repository_owner,
+            name="Test",
+            slug="test",
+            language=languages.LANGUAGE_EN,
+        )
+        self.version_language = self.repository.current_version()
+        self.greet = RepositoryIntent.objects.create(
+            text="greet", repository_version=self.version_language.repository_version
+        )
+        self.bye = RepositoryIntent.objects.create(
+            text="bye", repository_version=self.version_language.repository_version
+        )
+        for text, intent in [
+            ("good morning", self.greet),
+            ("good morning my friend", self.greet),
+            ("goodbye", self.bye),
+        ]:
+            RepositoryExample.objects.create(
+                repository_version_language=self.version_language,
+                text=text,
+                intent=intent,
+            )
+        self.example = RepositoryExample.objects.get(text="good morning")
+        RepositoryTranslatedExample.objects.create(
+            original_example=self.example,
+            language=languages.LANGUAGE_PT,
+            text="Olá, bom dia",
+        )
+
+    def search(self, text, language=languages.LANGUAGE_EN, **kwargs):
+        return RepositoryExampleSearchEntry.objects.search(
+            [self.repository.pk], language, text, **kwargs
+        )
+
+    def test_search(self):
+        self.assertEqual(
+            self.search("Good mornin"), ["good morning", "good morning my friend"]
+        )
+        self.assertEqual(self.search("good morning", limit=1), ["good morning"])
+        self.assertEqual(self.search("goodbye", exclude_intents=["bye"]), [])
+        self.assertEqual(
+            self.search("ola bom dia", languages.LANGUAGE_PT), ["Olá, bom dia"]
+        )
+
+    def test_ngram_index(self):
+        entries = RepositoryExampleSearchEntry.objects.filter(
+            language=languages.LANGUAGE_EN
+        )
+        self.assertEqual(
+            RepositoryExampleSearchEntry.objects.search_ngram_index(
+                entries, search.normalize("Good mornin"), 5
+            ),
+            self.search("Good mornin"),
+        )
+
+    def test_similarity(self):
+        for a, b in [("good morning", "good mornin"), ("olá bom dia", "bom dia")]:
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT similarity(%s, %s)", [a, b])
+                expected = cursor.fetchone()[0]
+            self.assertAlmostEqual(
+                search.similarity(search.trigrams(a), search.trigrams(b)),
+                expected,
+                places=5,
+            )
+
+    def test_update(self):
+        self.example.text = "good evening"
+        self.example.intent = self.bye
+        self.example.save()
+        self.assertEqual(self.search("good evening"), ["good evening"])
+        self.assertEqual(
+            self.search("ola bom dia", languages.LANGUAGE_PT, exclude_intents=["bye"]),
+            [],
+        )
+
+    def test_default_version(self):
+        repository_version = self.version_language.repository_version
+        repository_version.is_default = False
+        repository_version.save(update_fields=["is_default"])
+        self.assertEqual(self.search("good morning"), [])
+
+    def test_rebuild(self):
+        entries = set(
+            RepositoryExampleSearchEntry.objects.values_list(
+                "example", "translation", "language", "normalized_text"
+            )
+        )
+        RepositoryExampleSearchEntry.objects.rebuild(RepositoryExample.objects.all())
+        self.assertEqual(
+            set(
+                RepositoryExampleSearchEntry.objects.values_list(
+                    "example", "translation", "language", "normalized_text"
+                )
+            ),
+            entries,
+        )
+
+
+class RepositoryVersionCloneTestCase(TestCase):
+    def setUp(self):
+        self.owner = User.objects.create_user("owner@user.com", "owner")
+        self.repository = Repository.objects.create(
+            owner=self.owner.repository_owner,
+            name="Test",
+            slug="test",
+            language=languages.LANGUAGE_EN,
+        )
+        self.version_language = self.repository.current_version()
+        self.version = self.version_language.repository_version
+        greet = RepositoryIntent.objects.create(
+            text="greet", repository_version=self.version
+        )
+        group = RepositoryEntityGroup.objects.create(
+            repository_version=self.version, value="person"
+        )
+        name = RepositoryEntity.objects.create(
+            repository_version=self.version, value="name", group=group
+        )
+        for text in ["hi douglas", "hello douglas", "hey douglas"]:
+            example = RepositoryExample.objects.create(
+                repository_version_language=self.version_language,
+                text=text,
+                intent=greet,
+            )
+            RepositoryExampleEntity.objects.create(
+                repository_example=example,
+                start=len(text) - 7,
+                end=len(text),
+                entity=name,
+            )
+        translation = RepositoryTranslatedExample.objects.create(
+            original_example=example, language=languages.LANGUAGE_PT, text="oi douglas"
+        )
+        RepositoryTranslatedExampleEntity.objects.create(
+            repository_translated_example=translation, start=3, end=10, entity=name
+        )
+        evaluate = RepositoryEvaluate.objects.create(
+            repository_version_language=self.version_language,
+            text="hi douglas",
+            intent="greet",
+        )
+        RepositoryEvaluateEntity.objects.create(
+            repository_evaluate=evaluate, start=3, end=10, entity=name
+        )
+        self.clone = RepositoryVersion.objects.create(
+            repository=self.repository, name="clone", is_deleted=True
+        )
+
+    def assertCloned(self):
+        self.assertEqual(
+            self.clone.get_version_language(languages.LANGUAGE_EN).examples.count(), 3
+        )
+        self.assertEqual(
+            self.clone.get_version_language(
+                languages.LANGUAGE_PT
+            ).translated_added.count(),
+            1,
+        )
+        entities = RepositoryExampleEntity.objects.filter(
+            repository_example__repository_version=self.clone
+        )
+        self.assertEqual(entities.count(), 3)
+        self.assertEqual(
+            set(entities.values_list("entity__repository_version", flat=True)),
+            {self.clone.pk},
+        )
+        entity = RepositoryEntity.objects.get(
+            repository_version=self.clone, value="name"
+        )
+        self.assertEqual(entity.group.repository_version, self.clone)
+        self.assertEqual(
+            RepositoryTranslatedExampleEntity.objects.get(
+                repository_translated_example__repository_version=self.clone
+            ).entity,
+            entity,
+        )
+        self.assertEqual(
+            RepositoryEvaluateEntity.objects.get(
+                repository_evaluate__repository_version=self.clone
+            ).entity,
+            entity,
+        )
+        intent = RepositoryIntent.objects.get(
+            repository_version=self.clone, text="greet"
+        )
+        self.assertEqual(self.clone.intents_examples_count(), {intent.pk: 3})
+        self.assertEqual(
+            RepositoryExampleSearchEntry.objects.filter(
+                repository_version=self.clone
+            ).count(),
+            4,
+        )
+        for task in RepositoryQueueTask.objects.filter(
+            repositoryversionlanguage__repository_version=self.clone
+        ):
+            self.assertEqual(
+                task.type_processing, RepositoryQueueTask.TYPE_PROCESSING_CLONE_VERSION
+            )
+            self.assertEqual(task.status, RepositoryQueueTask.STATUS_SUCCESS)
+            self.assertEqual(task.progress, 100)
+
+    def test_clone_version(self):
+        debug_parse_text(self.clone.pk, self.version.pk, self.repository.pk)
+        self.clone.refresh_from_db()
+        self.assertFalse(self.clone.is_deleted)
+        self.assertCloned()
+
+    def test_clone_in_chunks(self):
+        VersionCloner(self.version, self.clone, chunk_size=2).clone()
+        self.assertCloned()
+        self.assertEqual(
+            RepositoryExample.objects.filter(repository_version=self.version).count(), 3
+        )
+
+    def test_clone_failure_discards_copied_rows(self):
+        class FailingCloner(VersionCloner):
+            def clone_evaluates(self, rows, version_language):
+                raise ValueError()
+
+        with self.assertRaises(ValueError):
+            FailingCloner(self.version, self.clone, chunk_size=2).clone()
+        self.assertFalse(
+            RepositoryExample.objects.filter(repository_version=self.clone).exists()
+        )
+        self.assertFalse(
+            RepositoryIntent.objects.filter(repository_version=self.clone).exists()
+        )
+        self.assertFalse(
+            RepositoryEntity.objects.filter(repository_version=self.clone).exists()
+        )
+        self.assertEqual(self.clone.intents_examples_count(), {})
+        for task in RepositoryQueueTask.objects.filter(
+            repositoryversionlanguage__repository_version=self.clone
+        ):
+            self.assertEqual(task.status, RepositoryQueueTask.STATUS_FAILED)
+
+    def test_shared_version(self):
+        child = RepositoryVersion.objects.create(
+            repository=self.repository, name="child", parent=self.version
+        )
+        self.assertFalse(
+            RepositoryExample.objects.filter(repository_version=child).exists()
+        )
+        self.assertEqual(
+            child.get_version_language(languages.LANGUAGE_EN).examples.count(), 3
+        )
+        self.assertEqual(
+            child.get_version_language(languages.LANGUAGE_PT).examples.count(), 1
+        )
+        self.assertEqual(len(child.version_languages), 2)
+        # reads never copy the shared content
+        child.refresh_from_db()
+        self.assertEqual(child.parent, self.version)
+        self.assertFalse(
+            RepositoryExample.objects.filter(repository_version=child).exists()
+        )
+        materialize_version(child.pk)
+        child.refresh_from_db()
+        self.assertIsNone(child.parent)
+        self.assertEqual(
+            RepositoryExample.objects.filter(repository_version=child).count(), 3
+        )
+
+    def test_shared_version_readiness(self):
+        bye = RepositoryIntent.objects.create(
+            text="bye", repository_version=self.version
+        )
+        for text in ["bye", "see you"]:
+            RepositoryExample.objects.create(
+                repository_version_language=self.version_language, text=text, intent=bye
+            )
+        child = RepositoryVersion.objects.create(
+            repository=self.repository, name="child", parent=self.version
+        )
+        materialize_version(child.pk)
+        version_language = child.get_version_language(languages.LANGUAGE_EN)
+        self.assertEqual(
+            len(version_language.intents), len(self.version_language.intents)
+        )
+        self.assertEqual(
+            version_language.requirements_to_train,
+            self.version_language.requirements_to_train,
+        )
+        self.assertTrue(self.version_language.ready_for_train)
+        self.assertTrue(version_language.ready_for_train)
+        self.assertEqual(
+            [
+                ready.language
+                for ready in RepositoryVersion.objects.get(
+                    pk=child.pk
+                ).version_languages_ready_for_train(
+                    [languages.LANGUAGE_EN, languages.LANGUAGE_PT]
+                )
+            ],
+            [
+                ready.language
+                for ready in self.version.version_languages_ready_for_train(
+                    [languages.LANGUAGE_EN, languages.LANGUAGE_PT]
+                )
+            ],
+        )
+
+    def test_write_to_shared_version(self):
+        child = RepositoryVersion.objects.create(
+            repository=self.repository, name="child", parent=self.version
+        )
+        intent, created = RepositoryIntent.objects.get_or_create(
+            repository_version=child, text="greet"
+        )
+        self.assertFalse(created)
+        child.refresh_from_db()
+        self.assertIsNone(child.parent)
+        self.clone = child
+        self.assertCloned()
+
+    def test_write_to_parent_version(self):
+        child = RepositoryVersion.objects.create(
+            repository=self.repository, name="child", parent=self.version
+        )
+        example = RepositoryExample.objects.get(
+            repository_version=self.version, text="hi douglas"
+        )
+        example.text = "hi douglas!"
+        example.save(update_fields=["text"])
+        child.refresh_from_db()
+        self.assertIsNone(child.parent)
+        self.assertTrue(
+            child.get_version_language(languages.LANGUAGE_EN)
+            .examples.filter(text="hi douglas")
+            .exists()
+        )
+
+    def test_shared_version_as_default(self):
+        child = RepositoryVersion.objects.create(
+            repository=self.repository, name="child", parent=self.version
+        )
+        child.is_default = True
+        child.save(update_fields=["is_default"])
+        self.assertTrue(
+            RepositoryExample.objects.filter(
+                repository_version=child, is_default_version=True
+            ).exists()
+        )
+
+    def test_delete_parent_version(self):
+        child = RepositoryVersion.objects.create(
+            repository=self.repository, name="child", parent=self.version
+        )
+        RepositoryVersion.objects.filter(pk=self.version.pk).delete()
+        child.refresh_from_db()
+        self.assertIsNone(child.parent)
+        self.assertEqual(
+            RepositoryExample.objects.filter(repository_version=child).count(), 3
+        )
+
+    def test_delete_repository_with_shared_version(self):
+        RepositoryVersion.objects.create(
+            repository=self.repository, name="child", parent=self.version
+        )
+        self.repository.delete()
+        self.assertFalse(
+            RepositoryVersion.objects.filter(repository=self.repository).exists()
+        )
+        self.assertFalse(RepositoryExample.objects.exists())
+
+
+class TrainingsCheckTaskTestCase(TestCase):
+    def setUp(self):
+        self.owner = User.objects.create_user("owner@user.com", "owner")
+        self.repository = Repository.objects.create(
+            owner=self.owner.repository_owner,
+            name="Test",
+            slug="test",
+            language=languages.LANGUAGE_EN,
+        )
+        self.task = self.repository.current_version().create_task(
+            id_queue="unknown",
+            from_queue=RepositoryQueueTask.QUEUE_CELERY,
+            type_processing=RepositoryQueueTask.TYPE_PROCESSING_TRAINING,
+        )
+        RepositoryQueueTask.objects.filter(pk=self.task.pk).update(
+            created_at=timezone.now() - timezone.timedelta(hours=3)
+        )
+
+    @override_settings(BOTHUB_NLP_BASE_URL="http://localhost:1/")
+    def test_fail_stale_tasks_without_nlp(self):
+        trainings_check_task()
+        self.task.refresh_from_db()
+        self.assertEqual(self.task.status, RepositoryQueueTask.STATUS_FAILED)
+
+    @override_settings(BOTHUB_NLP_BASE_URL="http://localhost:1/")
+    def test_skip_overlapping_run(self):
+        lock = get_redis_connection("default").lock(TRAININGS_CHECK_LOCK, timeout=10)
+        self.assertTrue(lock.acquire(blocking=False))
+        try:
+            trainings_check_task()
+        finally:
+            lock.release()
+        self.task.refresh_from_db()
+        self.assertEqual(self.task.status, RepositoryQueueTask.STATUS_PENDING)
+
+    @override_settings(
+        BOTHUB_NLP_BASE_URL="http://localhost:1/",
+        NLP_TASK_QUEUE_WORKERS=1,
+        NLP_TASK_QUEUE_TIMEOUT=10,
+    )
+    def test_lock_covers_polling(self):
+        for id_queue in ["first", "second"]:
+            self.repository.current_version().create_task(
+                id_queue=id_queue,
+                from_queue=RepositoryQueueTask.QUEUE_CELERY,
+                type_processing=RepositoryQueueTask.TYPE_PROCESSING_TRAINING,
+            )
+        lock = get_redis_connection("default").lock(TRAININGS_CHECK_LOCK, timeout=10)
+        self.assertTrue(lock.acquire(blocking=False))
+        try:
+            check_trainings(lock)
+            # three polling rounds of up to 10 seconds each
+            self.assertGreater(
+                get_redis_connection("default").pttl(TRAININGS_CHECK_LOCK), 30000
+            )
+        finally:
+            lock.release()
+
+
+class RepositoryScoreTestCase(TestCase):
+    def setUp(self):
+        self.owner = User.objects.create_user("owner@user.com", "owner")
+        self.repository = Repository.objects.create(
+            owner=self.owner.repository_owner,
+            name="Test",
+            slug="test",
+            language=languages.LANGUAGE_EN,
+        )
+        self.version_language = self.repository.current_version()
+        self.version = self.version_language.repository_version
+        for intent, texts in [("greet", ["hi", "hello"]), ("bye", ["bye"])]:
+            intent = RepositoryIntent.objects.create(
+                text=intent, repository_version=self.version
+            )
+            for text in texts:
+                RepositoryExample.objects.create(
+                    repository_version_language=self.version_language,
+                    text=text,
+                    intent=intent,
+                )
+        RepositoryEvaluate.objects.create(
+            repository_version_language=self.version_language,
+            text="hey",
+            intent="greet",
+        )
+
+    def test_datasets(self):
+        self.assertEqual(
+            RepositoryScore.objects.datasets([self.version]),
+            {
+                self.version.pk: {
+                    "intentions": ["greet", "bye"],
+                    "train": {"greet": 2, "bye": 1},
+                    "train_count": 3,
+                    "evaluate_count": 1,
+                }
+            },
+        )
+
+    def test_refresh(self):
+        self.assertEqual(RepositoryScore.objects.refresh([self.version]), 1)
+        score = RepositoryScore.objects.get(repository=self.repository)
+        self.assertEqual(len(score.fingerprint), 64)
+        self.assertEqual(score.version_generation, self.version.generation)
+        self.assertEqual(RepositoryScore.objects.refresh([self.version]), 0)
+
+    def test_repository_score_task(self):
+        repository_score()
+        score = RepositoryScore.objects.get(repository=self.repository)
+        self.assertEqual(score.version_generation, self.version.generation)
+
+    def test_refresh_unchanged_dataset(self):
+        RepositoryScore.objects.refresh([self.version])
+        fingerprint = RepositoryScore.objects.get(
+            repository=self.repository
+        ).fingerprint
+        RepositoryVersion.bump_generation(self.version.pk)
+        self.assertEqual(RepositoryScore.objects.refresh([self.version]), 0)
+        score = RepositoryScore.objects.get(repository=self.repository)
+        self.assertEqual(score.fingerprint, fingerprint)
+        self.assertEqual(score.version_generation, self.version.generation)
+
+    def test_refresh_changed_version(self):
+        RepositoryScore.objects.refresh([self.version])
+        RepositoryExample.objects.create(
+            repository_version_language=self.version_language,
+            text="good bye",
+            intent=RepositoryIntent.objects.get(
+                repository_version=self.version, text="bye"
+            ),
+        )
+        self.assertEqual(RepositoryScore.objects.refresh([self.version]), 1)
+
+
 class RepositoryVersionTrainingTestCase(TestCase):
     def setUp(self):
         self.owner = User.objects.create_user("owner@user.com", "user")
@@ -675,6 +1652,59 @@ class RepositoryReadyForTrain(TestCase):
                 self.repository.save()
                 self.assertTrue(self.repository.ready_for_train())
 
+    def test_be_false_when_edit_reverted(self):
+        current_version = self.repository.current_version()
+        current_version.start_training(self.owner)
+        current_version.save_training(b"", settings.BOTHUB_NLP_RASA_VERSION)
+
+        self.example_1.text = "hey"
+        self.example_1.save()
+        self.assertTrue(self.repository.ready_for_train())
+
+        self.example_1.text = "hi"
+        self.example_1.save()
+        self.assertTrue(self.repository.ready_for_train())
+        refresh_dataset_fingerprints()
+        current_version.refresh_from_db()
+        self.assertEqual(
+            current_version.repository_version.version_languages_ready_for_train(
+                [current_version.language]
+            ),
+            [],
+        )
+        self.assertFalse(self.repository.ready_for_train())
+
+    def test_readiness_does_not_fingerprint(self):
+        current_version = self.repository.current_version()
+        current_version.start_training(self.owner)
+        current_version.save_training(b"", settings.BOTHUB_NLP_RASA_VERSION)
+        self.example_1.text = "hey"
+        self.example_1.save()
+        current_version.refresh_from_db()
+
+        # the training requirements only, the examples are not read
+        with self.assertNumQueries(4):
+            self.assertTrue(current_version.ready_for_train)
+        self.assertIsNone(current_version.dataset_fingerprint_at)
+
+    def test_training_snapshot(self):
+        current_version = self.repository.current_version()
+        current_version.start_training(self.owner)
+        fingerprint = current_version.training_fingerprint
+
+        with current_version.open_training_snapshot() as snapshot:
+            content = json.loads(gzip.decompress(snapshot.read()))
+        self.assertEqual(content.get("algorithm"), self.repository.algorithm)
+        self.assertEqual(len(content.get("examples")), 5)
+
+        self.example_5.delete()
+        RepositoryExample.objects.create(
+            repository_version_language=current_version,
+            text="hellow",
+            intent=self.example_intent_1,
+        )
+        self.assertEqual(current_version.write_training_snapshot(), fingerprint)
+
 
 class RepositoryUpdateReadyForTrain(TestCase):
     def setUp(self):
@@ -939,6 +1969,31 @@ class RepositoryEntityTestCase(TestCase):
         self.assertEqual(name_entity.pk, self.example_entity_1.entity.pk)
         self.assertEqual(name_entity.pk, new_example_entity.entity.pk)
 
+    def test_collect_orphan_entities(self):
+        entity = self.example_entity_1.entity
+        entity.set_group("person")
+        entity.save()
+        other = RepositoryExample.objects.create(
+            repository_version_language=self.repository.current_version(),
+            text="my name is Other",
+            intent=self.example_intent_1,
+        )
+        RepositoryExampleEntity.objects.create(
+            repository_example=other, start=0, end=2, entity="object"
+        )
+
+        self.example.delete()
+        self.repository_version.refresh_from_db()
+        self.assertTrue(self.repository_version.entities_dirty)
+        self.assertEqual(self.repository_version.entities.count(), 2)
+
+        self.assertEqual(self.repository_version.collect_orphan_entities(), 1)
+        self.assertEqual(
+            list(self.repository_version.entities.values_list("value", flat=True)),
+            ["object"],
+        )
+        self.assertFalse(self.repository_version.groups.exists())
+
 
 class RepositoryEntityGroupTestCase(TestCase):
     def setUp(self):
@@ -1,5 +1,5 @@
 from django.shortcuts import get_object_or_404
-from django.http import HttpResponseRedirect
+from django.http import FileResponse, HttpResponseRedirect
 from django.core.exceptions import ValidationError
 from django.contrib.admin.views.decorators import staff_member_required
 
@@ -9,8 +9,14 @@ from bothub.common.models import RepositoryNLPTrain
 @staff_member_required
 def download_bot_data(self, update_id):  # pragma: no cover
     update = get_object_or_404(RepositoryNLPTrain, pk=update_id)
-    if update.bot_data is None or update.bot_data == "":
+    if not update.has_bot_data:
         raise ValidationError(f"Update #{update.pk} not trained at.")
+    if update.artifact:
+        return FileResponse(
+            update.open_artifact(),
+            as_attachment=True,
+            filename=f"bot_data_{update.artifact}.tar.gz",
+        )
     response = HttpResponseRedirect(
         update.repositoryversionlanguage.get_bot_data.bot_data
     )
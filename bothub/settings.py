@@ -64,6 +64,15 @@ env = environ.Env(
     SUGGESTION_LANGUAGES=(cast_supported_languages, "en|pt_br"),
     N_SENTENCES_TO_GENERATE=(int, 10),
     REDIS_TIMEOUT=(int, 3600),
+    LOCAL_CACHE_TIMEOUT=(int, 5),
+    AUTHORIZATION_CACHE_TIMEOUT=(int, 60),
+    NLP_LOG_WRITE_BEHIND=(bool, False),
+    NLP_LOG_FLUSH_BATCH_SIZE=(int, 1000),
+    NLP_TASK_QUEUE_BATCH=(bool, False),
+    NLP_TASK_QUEUE_WORKERS=(int, 8),
+    NLP_TASK_QUEUE_TIMEOUT=(int, 10),
+    NLP_TASK_STATUS_SWEEP_INTERVAL=(int, 60),
+    NLP_TASK_STATUS_RECONCILE_AFTER=(int, 300),
     APM_DISABLE_SEND=(bool, False),
     APM_SERVICE_DEBUG=(bool, False),
     APM_SERVICE_NAME=(str, ""),
@@ -73,6 +82,10 @@ env = environ.Env(
     DJANGO_REDIS_URL=(str, "redis://localhost:6379/1"),
     OIDC_ENABLED=(bool, False),
     SECRET_KEY_CHECK_LEGACY_USER=(str, None),
+    BOTHUB_TRAINING_SNAPSHOT_STORAGE=(
+        str,
+        "django.core.files.storage.FileSystemStorage",
+    ),
 )
 
 # Build paths inside the project like this: os.path.join(BASE_DIR, ...)
@@ -335,6 +348,21 @@ SWAGGER_SETTINGS = {
     "SECURITY_DEFINITIONS": {
         "api_key": {"type": "apiKey", "name": "Authorization", "in": "header"}
     },
+    "DEFAULT_FIELD_INSPECTORS": [
+        "bothub.api.v2.inspectors.FieldCostInspector",
+        "drf_yasg2.inspectors.CamelCaseJSONFilter",
+        "drf_yasg2.inspectors.RecursiveFieldInspector",
+        "drf_yasg2.inspectors.ReferencingSerializerInspector",
+        "drf_yasg2.inspectors.ChoiceFieldInspector",
+        "drf_yasg2.inspectors.FileFieldInspector",
+        "drf_yasg2.inspectors.DictFieldInspector",
+        "drf_yasg2.inspectors.JSONFieldInspector",
+        "drf_yasg2.inspectors.HiddenFieldInspector",
+        "drf_yasg2.inspectors.RelatedFieldInspector",
+        "drf_yasg2.inspectors.SerializerMethodFieldInspector",
+        "drf_yasg2.inspectors.SimpleFieldInspector",
+        "drf_yasg2.inspectors.StringDefaultFieldInspector",
+    ],
 }
 
 DRF_YASG_EXCLUDE_VIEWS = (
@@ -385,6 +413,34 @@ if BOTHUB_ENGINE_USE_SENTRY:
 BOTHUB_NLP_RASA_VERSION = env.str("BOTHUB_NLP_RASA_VERSION")
 
 
+# Training snapshots
+
+TRAINING_SNAPSHOT_STORAGE = env.str("BOTHUB_TRAINING_SNAPSHOT_STORAGE")
+TRAINING_SNAPSHOT_ROOT = env.str(
+    "BOTHUB_TRAINING_SNAPSHOT_ROOT",
+    default=os.path.join(BASE_DIR, "training_snapshots"),
+)
+
+
+# Trained models (bot_data) artifacts, addressed by their SHA-256
+
+ARTIFACT_STORAGE = env.str(
+    "BOTHUB_ARTIFACT_STORAGE",
+    default="bothub.common.storages.S3ArtifactStorage"
+    if AWS_SEND
+    else "django.core.files.storage.FileSystemStorage",
+)
+ARTIFACT_ROOT = env.str(
+    "BOTHUB_ARTIFACT_ROOT",
+    default="bot_data" if AWS_SEND else os.path.join(BASE_DIR, "artifacts"),
+)
+
+
+# Tests write the training snapshots and artifacts in a temporary directory
+
+TEST_RUNNER = "bothub.test_runner.TestRunner"
+
+
 # Celery
 
 CELERY_RESULT_BACKEND = "django-db"
@@ -423,12 +479,37 @@ CACHES = {
         "BACKEND": "django_redis.cache.RedisCache",
         "LOCATION": env("DJANGO_REDIS_URL"),
         "OPTIONS": {"CLIENT_CLASS": "django_redis.client.DefaultClient"},
-    }
+    },
+    # In process cache in front of redis for the hottest lookups, entries
+    # changed by other processes may be served stale for up to its timeout
+    "local": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "TIMEOUT": env.int("LOCAL_CACHE_TIMEOUT"),
+    },
 }
 
+# NLP logs write-behind, logs are buffered in redis and saved by the
+# flush_nlp_logs task instead of on each request
+NLP_LOG_WRITE_BEHIND = env.bool("NLP_LOG_WRITE_BEHIND")
+NLP_LOG_FLUSH_BATCH_SIZE = env.int("NLP_LOG_FLUSH_BATCH_SIZE")
+
+# Training status polling of trainings_check_task, the status of all the
+# tasks is asked in one request with NLP_TASK_QUEUE_BATCH
+NLP_TASK_QUEUE_BATCH = env.bool("NLP_TASK_QUEUE_BATCH")
+NLP_TASK_QUEUE_WORKERS = env.int("NLP_TASK_QUEUE_WORKERS")
+NLP_TASK_QUEUE_TIMEOUT = env.int("NLP_TASK_QUEUE_TIMEOUT")
+
+# The NLP service pushes the training statuses to the task_status endpoint,
+# trainings_check_task only polls the trainings that did not report lately
+NLP_TASK_STATUS_SWEEP_INTERVAL = env.int("NLP_TASK_STATUS_SWEEP_INTERVAL")
+NLP_TASK_STATUS_RECONCILE_AFTER = env.int("NLP_TASK_STATUS_RECONCILE_AFTER")
+
 # Set Redis timeout
 REDIS_TIMEOUT = env.int("REDIS_TIMEOUT")
 
+# Life time of the authorizations resolved by the NLP tokens in redis
+AUTHORIZATION_CACHE_TIMEOUT = env.int("AUTHORIZATION_CACHE_TIMEOUT")
+
 # Elastic Observability APM
 ELASTIC_APM = {
     "DISABLE_SEND": env.bool("APM_DISABLE_SEND"),
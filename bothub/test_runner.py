@@ -0,0 +1,29 @@
+import os
+import shutil
+import tempfile
+
+from django.test.runner import DiscoverRunner
+from django.test.utils import override_settings
+
+
+class TestRunner(DiscoverRunner):
+    """
+    Keeps the training snapshots and artifacts written by the tests in a
+    temporary directory, removed once the tests end
+    """
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self.storage_root = tempfile.mkdtemp()
+        self.storage_settings = override_settings(
+            TRAINING_SNAPSHOT_ROOT=os.path.join(
+                self.storage_root, "training_snapshots"
+            ),
+            ARTIFACT_ROOT=os.path.join(self.storage_root, "artifacts"),
+        )
+        self.storage_settings.enable()
+
+    def teardown_test_environment(self, **kwargs):
+        self.storage_settings.disable()
+        shutil.rmtree(self.storage_root, ignore_errors=True)
+        super().teardown_test_environment(**kwargs)